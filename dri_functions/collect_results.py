@@ -1,130 +1,128 @@
 # this script goes through the given folder, imports all sim-files found there and creates an excel file with all data required for the study
 
+import numpy as np
 import pandas as pd
-import os
-from factory_flexibility_model.io.factory_import import import_simulation
-
-def collect_results():
+from factory_flexibility_model.io.result_collection import collect_results as collect_simulation_results
+
+# keys of the assets used by dri_kpis() for every layout (the keys only depend on the layout, not on the scenario)
+_layout_keys = {}
+
+
+def dri_kpis(store):
+    """
+    This function calculates the KPIs of the study for a single stored simulation. Only the result columns that are
+    required are read from disk, the factory is only imported once per layout within every worker process.
+    :param store: [ResultStore] stored simulation of a dri run
+    :return: [dict] KPIs of the run
+    """
+    info = store.metadata["info"]
+    result = store.result
+    scenario = store.load_scenario()
+
+    if info["layout"] not in _layout_keys:
+        factory = store.load_factory()
+        _layout_keys[info["layout"]] = {name: factory.get_key(name) for name in [
+            "Crude Steel Out", "CCS -> CO2 Storage", "Natural Gas DRI -> Pool CO2", "Hydrogen DRI -> DRI Composition",
+            "DRI Composition", "Pool Hydrogen -> Hydrogen Storage", "Pool Hydrogen -> Hydrogen DRI",
+            "Pool DRI -> DRI Compactor", "Pool DRI", "Electricity Grid", "Electricity Slack"]}
+    key = _layout_keys[info["layout"]]
+
+    # calculate cost per ton of produced crude steel
+    steel_produced = np.sum(result[key["Crude Steel Out"]]["utilization"])
+    cost_per_ton = min(result["objective"] / steel_produced, 2500) #2500 only occurs in runs with a failed co2-target -> limit doesnt matter and just makes plots easier to reád
+
+    # calculate co2 emissions per ton of produced crude steel
+    co2_per_ton = np.sum(result["total_emissions"]) / steel_produced
+
+    # calculate co2 capture rate
+    if info["layout"] == "CCS":
+        co2_capture_rate = np.sum(result[key["CCS -> CO2 Storage"]]) / np.sum(result[key["Natural Gas DRI -> Pool CO2"]])
+    else:
+        co2_capture_rate = 0
+
+    # calculate ratio of H2 and NG used for DRI
+    if info["layout"] == "Partial":
+        rate_h2_in_dri = np.sum(result[key["Hydrogen DRI -> DRI Composition"]]) / np.sum(result[key["DRI Composition"]]["utilization"])
+    elif info["layout"] == "CCS":
+        rate_h2_in_dri = 0
+    else:
+        rate_h2_in_dri = 1
+
+    # calculate h2_storage_rate
+    h2_storage_rate = 0
+    if info["layout"] in ["Partial", "Hydrogen"]:
+        hydrogen_stored = np.sum(result[key["Pool Hydrogen -> Hydrogen Storage"]])
+        hydrogen_used = np.sum(result[key["Pool Hydrogen -> Hydrogen DRI"]])
+        if hydrogen_used != 0 and hydrogen_stored != 0:
+            h2_storage_rate = hydrogen_stored / hydrogen_used
+
+    # calculate hbi_storage_rate
+    hbi_storage_rate = np.sum(result[key["Pool DRI -> DRI Compactor"]]) / np.sum(result[key["Pool DRI"]]["utilization"])
+
+    # figure out if electricity emissions had been considered
+    emissions_electricity = bool(np.sum(scenario.configurations[key["Electricity Grid"]]["co2_emissions_per_unit"]) > 0)
+
+    # calculate achieved electricity price
+    grid = np.asarray(result[key["Electricity Grid"]]["utilization"])
+    slack = np.asarray(result[key["Electricity Slack"]]["utilization"])
+    cost_electricity = (
+        np.dot(grid, np.asarray(scenario.configurations[key["Electricity Grid"]]["cost"])[: len(grid)])
+        + np.dot(slack, np.broadcast_to(scenario.configurations[key["Electricity Slack"]]["cost"], slack.shape))
+    ) / (np.sum(slack) + np.sum(grid))
+
+    return {"Layout": info["layout"],
+            "cost_natural_gas": info["natural_gas_cost"],
+            "avg_cost_electricity": info["avg_electricity_price"],
+            "volantility_electricity": info["volatility"],
+            "month": info["month"],
+            "cost_CO2": info["co2_price"],
+            "co2_reduction": info["co2_reduction"],
+            "co2_per_ton": co2_per_ton,
+            "cost_per_ton": cost_per_ton,
+            "hbi_storage_rate": hbi_storage_rate,
+            "co2_capture_rate": co2_capture_rate,
+            "rate_h2_in_dri": rate_h2_in_dri,
+            "h2_storage_rate": h2_storage_rate,
+            "solver_time": info["solver_time"],
+            "cost_electricity": cost_electricity,
+            "emissions_electricity": emissions_electricity,
+            "electricity_savings_ratio": cost_electricity / info["avg_electricity_price"]}
+
+
+def collect_results(workers: int = None):
     #filepath = f"{os.getcwd()}\\simulations\\output_data\\DRI_Auswertung.xlsx"
     filepath = "F:\\FactoryFlexibilityModel\\DRI Simulations\\DRI_Auswertung.xlsx"
     #filepath_simulations = f"{os.getcwd()}\\simulations\\output_data\\simulations_solved"
     filepath_simulations = "F:\\FactoryFlexibilityModel\\DRI Simulations\\simulations_solved"
 
-    # initialize output dataframe
-    data = pd.DataFrame(columns=["Layout", "cost_natural_gas", "avg_cost_electricity", "volantility_electricity", "cost_CO2", "CO2_reduction",
-                     "co2_per_ton", "cost_per_ton", "hbi_storage_rate", "co2_capture_rate", "cost_electricity"])
-
-    # add row descriptions to dataframe
-    data = data._append({"Layout": "Which of the three DRI Layouts was used for this run?",
-                        "cost_natural_gas": "Fixed natural Gas price in [€/t]",
-                        "avg_cost_electricity": "Average cost of the electricity timeseries in [€/MWh]",
-                        "volantility_electricity": "An index describing the peak-to-peak value that the underlying timeseries has been scaled to. 0=stationary, 1=original, 2=doubled, etc..",
-                        "month": "used month of the german electricity price timeseries of 2022",
-                        "cost_CO2": "Fixed price for CO2-allowances in [€/tCO2]",
-                        "co2_reduction": "Ratio of which emissions are reduced compared to blastfurnance case",
-                        "co2_per_ton": "Amount of resulting CO2 emissions of the steel production [tCO2/tLS]",
-                        "cost_per_ton": "OPEX of the steel production [€/tLS]",
-                        "hbi_storage_rate": "Ratio of total DRI taking the storage path vs the total amount of DRI being fed into EAF [%]",
-                        "co2_capture_rate": "Ratio of captured CO2 vs produced CO2 [%]",
-                        "rate_h2_in_dri": "Ratio of DRI produced using Hydrogen vs total DRI production volume [%]",
-                        "h2_storage_rate": "Ratio of total Hydrogen taking the storage path vs the total amount of H2 being fed into DRI [%]",
-                        "solver_time": "Required runtime of the simulation [s]",
-                        "cost_electricity": "Average cost of purchased electricity resulting from the optimized operation profile [€/MWh]",
-                        "emissions_electricity": "Are scope 2 electricity emissions considered in this run?",
-                        "electricity_savings_ratio": "Average cost of purchased electricity / Average market price of electricity"}, ignore_index=True)
-
-
-    file_list = []
-    for root, dirs, files in os.walk(filepath_simulations):
-        for file in files:
-            if file.endswith(".sim"):
-                file_list.append(os.path.join(root, file))
-
-    i= 0
-    for file in file_list:
-        i+=1
-        print(f"importing file {i}")
-
-        try:
-            simulation = import_simulation(file)
-            factory = simulation.factory
-
-            # calculate cost per ton of produced crude steel
-            cost_per_ton = simulation.result["objective"] / sum(
-                simulation.result[factory.get_key("Crude Steel Out")]["utilization"])
-            if cost_per_ton > 2500:
-                cost_per_ton = 2500 #2500 only occurs in runs with a failed co2-target -> limit doesnt matter and just makes plots easier to reád
-
-            # calculate co2 emissions per ton of produced crude steel
-            co2_per_ton = sum(simulation.result["total_emissions"]) / sum(
-                simulation.result[factory.get_key("Crude Steel Out")]["utilization"])
-
-            if simulation.info["layout"] == "CCS":
-                # calculate co2 capture rate
-                co2_capture_rate = sum(simulation.result[factory.get_key('CCS -> CO2 Storage')]) / sum(
-                    simulation.result[factory.get_key('Natural Gas DRI -> Pool CO2')])
-            else:
-                co2_capture_rate = 0
-
-            # calculate ratio of H2 and NG used for DRI
-            if simulation.info["layout"] == "Partial":
-                rate_h2_in_dri = sum(simulation.result[factory.get_key('Hydrogen DRI -> DRI Composition')]) / sum(
-                    simulation.result[factory.get_key("DRI Composition")]["utilization"])
-            elif simulation.info["layout"] == "CCS":
-                rate_h2_in_dri = 0
-            else:
-                rate_h2_in_dri = 1
-
-            # calculate h2_storage_rate
-            if simulation.info["layout"] in ["Partial", "Hydrogen"]:
-                hydrogen_stored = sum(simulation.result[factory.get_key('Pool Hydrogen -> Hydrogen Storage')])
-                hydrogen_used = sum(simulation.result[factory.get_key('Pool Hydrogen -> Hydrogen DRI')])
-
-                if hydrogen_used == 0 or hydrogen_stored == 0:
-                    h2_storage_rate = 0
-                else:
-                    h2_storage_rate = hydrogen_stored/hydrogen_used
-            else:
-                h2_storage_rate = 0
-
-            # calculate hbi_storage_rate
-            hbi_storage_rate = sum(simulation.result[factory.get_key('Pool DRI -> DRI Compactor')]) / sum(
-                simulation.result[factory.get_key("Pool DRI")]["utilization"])
-
-            # figure out if electricity emissions had been considered
-            if sum(factory.components[factory.get_key('Electricity Grid')].co2_emissions_per_unit)>0:
-                emissions_electricity = True
-            else:
-                emissions_electricity = False
-
-            # calculate achieved electricity price
-            cost_electricity = (sum(simulation.result[factory.get_key('Electricity Grid')]["utilization"] *
-                                    simulation.scenario.configurations[factory.get_key("Electricity Grid")]["cost"])+
-                                sum(simulation.result[factory.get_key('Electricity Slack')]["utilization"] *
-                                    simulation.scenario.configurations[factory.get_key("Electricity Slack")]["cost"]))/ (
-                sum(simulation.result[factory.get_key('Electricity Slack')]["utilization"])
-                + sum(simulation.result[factory.get_key('Electricity Grid')]["utilization"]))
-
-            electricity_savings_ratio = cost_electricity / simulation.info["avg_electricity_price"]
-
-            data = data._append({"Layout": simulation.info["layout"],
-                                "cost_natural_gas": simulation.info["natural_gas_cost"],
-                                "avg_cost_electricity": simulation.info["avg_electricity_price"],
-                                "volantility_electricity": simulation.info["volatility"],
-                                "month": simulation.info["month"],
-                                "cost_CO2": simulation.info["co2_price"],
-                                "co2_reduction": simulation.info["co2_reduction"],
-                                "co2_per_ton": co2_per_ton,
-                                "cost_per_ton": cost_per_ton,
-                                "hbi_storage_rate": hbi_storage_rate,
-                                "co2_capture_rate": co2_capture_rate,
-                                "rate_h2_in_dri": rate_h2_in_dri,
-                                "h2_storage_rate": h2_storage_rate,
-                                "solver_time": simulation.info["solver_time"],
-                                "cost_electricity": cost_electricity,
-                                "emissions_electricity": emissions_electricity,
-                                "electricity_savings_ratio": electricity_savings_ratio}, ignore_index=True)
-        except:
-            print(f"failed to import simulation '{file}'")
+    # evaluate all simulations in parallel, the rows are written to a csv-file next to the excel file while collecting
+    results = collect_simulation_results(filepath_simulations,
+                                         dri_kpis,
+                                         workers=workers,
+                                         output_file=filepath.replace(".xlsx", ".csv"))
+    for file in results.loc[results["error"].notna(), "file"] if "error" in results else []:
+        print(f"failed to import simulation '{file}'")
+
+    # add row descriptions to the output table
+    descriptions = {"Layout": "Which of the three DRI Layouts was used for this run?",
+                    "cost_natural_gas": "Fixed natural Gas price in [€/t]",
+                    "avg_cost_electricity": "Average cost of the electricity timeseries in [€/MWh]",
+                    "volantility_electricity": "An index describing the peak-to-peak value that the underlying timeseries has been scaled to. 0=stationary, 1=original, 2=doubled, etc..",
+                    "month": "used month of the german electricity price timeseries of 2022",
+                    "cost_CO2": "Fixed price for CO2-allowances in [€/tCO2]",
+                    "co2_reduction": "Ratio of which emissions are reduced compared to blastfurnance case",
+                    "co2_per_ton": "Amount of resulting CO2 emissions of the steel production [tCO2/tLS]",
+                    "cost_per_ton": "OPEX of the steel production [€/tLS]",
+                    "hbi_storage_rate": "Ratio of total DRI taking the storage path vs the total amount of DRI being fed into EAF [%]",
+                    "co2_capture_rate": "Ratio of captured CO2 vs produced CO2 [%]",
+                    "rate_h2_in_dri": "Ratio of DRI produced using Hydrogen vs total DRI production volume [%]",
+                    "h2_storage_rate": "Ratio of total Hydrogen taking the storage path vs the total amount of H2 being fed into DRI [%]",
+                    "solver_time": "Required runtime of the simulation [s]",
+                    "cost_electricity": "Average cost of purchased electricity resulting from the optimized operation profile [€/MWh]",
+                    "emissions_electricity": "Are scope 2 electricity emissions considered in this run?",
+                    "electricity_savings_ratio": "Average cost of purchased electricity / Average market price of electricity"}
+
+    # combine the descriptions with the collected rows
+    data = pd.concat([pd.DataFrame([descriptions]), results.drop(columns=["file", "error"], errors="ignore")], ignore_index=True)
 
     data.to_excel(filepath, index=False)
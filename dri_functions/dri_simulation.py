@@ -43,7 +43,7 @@ def simulate_dri(simulation_task, model_parameters, simulation_config, total_sim
 
     if not simulation_config["overwrite_existing_simulations"]:
         # abort if simulation is already solved
-        if os.path.isfile(rf"{simulation_config['filepath_solved']}\{simulation_filename}.sim") or os.path.isfile(rf"{simulation_config['filepath_problem']}\{simulation_filename}.sim"):
+        if os.path.exists(rf"{simulation_config['filepath_solved']}\{simulation_filename}.sim") or os.path.exists(rf"{simulation_config['filepath_problem']}\{simulation_filename}.sim"):
             return
 
     # get scenario
@@ -0,0 +1,64 @@
+import logging
+import os
+import time
+import factory_flexibility_model.factory.Blueprint as bp
+import factory_flexibility_model.simulation.Scenario as sc
+from factory_flexibility_model.simulation import Simulation as fs
+
+
+def benchmark(sessions: list = ["SPIES_2024", "DRI_CCS", "DRI_Hydrogen", "DRI_Partial"],
+              solvers: list = ["gurobi", "highs"],
+              interval_length: int = None,
+              example_folder: str = os.path.dirname(os.path.abspath(__file__))):
+
+    """
+    This function simulates the bundled example sessions with every given solver backend and prints the resulting
+    objective values and runtimes. Sessions that cannot be solved by a backend (e.g. quadratic problems with HiGHS
+    or a size limited gurobi license) are reported as failed.
+
+    param sessions: [list] Names of the session folders within the example folder
+    param solvers: [list] Solver backends to compare ("gurobi", "highs")
+    param interval_length: [int] Length of the rolling intervals. None solves every session in one run
+    param example_folder: [str] Folder that contains the session folders
+    returns: [dict] {(session, solver): (objective, total time, solver time)}
+    """
+
+    # set logging level to avoid any unnecessary console outputs from the simulation scripts
+    logging.basicConfig(level=logging.ERROR)
+
+    results = {}
+    for session in sessions:
+        session_folder = os.path.join(example_folder, session)
+
+        # check, that the session_folder is existing
+        if not os.path.exists(session_folder):
+            raise FileNotFoundError(f"The given session path ({session_folder}) does not exist!")
+
+        for solver in solvers:
+            # create scenario- and factory-objects from file
+            scenario = sc.Scenario(scenario_file=os.path.join(session_folder, "scenarios", "default.sc"))
+            blueprint = bp.Blueprint()
+            blueprint.import_from_file(os.path.join(session_folder, "layout", "Layout.factory"))
+            factory = blueprint.to_factory()
+
+            # run simulation
+            simulation = fs.Simulation(factory=factory, scenario=scenario)
+            t_start = time.time()
+            try:
+                simulation.simulate(interval_length=interval_length, threshold=0.000001, solver_config={"log_solver": False, "solver": solver})
+            except Exception as e:
+                print(f"{session:<15} {solver:<8} failed ({type(e).__name__}: {e})")
+                continue
+
+            results[session, solver] = (
+                simulation.result["objective"],
+                time.time() - t_start,
+                sum(statistics["runtime"] for statistics in simulation.solver_statistics),
+            )
+            print(f"{session:<15} {solver:<8} objective: {results[session, solver][0]:>16.2f}   total: {results[session, solver][1]:>8.2f}s   solver: {results[session, solver][2]:>8.2f}s")
+
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
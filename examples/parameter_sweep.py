@@ -0,0 +1,54 @@
+import logging
+import os
+import factory_flexibility_model.factory.Blueprint as bp
+import factory_flexibility_model.simulation.Scenario as sc
+from factory_flexibility_model.simulation.Sweep import Sweep
+
+def sweep(session_folder: str = os.path.join("examples", "SPIES_2024"),
+          output_folder: str = os.path.join("examples", "SPIES_2024", "sweep"),
+          workers: int = 4):
+
+    """
+    This function simulates the SPIES example for all combinations of storage sizes and grid capacities in a pool of worker processes.
+    The simulations are stored in the output folder, calling the function again only simulates the missing runs.
+
+    param session_folder: [str] Folder of the session to be simulated
+    param output_folder: [str] Folder that the simulations of the runs are stored in
+    param workers: [int] Number of parallel worker processes
+    returns: [list] Summaries of all runs
+    """
+
+    # set logging level to only report the progress of the sweep
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger().handlers[0].addFilter(lambda record: record.getMessage().startswith("Sweep"))
+
+    # check, that the session_folder is existing
+    if not os.path.exists(session_folder):
+        raise FileNotFoundError(f"The given session path ({session_folder}) does not exist!")
+
+    # create scenario- and blueprint-objects from file
+    scenario = sc.Scenario(scenario_file=os.path.join(session_folder, "scenarios", "default.sc"))
+    blueprint = bp.Blueprint()
+    blueprint.import_from_file(os.path.join(session_folder, "layout", "Layout.factory"))
+
+    # simulate all combinations of the parameter values
+    parameter_sweep = Sweep(blueprint,
+                            scenario,
+                            folder=output_folder,
+                            parameters={("Speicher", "capacity"): [0, 250, 500, 1000],
+                                        ("Netzanbindung", "power_max"): [300, 400, 500]},
+                            simulate_config={"interval_length": 730,
+                                             "threshold": 0.000001,
+                                             "solver_config": {"log_solver": False, "mip_gap": 0.01}},
+                            workers=workers,
+                            timeout=3600)
+    summaries = parameter_sweep.run()
+
+    for summary in summaries:
+        print(f"{summary['name']:<24} {summary['status']:<8} {summary['objective']}")
+
+    return summaries
+
+
+if __name__ == "__main__":
+    sweep()
@@ -38,6 +38,7 @@
 
 import factory_flexibility_model.factory.Factory as fm
 import factory_flexibility_model.simulation.Simulation as fs
+from factory_flexibility_model.simulation.ResultStore import ResultStore
 
 
 # MAIN FUNCTIONS
@@ -72,13 +73,42 @@ def import_factory(data_path: str):
 
 def import_simulation(data_path: str):
     """
-    This function takes a path to a stored Simulation - object. The Simulation is being imported and returned
+    This function takes a path to a stored Simulation - object. The Simulation is being imported and returned.
+    Simulations stored in the columnar format of the ResultStore (folders created by Simulation.save()) are imported
+    with a result dictionary that only reads the timeseries from disk when they are accessed. Single files containing
+    a pickled Simulation-object (created by older versions) are supported as well.
     :param data_path: Path to a valid Simulation-object that has been created using Simulation.save()
     :return: fsimulation.Simulation - object
     """
 
     # check, if the requested file exists
     file = Path(data_path)
+    if file.is_dir():
+        try:
+            store = ResultStore(file)
+            metadata = store.metadata
+            imported_simulation = fs.Simulation(
+                factory=store.load_factory(),
+                scenario=store.load_scenario(),
+                name=metadata["name"],
+            )
+        except:
+            logging.critical(f"Importing simulation '{file}' failed")
+            raise Exception
+
+        imported_simulation.date_created = metadata["date_created"]
+        imported_simulation.date_simulated = metadata["date_simulated"]
+        imported_simulation.simulated = metadata["simulated"]
+        imported_simulation.T = metadata["T"]
+        imported_simulation.interval_length = metadata["interval_length"]
+        imported_simulation.problem_class = metadata["problem_class"]
+        imported_simulation.solver_statistics = metadata["solver_statistics"]
+        imported_simulation.info = metadata["info"]
+        imported_simulation.result = store.result
+
+        logging.info("SIMULATION IMPORT FROM FILE SUCCESSFUL")
+        return imported_simulation
+
     if not file.is_file():
         logging.critical(f"ERROR: The given file does not exist: {data_path}")
         raise Exception
@@ -101,3 +131,18 @@ def import_simulation(data_path: str):
 
     # Return the imported Simulation
     return imported_simulation
+
+
+def import_results(data_path: str):
+    """
+    This function opens a Simulation that has been stored by Simulation.save() without importing the factory and
+    scenario. Use it to read single KPIs or timeseries of many stored simulations.
+    :param data_path: Path to the folder of a stored Simulation
+    :return: [ResultStore] with .metadata and .result (timeseries are read from disk on access)
+    """
+    # check, if the requested folder exists
+    if not Path(data_path).is_dir():
+        logging.critical(f"ERROR: The given path is not a stored simulation: {data_path}")
+        raise Exception
+
+    return ResultStore(data_path)
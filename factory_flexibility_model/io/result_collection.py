@@ -0,0 +1,185 @@
+# -----------------------------------------------------------------------------
+# This script is used to collect the KPIs of many stored simulations (e.g. the runs of a parameter sweep)
+# into a single table
+#
+# Project Name: Factory_Flexibility_Model
+# File Name: result_collection.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+
+# IMPORT
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from factory_flexibility_model.simulation.ResultStore import ResultStore
+from factory_flexibility_model.simulation.SweepCatalog import SweepCatalog
+
+
+# MAIN FUNCTIONS
+def collect_results(
+    simulations,
+    kpis=None,
+    *,
+    workers: int = None,
+    output_file: str = None,
+    chunk_size: int = 200,
+) -> pd.DataFrame:
+    """
+    This function evaluates the KPIs of many stored simulations and combines them into a single DataFrame with one
+    row per simulation. The simulations are opened as ResultStore in a pool of worker processes, so that only the
+    manifest and the result columns that are actually used by the KPI-function are read from disk. The rows are
+    collected as records and the DataFrame is created once at the end. If an output file is given, the rows are
+    additionally appended to it in chunks while the collection is running.
+    :param simulations: [str, list or SweepCatalog] Folder that is searched for stored simulations (*.sim), list of paths to stored simulations or the catalog of a sweep (all solved runs are collected)
+    :param kpis: [function] Function kpis(store) that returns a dict of KPIs for a ResultStore. It has to be defined on module level, so that it can be handed over to the worker processes. Defaults to default_kpis()
+    :param workers: [int] Number of worker processes. Defaults to the number of cpu cores
+    :param output_file: [str] Optional .csv-file that the rows are written to while collecting. An existing file is replaced
+    :param chunk_size: [int] Number of simulations that are handed over to a worker at once and written to the output file together
+    :return: [pd.DataFrame] One row per simulation with the column "file" and one column per KPI. Simulations that could not be evaluated have the column "error" set
+    """
+    files = get_simulation_files(simulations)
+    if kpis is None:
+        kpis = default_kpis
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, -(-len(files) // chunk_size)))
+
+    if output_file is not None:
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if output_file.exists():
+            output_file.unlink()
+
+    logging.info(f"Collecting the results of {len(files)} simulations with {workers} worker processes")
+    t_start = time.time()
+    records = []
+    columns = None
+
+    def write_chunk(chunk):
+        nonlocal columns
+        frame = pd.DataFrame.from_records(chunk)
+        if columns is None:
+            columns = list(frame.columns)
+        else:
+            # the columns of the file are fixed by the first chunk, rows of failed simulations may lack KPIs
+            new_columns = [column for column in frame.columns if column not in columns]
+            if new_columns:
+                logging.warning(f"WARNING: The columns {new_columns} are not written to {output_file}, since they are missing in the first rows")
+        frame.reindex(columns=columns).to_csv(output_file, mode="a", header=not output_file.exists(), index=False)
+
+    chunks = [files[i : i + chunk_size] for i in range(0, len(files), chunk_size)]
+    if workers == 1:
+        results = (_collect_chunk(chunk, kpis) for chunk in chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        results = executor.map(_collect_chunk, chunks, [kpis] * len(chunks))
+    try:
+        for chunk in results:
+            records.extend(chunk)
+            if output_file is not None:
+                write_chunk(chunk)
+            logging.info(f"Collected {len(records)}/{len(files)} simulations ({round(time.time() - t_start, 2)}s)")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    failed = sum("error" in record for record in records)
+    if failed:
+        logging.warning(f"WARNING: {failed} of {len(files)} simulations could not be evaluated")
+    return pd.DataFrame.from_records(records)
+
+
+def get_simulation_files(simulations) -> list:
+    """
+    This function lists the stored simulations to be collected.
+    :param simulations: [str, list or SweepCatalog] Folder that is searched for stored simulations (*.sim), list of paths to stored simulations or the catalog of a sweep (all solved runs are listed)
+    :return: [list] Paths of the stored simulations
+    """
+    if isinstance(simulations, SweepCatalog):
+        return [run["file"] for run in simulations.query(status="solved")]
+    if isinstance(simulations, (list, tuple)):
+        return [str(file) for file in simulations]
+
+    if not Path(simulations).is_dir():
+        logging.critical(f"ERROR: The given folder does not exist: {simulations}")
+        raise Exception
+    files = []
+    for root, folders, _ in os.walk(simulations):
+        files.extend(os.path.join(root, folder) for folder in folders if folder.endswith(".sim"))
+        # stored simulations are folders themselves, their content is not searched
+        folders[:] = [folder for folder in folders if not folder.endswith(".sim")]
+    return sorted(files)
+
+
+def default_kpis(store: ResultStore) -> dict:
+    """
+    This function returns the KPIs that are available for every stored simulation: the name, the objective, the
+    total emissions and emission costs, the solver time and all info values of the simulation (e.g. the parameters
+    of sweep runs).
+    :param store: [ResultStore] Stored simulation
+    :return: [dict] KPIs of the simulation
+    """
+    metadata = store.metadata
+    result = store.result
+    kpis = {
+        "name": metadata["name"],
+        "simulated": metadata["simulated"],
+        "objective": result["objective"],
+        "total_emissions": float(np.sum(result["total_emissions"])),
+        "total_emission_cost": result["total_emission_cost"],
+        "solver_time": sum(statistics["runtime"] for statistics in metadata["solver_statistics"] or []),
+    }
+    info = metadata["info"]
+    if isinstance(info, dict):
+        for key, value in info.items():
+            if isinstance(value, dict):
+                kpis.update({f"{key}.{item_key}": item for item_key, item in value.items()})
+            else:
+                kpis[key] = value
+    return kpis
+
+
+# WORKER ROUTINE
+def _collect_chunk(files: list, kpis) -> list:
+    """
+    This function evaluates the KPIs of a chunk of stored simulations within a worker process.
+    :param files: [list] Paths of the stored simulations
+    :param kpis: [function] KPI-function
+    :return: [list] One record per simulation
+    """
+    records = []
+    for file in files:
+        try:
+            records.append({"file": file, **kpis(ResultStore(file))})
+        except Exception as e:
+            records.append({"file": file, "error": f"{type(e).__name__}: {e}"})
+    return records
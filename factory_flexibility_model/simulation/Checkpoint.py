@@ -0,0 +1,107 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: Checkpoint.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# CHECKPOINTS OF ROLLING SIMULATIONS
+
+# IMPORTS
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+
+# CODE START
+class Checkpoint:
+    """
+    .. _Checkpoint:
+        On-disk store for the solutions of the finished intervals of a rolling simulation.
+
+        Every finished interval is written to its own file as soon as it has been solved, so that a simulation that
+        crashes or is aborted can be resumed without solving the finished intervals again. The checkpoints of a
+        simulation are kept in a subfolder named by the key of the simulation (see ResultCache.get_key()), which makes
+        sure that only checkpoints of the identical simulation task are ever restored.
+
+        Example:
+            >>> checkpoint = Checkpoint(folder="path/to/checkpoints", key=simulation.cache_key)
+            >>> checkpoint.store(0, {"t_start": 0, "t_end": 729, "solution": simulation.solution, ...})
+            >>> entry = checkpoint.load(0)
+    """
+
+    def __init__(self, folder: str, key: str):
+        """
+        :param folder: [str] Folder to store the checkpoints in
+        :param key: [str] Key of the simulation task
+        """
+        self.folder = Path(folder) / key
+
+    def load(self, interval: int, t_start: int = None, t_end: int = None):
+        """
+        This function loads the checkpoint of an interval.
+        :param interval: [int] Number of the interval
+        :param t_start: [int] Expected first timestep of the interval. Checkpoints of other timeframes are ignored
+        :param t_end: [int] Expected last timestep of the interval. Checkpoints of other timeframes are ignored
+        :return: [dict] The stored entry or None if the interval has no valid checkpoint
+        """
+        file = self.folder / f"interval_{interval:05d}.checkpoint"
+        try:
+            with open(file, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f"WARNING: The checkpoint of interval {interval + 1} could not be read ({e})")
+            return None
+
+        if (t_start is not None and entry.get("t_start") != t_start) or (t_end is not None and entry.get("t_end") != t_end):
+            return None
+        return entry
+
+    def store(self, interval: int, entry: dict):
+        """
+        This function writes the checkpoint of an interval. The file is written atomically, so that an aborted
+        simulation never leaves an incomplete checkpoint behind.
+        :param interval: [int] Number of the interval
+        :param entry: [dict] Data to be stored
+        """
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.folder, suffix=".tmp", delete=False) as f:
+                pickle.dump(entry, f)
+            os.replace(f.name, self.folder / f"interval_{interval:05d}.checkpoint")
+        except OSError as e:
+            logging.warning(f"WARNING: The checkpoint of interval {interval + 1} could not be written ({e})")
+
+    def clear(self):
+        """
+        This function deletes all checkpoints of the simulation task.
+        """
+        shutil.rmtree(self.folder, ignore_errors=True)
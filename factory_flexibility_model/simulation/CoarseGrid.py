@@ -0,0 +1,148 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: CoarseGrid.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# COARSE GRID OF MULTI-RESOLUTION SIMULATIONS
+
+# IMPORTS
+import copy
+
+import numpy as np
+
+from factory_flexibility_model.simulation.TimeAggregation import get_timeseries
+
+# CODE START
+# timeseries that specify energy or material per timestep instead of power. They are summed up for a coarse timestep,
+# all other timeseries (power, prices, availabilities, temperatures, emission factors,...) are averaged
+ENERGY_TIMESERIES = {
+    "sink": ["demand", "power_max"],
+    "source": ["determined_power"],
+}
+
+
+class CoarseGrid:
+    """
+    .. _CoarseGrid:
+        Downsampled timeline of a multi-resolution simulation.
+
+        A fixed number of consecutive timesteps is combined into one coarse timestep. The factory is solved on the
+        coarse timeline first, which is cheap and gives estimates of storage trajectories, converter on/off
+        patterns and the timing of triggerdemands. The coarse solution is then mapped back to the original timeline
+        and used to guide the solver on the original resolution (see set_coarse_guidance).
+
+        Example:
+            >>> coarse_grid = CoarseGrid(factory, timesteps=8760, factor=4)
+            >>> coarse_factory = coarse_grid.get_coarse_factory()
+            >>> guidance = coarse_grid.refine_solution(coarse_solution)
+    """
+
+    def __init__(self, factory, timesteps: int, factor: int):
+        """
+        :param factory: [factory.Factory] Factory with all scenario configurations applied
+        :param timesteps: [int] Number of timesteps of the simulation timeframe
+        :param factor: [int] Number of timesteps that are combined into one coarse timestep
+        """
+        self.factory = factory
+        self.factor = factor
+        self.T = timesteps
+        self.timesteps = -(-timesteps // factor)  # number of coarse timesteps
+        self.block = np.arange(timesteps) // factor  # coarse timestep of every timestep
+        self.block_length = np.bincount(self.block)  # number of timesteps within every coarse timestep
+
+    def __downsample(self, values, summed: bool) -> np.ndarray:
+        """
+        This function combines the values of every coarse timestep.
+        :param values: [np.array] Values of the original timeline
+        :param summed: [bool] Set True to sum up the values, otherwise they are averaged
+        :return: [np.array] Values of the coarse timeline
+        """
+        totals = np.bincount(np.arange(len(values)) // self.factor, weights=np.asarray(values, dtype=float))
+        if summed:
+            return totals
+        return totals / np.bincount(np.arange(len(values)) // self.factor)
+
+    def get_coarse_factory(self):
+        """
+        This function creates a copy of the factory on the coarse timeline. Timeseries are averaged or summed up per
+        coarse timestep, the load profiles and fulfilment intervals of triggerdemands and the demands of schedules
+        are converted to coarse timesteps.
+        :return: [factory.Factory] Factory with the timeseries of the coarse timeline
+        """
+        factory = copy.deepcopy(self.factory)
+        factory.timesteps = self.timesteps
+
+        for component in factory.components.values():
+            summed = ENERGY_TIMESERIES.get(component.type, [])
+            for attribute, timeseries in get_timeseries(component, self.T):
+                setattr(component, attribute, self.__downsample(timeseries[: self.T], attribute in summed))
+
+            if component.type == "triggerdemand":
+                # the energy of the load profile is preserved, the profile ends with a complete coarse timestep
+                for attribute in ["load_profile_energy", "load_profile_mass"]:
+                    profile = getattr(component, attribute)
+                    if len(profile) > 0:
+                        setattr(component, attribute, list(self.__downsample(profile, True) / self.factor))
+                component.profile_length = -(-component.profile_length // self.factor)
+                component.Tstart = (component.Tstart - 1) // self.factor + 1
+                component.Tend = -(-component.Tend // self.factor)
+
+            if component.type == "schedule":
+                # the timeframes of the demands are converted, the energy and the power of the demands remain
+                component.demands = component.demands.copy()
+                component.demands[:, 0:2] = component.demands[:, 0:2] // self.factor
+
+        return factory
+
+    def refine_solution(self, solution: dict) -> dict:
+        """
+        This function maps the solution of the coarse timeline to the original timeline: Energy flows are split
+        evenly onto the timesteps of a coarse timestep, all other values are kept for every timestep. Executions of
+        triggerdemands are placed on the first timestep of their coarse timestep.
+        :param solution: [dict] Values of all MVars of the coarse simulation
+        :return: [dict] Estimated values of all timeseries of MVars on the original timeline
+        """
+        refined = {}
+        for component in self.factory.components.values():
+            key = f"{component.key}_executions"
+            if component.type == "triggerdemand" and key in solution:
+                executions = np.zeros(self.T - component.profile_length + 1)
+                starts = np.arange(len(solution[key])) * self.factor
+                valid = starts < len(executions)
+                executions[starts[valid]] = solution[key][valid]
+                refined[key] = executions
+
+        for key, value in solution.items():
+            if key in refined or not isinstance(value, np.ndarray) or value.ndim != 1 or value.shape[0] != self.timesteps:
+                continue
+            if key in self.factory.connections or key.startswith("E_"):
+                refined[key] = value[self.block] / self.block_length[self.block]
+            else:
+                refined[key] = value[self.block]
+
+        return refined
@@ -0,0 +1,199 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: ResultCache.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# RESULT CACHE
+
+# IMPORTS
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# CODE START
+CACHE_VERSION = 7  # increase whenever the formulation of the optimization problem changes to invalidate old entries
+
+
+class ResultCache:
+    """
+    .. _ResultCache:
+        Content addressed on-disk store for simulation results.
+
+        Every entry is addressed by a hash of the factory (including all scenario configurations and timeseries
+        that have been applied to it) and the simulation settings. The store is bounded in size: when the limit is
+        exceeded, the least recently used entries are deleted.
+
+        Example:
+            >>> cache = ResultCache(folder="path/to/cache", max_size=500)
+            >>> key = cache.get_key(simulation, {"interval_length": 730})
+            >>> result = cache.load(key)
+    """
+
+    def __init__(self, folder: str = None, max_size: float = 1000):
+        """
+        :param folder: [str] Folder to store the cached results in. Defaults to ~/.factory_flexibility_model/result_cache
+        :param max_size: [float] Maximum size of the cache folder in MB
+        """
+        if folder is None:
+            folder = Path.home() / ".factory_flexibility_model" / "result_cache"
+        self.folder = Path(folder)
+        self.max_size = max_size
+
+    def get_key(self, simulation, settings: dict) -> str:
+        """
+        This function calculates a stable hash of the factory of the given simulation and the given settings.
+        Components, connections, flowtypes and units are hashed with all their attributes, references between them
+        are hashed by their keys.
+        :param simulation: [Simulation] Simulation whose scenario data has already been read into the factory
+        :param settings: [dict] All simulation and solver settings that influence the result
+        :return: [str] Hexadecimal key of the cache entry
+        """
+        hasher = hashlib.sha256()
+        self.__update_hash(hasher, CACHE_VERSION)
+        self.__update_hash(hasher, settings)
+        self.__update_hash(hasher, simulation.big_m)
+        self.__update_hash(hasher, simulation.scenario.timefactor)
+
+        factory = simulation.factory
+        for attribute, value in sorted(vars(factory).items()):
+            if attribute in ["components", "connections", "flowtypes", "units"]:
+                # hash the objects of the factory completely, but only refer to them when they occur nested
+                for key in sorted(value):
+                    self.__update_hash(hasher, key)
+                    self.__update_hash(hasher, vars(value[key]))
+            else:
+                self.__update_hash(hasher, attribute)
+                self.__update_hash(hasher, value)
+
+        return hasher.hexdigest()
+
+    def load(self, key: str):
+        """
+        This function loads a cached entry and marks it as recently used.
+        :param key: [str] Key of the cache entry
+        :return: [dict] The cached entry or None if the cache does not contain the key
+        """
+        file = self.folder / f"{key}.result"
+        try:
+            with open(file, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return entry
+
+    def store(self, key: str, entry: dict):
+        """
+        This function writes an entry to the cache and removes the least recently used entries if the size limit is
+        exceeded. The file is written atomically, so that concurrent simulations never read incomplete entries.
+        :param key: [str] Key of the cache entry
+        :param entry: [dict] Data to be cached
+        """
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.folder, suffix=".tmp", delete=False) as f:
+                pickle.dump(entry, f)
+            os.replace(f.name, self.folder / f"{key}.result")
+        except OSError as e:
+            logging.warning(f"WARNING: The result could not be written to the cache ({e})")
+            return
+        self.__evict()
+
+    def __evict(self):
+        """
+        This function deletes the least recently used entries until the cache folder is smaller than max_size.
+        """
+        entries = []
+        for file in self.folder.glob("*.result"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, file in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self.max_size * 1e6:
+                break
+            try:
+                file.unlink()
+                size -= file_size
+                logging.debug(f"Removed {file.name} from the result cache")
+            except OSError:
+                pass
+
+    def __update_hash(self, hasher, value, seen=None):
+        """
+        This function feeds a canonical representation of the given value into the hasher.
+        :param hasher: [hashlib-object]
+        :param value: [any] value to be hashed
+        :param seen: [set] ids of the objects that are already being hashed (prevents infinite recursion)
+        """
+        if seen is None:
+            seen = set()
+
+        if value is None or isinstance(value, (bool, int, float, str)):
+            hasher.update(f"{type(value).__name__}:{value!r};".encode())
+        elif isinstance(value, np.generic):
+            self.__update_hash(hasher, value.item(), seen)
+        elif isinstance(value, (pd.Series, pd.DataFrame)):
+            self.__update_hash(hasher, value.to_numpy(), seen)
+        elif isinstance(value, np.ndarray):
+            hasher.update(f"ndarray:{value.dtype}:{value.shape};".encode())
+            if value.dtype == object:
+                for item in value.ravel():
+                    self.__update_hash(hasher, item, seen)
+            else:
+                hasher.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            hasher.update(f"dict:{len(value)};".encode())
+            for key in sorted(value, key=str):
+                self.__update_hash(hasher, key, seen)
+                self.__update_hash(hasher, value[key], seen)
+        elif isinstance(value, (set, frozenset)):
+            self.__update_hash(hasher, sorted(value, key=repr), seen)
+        elif isinstance(value, (list, tuple)):
+            hasher.update(f"{type(value).__name__}:{len(value)};".encode())
+            for item in value:
+                self.__update_hash(hasher, item, seen)
+        elif hasattr(value, "key") or hasattr(value, "components"):
+            # components, connections, flowtypes, units and the factory itself are only referenced
+            hasher.update(f"ref:{type(value).__name__}:{getattr(value, 'key', '')};".encode())
+        elif hasattr(value, "__dict__") and id(value) not in seen:
+            seen.add(id(value))
+            hasher.update(f"object:{type(value).__name__};".encode())
+            self.__update_hash(hasher, vars(value), seen)
+        else:
+            hasher.update(f"{type(value).__name__}:{value!r};".encode())
@@ -0,0 +1,278 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: ResultStore.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+
+# RESULT STORE
+
+# IMPORTS
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+
+# CODE START
+STORE_VERSION = 1  # increase whenever the layout of the stored files changes
+
+
+class ResultStore:
+    """
+    .. _ResultStore:
+        Columnar on-disk format for simulation results.
+
+        A stored simulation is a folder with the following content:
+            - manifest.json: metadata of the simulation, all scalar results and the index of the stored columns
+            - columns/*.npy: one numpy array per timeseries of the result dictionary
+            - factory.pkl, scenario.pkl: the simulated factory and scenario
+
+        Readers only touch the files they need: the manifest is a small json file and every column is memory mapped
+        when it is accessed for the first time.
+
+        Example:
+            >>> store = ResultStore("path/to/simulation.sim")
+            >>> store.metadata["date_simulated"]
+            >>> costs = store.result["objective"]
+            >>> utilization = store.result["converter_1"]["utilization"]
+    """
+
+    def __init__(self, folder: str):
+        """
+        :param folder: [str] Folder of the stored simulation
+        """
+        self.folder = Path(folder)
+        self.__manifest = None
+
+    @property
+    def manifest(self) -> dict:
+        """The content of manifest.json, read on first access"""
+        if self.__manifest is None:
+            file = self.folder / "manifest.json"
+            if not file.is_file():
+                logging.critical(f"ERROR: The given folder does not contain a stored simulation: {self.folder}")
+                raise Exception
+            with open(file, "r") as f:
+                self.__manifest = json.load(f)
+            if self.__manifest.get("version") != STORE_VERSION:
+                logging.critical(
+                    f"ERROR: The stored simulation has been written with an incompatible version of the result store"
+                )
+                raise Exception
+        return self.__manifest
+
+    @property
+    def metadata(self) -> dict:
+        """Metadata of the stored simulation (name, dates, T, info, solver statistics,...)"""
+        return self.manifest["metadata"]
+
+    @property
+    def result(self):
+        """Read only view of the result dictionary that loads columns on demand"""
+        return ResultView(self.folder, self.manifest["result"])
+
+    @property
+    def columns(self) -> list:
+        """List of all stored columns as tuples of the keys leading to them within the result dictionary"""
+        columns = []
+
+        def collect(tree, path):
+            for key, node in tree.items():
+                if isinstance(node, dict) and "__column__" in node:
+                    columns.append(path + (key,))
+                elif isinstance(node, dict):
+                    collect(node, path + (key,))
+
+        collect(self.manifest["result"], ())
+        return columns
+
+    def load_factory(self):
+        """
+        This function unpickles the factory that has been simulated
+        :return: [factory.Factory] Factory-object of the stored simulation
+        """
+        with open(self.folder / "factory.pkl", "rb") as f:
+            return pickle.load(f)
+
+    def load_scenario(self):
+        """
+        This function unpickles the scenario that has been simulated
+        :return: [simulation.Scenario] Scenario-object of the stored simulation
+        """
+        with open(self.folder / "scenario.pkl", "rb") as f:
+            return pickle.load(f)
+
+    def write(self, simulation, *, overwrite: bool = False):
+        """
+        This function writes the given simulation into the folder of the store. The folder is assembled next to its
+        final location and moved into place once it is complete, so that readers never see partially written
+        simulations.
+        :param simulation: [Simulation] Simulation to be stored
+        :param overwrite: [bool] Set True to replace an existing simulation within the folder
+        """
+        if self.folder.exists():
+            if overwrite:
+                logging.warning(f"WARNING: The specified file already exists and will be overwritten")
+            else:
+                logging.critical(f"ERROR: The specified file already exists! Saving Simulation aborted!")
+                raise Exception
+
+        self.folder.parent.mkdir(parents=True, exist_ok=True)
+        temporary_folder = Path(tempfile.mkdtemp(dir=self.folder.parent, suffix=".tmp"))
+        try:
+            (temporary_folder / "columns").mkdir()
+
+            # write all timeseries as columns and keep the scalar results within the manifest
+            column_count = 0
+
+            def write_node(value):
+                nonlocal column_count
+                if isinstance(value, Mapping):
+                    return {str(key): write_node(item) for key, item in value.items()}
+                if isinstance(value, (list, tuple)) or (isinstance(value, np.ndarray) and value.ndim > 0):
+                    column = f"columns/{column_count:05d}.npy"
+                    np.save(temporary_folder / column, np.asarray(value))
+                    column_count += 1
+                    return {"__column__": column}
+                return self.__to_json(value)
+
+            result = write_node(simulation.result) if simulation.result is not None else {}
+
+            manifest = {
+                "version": STORE_VERSION,
+                "metadata": {
+                    "name": simulation.name,
+                    "date_created": simulation.date_created,
+                    "date_simulated": simulation.date_simulated,
+                    "simulated": simulation.simulated,
+                    "T": simulation.T,
+                    "interval_length": simulation.interval_length,
+                    "problem_class": self.__to_json(simulation.problem_class),
+                    "solver_statistics": self.__to_json(simulation.solver_statistics),
+                    "info": self.__to_json(simulation.info),
+                },
+                "result": result,
+            }
+            with open(temporary_folder / "manifest.json", "w") as f:
+                json.dump(manifest, f, indent=1)
+
+            # store factory and scenario separately, so that reading results does not require to unpickle them
+            with open(temporary_folder / "factory.pkl", "wb") as f:
+                pickle.dump(simulation.factory, f)
+            with open(temporary_folder / "scenario.pkl", "wb") as f:
+                pickle.dump(simulation.scenario, f)
+
+            # move the complete folder into place
+            if self.folder.is_dir():
+                shutil.rmtree(self.folder)
+            elif self.folder.exists():
+                self.folder.unlink()
+            os.replace(temporary_folder, self.folder)
+        except BaseException:
+            shutil.rmtree(temporary_folder, ignore_errors=True)
+            raise
+
+        self.__manifest = None
+        logging.debug(f"Stored {column_count} result columns under {self.folder}")
+
+    def __to_json(self, value):
+        """
+        This function converts the given value into a json serializable representation. numpy types are converted
+        into their python equivalents, objects that can't be represented are stored by their string representation.
+        :param value: [any] value to be converted
+        :return: json serializable representation of the value
+        """
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, Mapping):
+            return {str(key): self.__to_json(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.__to_json(item) for item in value]
+        return repr(value)
+
+
+class ResultView(Mapping):
+    """
+    .. _ResultView:
+        Read only dictionary of a stored result. Nested dictionaries are returned as ResultView as well, columns are
+        memory mapped from their .npy-files on first access.
+    """
+
+    def __init__(self, folder: Path, tree: dict):
+        """
+        :param folder: [Path] Folder of the stored simulation
+        :param tree: [dict] Part of the manifest describing this level of the result dictionary
+        """
+        self.__folder = folder
+        self.__tree = tree
+        self.__loaded = {}
+
+    def __getitem__(self, key):
+        if key in self.__loaded:
+            return self.__loaded[key]
+
+        node = self.__tree[key]
+        if isinstance(node, dict) and "__column__" in node:
+            try:
+                value = np.load(self.__folder / node["__column__"], mmap_mode="r")
+            except ValueError:
+                # empty arrays can't be memory mapped
+                value = np.load(self.__folder / node["__column__"])
+        elif isinstance(node, dict):
+            value = ResultView(self.__folder, node)
+        else:
+            value = node
+
+        self.__loaded[key] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.__tree)
+
+    def __len__(self):
+        return len(self.__tree)
+
+    def to_dict(self) -> dict:
+        """
+        This function reads all columns into memory and returns the result as a regular dictionary
+        :return: [dict] Result dictionary
+        """
+        return {
+            key: value.to_dict() if isinstance(value, ResultView) else np.array(value) if isinstance(value, np.ndarray) else value
+            for key, value in self.items()
+        }
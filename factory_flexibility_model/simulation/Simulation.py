@@ -49,10 +49,12 @@
 
 # IMPORTS
 import logging
-import pickle
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from pathlib import Path
+from functools import partial
 
 import gurobipy as gp
 import numpy as np
@@ -62,6 +64,11 @@
 import factory_flexibility_model.simulation.optimization_components as oc
 from factory_flexibility_model.dash import dash as fd
 from factory_flexibility_model.io.set_logger import set_logging_level
+from factory_flexibility_model.simulation.Checkpoint import Checkpoint
+from factory_flexibility_model.simulation.CoarseGrid import CoarseGrid
+from factory_flexibility_model.simulation.ResultCache import ResultCache
+from factory_flexibility_model.simulation.ResultStore import ResultStore
+from factory_flexibility_model.simulation.TimeAggregation import TimeAggregation
 
 
 class Simulation:
@@ -79,13 +86,29 @@ def __init__(
         :param enable_time_tracking: Set to true if you want to track the time required for Simulation
         """
         # set general data for the Simulation
+        self.aggregation = None  # TimeAggregation of the simulation timeframe into representative periods. None = full timeframe
+        self.aliases = {}  # Keys of variables that are represented by the variable of a connection after the model reduction
         self.big_m = big_m
+        self.cache_key = None  # Key of the simulation result within the result cache
+        self.coarse_guidance = None  # How the solution of the coarse timeline guides the solver {"start", "fix"}. None = no multi-resolution simulation
+        self.coarse_solution = None  # Solution of the coarse timeline mapped to the original timesteps
+        self.collapsed_pools = set()  # Keys of the pools that have been collapsed by the model reduction
         self.date_simulated = "NOT_SIMULATED"
+        self.efficiency_breakpoints = None  # Number of breakpoints of piecewise linear efficiency curves. None = exact bilinear model
+        self.efficiency_tolerance = None  # Maximum deviation of piecewise linear efficiency curves from the exact curve
         self.enable_time_tracking = enable_time_tracking
+        self.constr_emission_limit = None  # Constraint of the emission limit within the current Gurobi-Model
+        self.env = None  # Gurobi-Environment used to build the models. None means the default environment
         self.factory = factory  # Variable to store the factory for the Simulation
         self.interval_length = None  # realtime length of one Simulation interval...to be taken out of the scenario
         self.info = None  # Free attribute to store additional information
+        self.lookahead = None  # Number of timesteps optimized beyond every interval in receding horizon mode
+        self.interval_state = {}  # States of the components handed over between intervals in receding horizon mode
+        self.interval_updates = []  # List of routines that write the data of a new interval into an existing model
         self.m = None  # Placeholder for the Gurobi-Model to be created
+        self.model_interval_length = None  # Number of timesteps covered by the current Gurobi-Model
+        self.model_reusable = False  # Tracks, if the current Gurobi-Model can be reused for the next interval
+        self.model_variables = None  # MVar of all variables of the current Gurobi-Model, used to read the solution at once
         self.mode = mode  # solving strategy for the simulation. {"full", "rolling"}
         self.name = name
         self.scenario = scenario  # Variable to store the scenario for the Simulation
@@ -94,10 +117,17 @@ def __init__(
             None  # Variable for storing the results of the Simulation
         )
         self.simulation_valid = None  # Is being set by self.validate_results
+        self.solution = {}  # Values of all MVars of the last solved interval
+        self.solution_objective = None  # Objective value of the last solved interval
+        self.solution_t_start = None  # First timestep of the last solved interval
+        self.solver_statistics = []  # Solver runtime and time to the first incumbent of every solved interval
         self.T = None  # To be set during Simulation
         self.time_reference_factor = None  # To be set during Simulation
+        self.variable_index = None  # Positions of all MVars within the solution vector of the current Gurobi-Model
+        self.warm_start = False  # Seed every interval with the solution of the previous interval
 
         # initialize tracking of resulting problem class
+        self.reduce_model = False  # Merge variables of the factory graph that only duplicate each other before the model is built
         self.problem_class = {
             "grade": 1,
             "type": "float",
@@ -118,6 +148,7 @@ def __collect_results(
         :param threshold: [float] Threshold under which numerical values are considered as zero
         :param rounding_decimals: [int] Number of decimals that values are rounded to
         :param interval_length: [int] length of the current simulation interval
+        :param t_start: [int] first timestep of the current simulation interval
         :return: self.results is being created
         """
 
@@ -152,26 +183,22 @@ def __collect_results(
         if rounding_decimals is None:
             rounding_decimals = 10
 
+        # determine the number of timesteps to be collected. Additional timesteps of the lookahead are discarded
+        steps = interval_length + 1
+
         # initialize counter- and summing variables:
         total_emissions = 0
         total_emission_cost = 0
+        committed_objective = 0  # costs of the collected timesteps, used as objective in receding horizon mode
+
+        # apply threshold and rounding on all variables of the solution at once
+        rounded = self.__round_solution(steps, threshold, rounding_decimals)
 
         # collect timeseries of all flows in the factory: iterate over all connections
         for connection in self.factory.connections.values():
 
-            # get the result timeseries for the current connection
-            result_i = self.MVars[connection.key].X
-
-            # apply threshold and round
-            result_i = self.__apply_threshold_and_rounding(
-                result_i, threshold, rounding_decimals
-            )
-
             # write the result into the result-dictionary
-            if first_iteration:
-                self.result[connection.key] = result_i
-            else:
-                self.result[connection.key] = np.hstack((self.result[connection.key], result_i))
+            self.__write_timeseries(self.result, connection.key, rounded[connection.key], t_start)
 
 
         # collect all Component specific timeseries: iterate over all components
@@ -182,7 +209,7 @@ def __collect_results(
                 # get the sum of the throughput as timeseries
                 utilization = sum(
                     component.inputs[input_id].weight
-                    * self.MVars[component.inputs[input_id].key].X
+                    * self.solution[component.inputs[input_id].key][0:steps]
                     for input_id in range(len(component.inputs))
                 )
 
@@ -193,96 +220,68 @@ def __collect_results(
 
                 # write the results into the result dictionary
                 if first_iteration:
-                    self.result[component.key] = {"utilization": utilization}
-                else:
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"], utilization))
+                    self.result[component.key] = {}
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
 
 
             # handle converters
             if component.type == "converter":
 
                 # get the result values, round them to the specified number of digits
-                utilization = self.MVars[f"P_{component.key}"].X
-                efficiency = self.MVars[f"Eta_{component.key}"].X
+                utilization = self.solution[f"P_{component.key}"][0:steps]
+                efficiency = self.solution[f"Eta_{component.key}"][0:steps]
 
                 if component.rampup_cost > 0:
-                    rampup_cost = round(
-                        sum(self.MVars[f"P_rampup_{component.key}"].X)
-                        * component.rampup_cost,
-                        2,
+                    rampup_cost = (
+                        sum(self.solution[f"P_rampup_{component.key}"][0:steps])
+                        * component.rampup_cost
                     )
+                    committed_objective += rampup_cost
+                    rampup_cost = round(rampup_cost, 2)
 
                 else:
                     rampup_cost = 0
 
                 if component.capacity_charge > 0:
                     capacity_charge = (
-                        self.MVars[f"P_max_{component.key}"].X
+                        max(utilization)
                         * component.capacity_charge
                         * self.interval_length
-                        * self.T
+                        * steps
                         / 8760
                     )
-                    capacity_charge = round(capacity_charge[0], 2)
+                    committed_objective += capacity_charge
+                    capacity_charge = round(capacity_charge, 2)
                 else:
                     capacity_charge = 0
 
-                # apply threshold and rounding on all values
-                utilization = self.__apply_threshold_and_rounding(
-                    utilization, threshold, rounding_decimals
-                )
-                efficiency = self.__apply_threshold_and_rounding(
-                    efficiency, threshold, rounding_decimals
-                )
+                # use the rounded values for the result-dictionary
+                utilization = rounded[f"P_{component.key}"]
+                efficiency = rounded[f"Eta_{component.key}"]
 
                 # write results into the result-dictionary
                 if first_iteration:
-                    self.result[component.key] = {
-                        "utilization": utilization,
-                        "efficiency": efficiency,
-                        "capacity_charge": capacity_charge,
-                        "rampup_cost": rampup_cost,
-                    }
-                else:
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"], utilization))
-                    self.result[component.key]["efficiency"] = np.hstack((self.result[component.key]["efficiency"], efficiency))
-                    self.result[component.key]["capacity_charge"] += capacity_charge
-                    self.result[component.key]["rampup_cost"] += rampup_cost
+                    self.result[component.key] = {"capacity_charge": 0, "rampup_cost": 0}
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
+                self.__write_timeseries(self.result[component.key], "efficiency", efficiency, t_start)
+                self.result[component.key]["capacity_charge"] += capacity_charge
+                self.result[component.key]["rampup_cost"] += rampup_cost
 
 
             # handle heatpumps
             if component.type == "heatpump":
-                # get the result values, round them to the specified number of digits
-                utilization = self.MVars[f"P_{component.key}"].X
-                input_heat = self.MVars[f"{component.input_gains.key}"].X
-                output_heat = self.MVars[f"{component.outputs[0].key}"].X
-
-
-                # apply threshold and rounding on all values
-                utilization = self.__apply_threshold_and_rounding(
-                    utilization, threshold, rounding_decimals
-                )
-                input_heat = self.__apply_threshold_and_rounding(
-                    input_heat, threshold, rounding_decimals
-                )
-
-                output_heat = self.__apply_threshold_and_rounding(
-                    output_heat, threshold, rounding_decimals
-                )
+                # get the rounded result values
+                utilization = rounded[f"P_{component.key}"]
+                input_heat = rounded[component.input_gains.key]
+                output_heat = rounded[component.outputs[0].key]
 
                 # write results into the result-dictionary
                 if first_iteration:
-                    self.result[component.key] = {
-                        "utilization": utilization,
-                        "input_electricity": utilization,
-                        "input_heat": input_heat,
-                        "output_heat": output_heat
-                    }
-                else:
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"], utilization))
-                    self.result[component.key]["input_electricity"] = np.hstack((self.result[component.key]["input_electricity"], utilization))
-                    self.result[component.key]["input_heat"] = np.hstack((self.result[component.key]["input_heat"], input_heat))
-                    self.result[component.key]["output_heat"] = np.hstack((self.result[component.key]["output_heat"], output_heat))
+                    self.result[component.key] = {}
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
+                self.__write_timeseries(self.result[component.key], "input_electricity", utilization, t_start)
+                self.__write_timeseries(self.result[component.key], "input_heat", input_heat, t_start)
+                self.__write_timeseries(self.result[component.key], "output_heat", output_heat, t_start)
 
 
             # handle sinks
@@ -293,14 +292,14 @@ def __collect_results(
                     # if yes: use the demand timeseries
                     utilization = component.demand[t_start:t_start+interval_length+1]
 
+                    # apply rounding and threshold
+                    utilization = self.__apply_threshold_and_rounding(
+                        utilization, threshold, rounding_decimals
+                    )
+
                 else:
                     # if no: use the simulation result
-                    utilization = self.MVars[f"E_{component.key}"].X
-
-                # apply rounding and threshold
-                utilization = self.__apply_threshold_and_rounding(
-                    utilization, threshold, rounding_decimals
-                )
+                    utilization = rounded[f"E_{component.key}"]
 
                 if self.factory.emission_cost is None:
                     self.factory.emission_cost = 0
@@ -308,7 +307,7 @@ def __collect_results(
                 # calculate the emissions created by the sink
                 if component.causes_emissions:
                     emissions = (
-                        utilization * component.co2_emissions_per_unit[0 : self.T]
+                        utilization * component.co2_emissions_per_unit[t_start:t_start+interval_length+1]
                     )
                     emission_cost = sum(emissions) * self.factory.emission_cost
 
@@ -319,38 +318,35 @@ def __collect_results(
 
                 else:
                     # otherwise set zeros:
-                    emissions = np.zeros(self.T)
+                    emissions = np.zeros(steps)
                     emission_cost = 0
 
                 # calculate total costs
                 if component.refundable:
-                    revenue = round(sum(utilization * component.revenue[t_start:t_start+interval_length+1]), 2)
+                    revenue = sum(utilization * component.revenue[t_start:t_start+interval_length+1])
                 else:
                     revenue = 0
 
                 if component.chargeable:
-                    cost = round(sum(utilization * component.cost[t_start:t_start+interval_length+1]), 2)
+                    cost = sum(utilization * component.cost[t_start:t_start+interval_length+1])
                 else:
                     cost = 0
 
+                committed_objective += cost - revenue
+                revenue = round(revenue, 2)
+                cost = round(cost, 2)
+
                 # write the result into the result-dictionary
                 if first_iteration:
-                    self.result[component.key] = {
-                        "utilization": utilization,
-                        "emissions": emissions,
-                        "emission_cost": emission_cost,
-                        "utilization_cost": cost - revenue,
-                    }
-                    self.result["costs"]["emission_allowances"][component.key] = emission_cost
-                    self.result["costs"]["outputs"][component.key] = cost - revenue
-
-                else:
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"], utilization))
-                    self.result[component.key]["emissions"] = np.hstack((self.result[component.key]["emissions"], emissions))
-                    self.result[component.key]["emission_cost"] += emission_cost
-                    self.result[component.key]["utilization_cost"] += (cost-revenue)
-                    self.result["costs"]["emission_allowances"][component.key] += emission_cost
-                    self.result["costs"]["outputs"][component.key] += (cost - revenue)
+                    self.result[component.key] = {"emission_cost": 0, "utilization_cost": 0}
+                    self.result["costs"]["emission_allowances"][component.key] = 0
+                    self.result["costs"]["outputs"][component.key] = 0
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
+                self.__write_timeseries(self.result[component.key], "emissions", emissions, t_start)
+                self.result[component.key]["emission_cost"] += emission_cost
+                self.result[component.key]["utilization_cost"] += (cost-revenue)
+                self.result["costs"]["emission_allowances"][component.key] += emission_cost
+                self.result["costs"]["outputs"][component.key] += (cost - revenue)
 
 
                 # add the sinks contribution to onsite/offsite demand calculation
@@ -367,14 +363,14 @@ def __collect_results(
                 if component.determined:
                     # if yes: use the given timeseries
                     utilization = component.determined_power[t_start:t_start+interval_length+1]
+                    # apply rounding and threshold
+                    utilization = self.__apply_threshold_and_rounding(
+                        utilization, threshold, rounding_decimals
+                    )
+
                 else:
                     # if no: use Simulation result
-                    utilization = self.MVars[f"E_{component.key}"].X
-
-                # apply rounding and threshold
-                utilization = self.__apply_threshold_and_rounding(
-                    utilization, threshold, rounding_decimals
-                )
+                    utilization = rounded[f"E_{component.key}"]
 
                 # calculate the emissions caused by the source
                 if component.causes_emissions:
@@ -391,49 +387,45 @@ def __collect_results(
                     total_emission_cost += emission_cost
 
                 else:
-                    emissions = np.zeros(self.T)
+                    emissions = np.zeros(steps)
                     emission_cost = 0
 
                 if component.chargeable and not component.key == "ambient_gains":
-                    cost = round(sum(component.cost[t_start:t_start+interval_length+1] * utilization), 2)
+                    cost = sum(component.cost[t_start:t_start+interval_length+1] * utilization)
+                    committed_objective += cost
+                    cost = round(cost, 2)
                 else:
                     cost = 0
 
                 # calculate occuring capacity charge if necessary
                 if component.capacity_charge > 0:
-                    capacity_charge = round(
+                    capacity_charge = (
                         max(utilization)
                         * component.capacity_charge
                         * self.interval_length
-                        * self.T
-                        / 8760,
-                        2,
+                        * steps
+                        / 8760
                     )
+                    committed_objective += capacity_charge
+                    capacity_charge = round(capacity_charge, 2)
 
                 else:
                     capacity_charge = 0
 
                 # write the result into the result-dictionary
                 if first_iteration:
-                    self.result[component.key] = {
-                        "utilization": utilization,
-                        "emissions": emissions,
-                        "emission_cost": emission_cost,
-                        "utilization_cost": cost,
-                        "capacity_charge": capacity_charge,
-                    }
-                    self.result["costs"]["emission_allowances"][component.key] = emission_cost
-                    self.result["costs"]["inputs"][component.key] = cost
-                    self.result["costs"]["capacity_provision"][component.key] = capacity_charge
-                else:
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"],utilization))
-                    self.result[component.key]["emissions"] = np.hstack((self.result[component.key]["emissions"], emissions))
-                    self.result[component.key]["emission_cost"] += emission_cost
-                    self.result[component.key]["utilization_cost"] += cost
-                    self.result[component.key]["capacity_charge"] += capacity_charge
-                    self.result["costs"]["emission_allowances"][component.key] += emission_cost
-                    self.result["costs"]["inputs"][component.key] += cost
-                    self.result["costs"]["capacity_provision"][component.key] += capacity_charge
+                    self.result[component.key] = {"emission_cost": 0, "utilization_cost": 0, "capacity_charge": 0}
+                    self.result["costs"]["emission_allowances"][component.key] = 0
+                    self.result["costs"]["inputs"][component.key] = 0
+                    self.result["costs"]["capacity_provision"][component.key] = 0
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
+                self.__write_timeseries(self.result[component.key], "emissions", emissions, t_start)
+                self.result[component.key]["emission_cost"] += emission_cost
+                self.result[component.key]["utilization_cost"] += cost
+                self.result[component.key]["capacity_charge"] += capacity_charge
+                self.result["costs"]["emission_allowances"][component.key] += emission_cost
+                self.result["costs"]["inputs"][component.key] += cost
+                self.result["costs"]["capacity_provision"][component.key] += capacity_charge
 
                 # add the sources contribution to onsite/offsite generation calculation
                 if component.is_onsite:
@@ -446,18 +438,18 @@ def __collect_results(
             elif component.type == "slack":
                 # read the result timeseries of the Simulation
                 sum_energy_pos = sum(
-                    self.MVars[i_input.key].X[0 : self.T]
+                    self.solution[i_input.key][0:steps]
                     for i_input in component.inputs
                 )
                 sum_energy_neg = sum(
-                    self.MVars[i_output.key].X[0 : self.T]
+                    self.solution[i_output.key][0:steps]
                     for i_output in component.outputs
                 )
                 utilization = sum(
-                    self.MVars[i_input.key].X[0 : self.T]
+                    self.solution[i_input.key][0:steps]
                     for i_input in component.inputs
                 ) - sum(
-                    self.MVars[i_output.key].X[0 : self.T]
+                    self.solution[i_output.key][0:steps]
                     for i_output in component.outputs
                 )
 
@@ -471,33 +463,32 @@ def __collect_results(
                 utilization = self.__apply_threshold_and_rounding(
                     utilization, threshold, rounding_decimals
                 )
+                committed_objective += sum(
+                    component.cost[t_start:t_start+interval_length+1]
+                    * (sum_energy_pos + sum_energy_neg)
+                )
 
                 # write the results to the result dictionary
                 if first_iteration:
-                    self.result[component.key] = {
-                        "EPos": sum_energy_pos,
-                        "ENeg": sum_energy_neg,
-                        "utilization": utilization,
-                    }
-                    self.result["costs"]["slacks"][component.key] = (sum(utilization) * 1000000000)
-                else:
-                    self.result[component.key]["EPos"] += sum_energy_pos
-                    self.result[component.key]["ENeg"] += sum_energy_neg
-                    self.result[component.key]["utilization"]+= utilization
-                    self.result["costs"]["slacks"][component.key] += (sum(utilization) * 1000000000)
+                    self.result[component.key] = {}
+                    self.result["costs"]["slacks"][component.key] = 0
+                self.__write_timeseries(self.result[component.key], "EPos", sum_energy_pos, t_start)
+                self.__write_timeseries(self.result[component.key], "ENeg", sum_energy_neg, t_start)
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
+                self.result["costs"]["slacks"][component.key] += (sum(utilization) * 1000000000)
 
 
             # handle storages
             elif component.type == "storage":
                 # read the result timeseries from the Simulation
                 power_charge = (
-                    self.MVars[component.inputs[0].key].X / self.interval_length
+                    self.solution[component.inputs[0].key][0:steps] / self.interval_length
                 )
                 power_discharge = (
-                    self.MVars[component.outputs[0].key].X / self.interval_length
+                    self.solution[component.outputs[0].key][0:steps] / self.interval_length
                 )
-                soc = self.MVars[f"SOC_{component.key}"].X
-                soc_start = self.MVars[f"SOC_{component.key}_start"].X
+                soc = rounded[f"SOC_{component.key}"]
+                soc_start = self.solution[f"SOC_{component.key}_start"]
 
                 # apply rounding and threshold
                 power_charge = self.__apply_threshold_and_rounding(
@@ -506,9 +497,6 @@ def __collect_results(
                 power_discharge = self.__apply_threshold_and_rounding(
                     power_discharge, threshold, rounding_decimals
                 )
-                soc = self.__apply_threshold_and_rounding(
-                    soc, threshold, rounding_decimals
-                )
                 soc_start = self.__apply_threshold_and_rounding(
                     soc_start, threshold, rounding_decimals
                 )
@@ -517,14 +505,15 @@ def __collect_results(
 
                 # calculate occuring capacity charge if necessary
                 if component.capacity_charge > 0:
-                    capacity_charge = round(
+                    capacity_charge = (
                         soc_max
                         * component.capacity_charge
                         * self.interval_length
-                        * self.T
-                        / 8760,
-                        2,
+                        * steps
+                        / 8760
                     )
+                    committed_objective += capacity_charge
+                    capacity_charge = round(capacity_charge, 2)
 
                 else:
                     capacity_charge = 0
@@ -532,88 +521,52 @@ def __collect_results(
                 # write the results to the result dictionary
                 if first_iteration:
                     self.result[component.key] = {
-                        "Pcharge": power_charge,
-                        "Pdischarge": power_discharge,
-                        "SOC": soc,
-                        "utilization": power_discharge - power_charge,
                         "SOC_start": soc_start,
                         "soc_max": soc_max,
-                        "capacity_charge": capacity_charge,
+                        "capacity_charge": 0,
                     }
-                    self.result["costs"]["capacity_provision"][component.key] = capacity_charge
-                else:
-                    self.result[component.key]["Pcharge"] = np.hstack((self.result[component.key]["Pcharge"], power_charge))
-                    self.result[component.key]["Pdischarge"] = np.hstack((self.result[component.key]["Pdischarge"], power_discharge))
-                    self.result[component.key]["SOC"] = np.hstack((self.result[component.key]["SOC"], soc))
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"], power_discharge - power_charge))
-                    self.result[component.key]["soc_max"] = max(soc_max,self.result[component.key]["soc_max"])
-                    self.result[component.key]["capacity_charge"] += capacity_charge
-                    self.result["costs"]["capacity_provision"][component.key] += capacity_charge
+                    self.result["costs"]["capacity_provision"][component.key] = 0
+                self.__write_timeseries(self.result[component.key], "Pcharge", power_charge, t_start)
+                self.__write_timeseries(self.result[component.key], "Pdischarge", power_discharge, t_start)
+                self.__write_timeseries(self.result[component.key], "SOC", soc, t_start)
+                self.__write_timeseries(self.result[component.key], "utilization", power_discharge - power_charge, t_start)
+                self.result[component.key]["soc_max"] = max(soc_max, self.result[component.key]["soc_max"])
+                self.result[component.key]["capacity_charge"] += capacity_charge
+                self.result["costs"]["capacity_provision"][component.key] += capacity_charge
 
 
             # handle schedulers
             elif component.type == "schedule":
-                # read the result timeseries from the Simulation
-                utilization = self.MVars[f"E_{component.key}_in"].X
-                availability = self.MVars[f"X_{component.key}_availability"]
-
-                # apply rounding and threshold
-                utilization = self.__apply_threshold_and_rounding(
-                    utilization, threshold, rounding_decimals
-                )
-                availability = self.__apply_threshold_and_rounding(
-                    availability, threshold, rounding_decimals
-                )
+                # read the rounded result timeseries
+                utilization = rounded[f"E_{component.key}_in"]
+                availability = rounded[f"X_{component.key}_availability"]
 
-                # write the results to the result dictionary
+                # write the results to the result dictionary. The matrices of the intervals are stored as blocks and
+                # combined into a block diagonal matrix once all intervals have been collected
                 if first_iteration:
-                    self.result[component.key] = {
-                        "utilization": utilization,
-                        "availability": availability,
-                    }
-                else:
-                    # combine the utilization matrices
-                    rows_old, cols_old = self.result[component.key]["utilization"].shape
-                    rows_new, cols_new = utilization.shape
-                    utilization_new = np.full((rows_old+rows_new, cols_old+cols_new), np.nan)
-                    utilization_new[:rows_old, :cols_old] = self.result[component.key]["utilization"]
-                    utilization_new[rows_old:, cols_old:] = utilization
-                    self.result[component.key]["utilization"] = utilization_new
-
-                    # combine the availability matrices
-                    rows_old, cols_old = self.result[component.key]["availability"].shape
-                    rows_new, cols_new = availability.shape
-                    availability_new = np.full((rows_old+rows_new, cols_old+cols_new), 0.)
-                    availability_new[:rows_old, :cols_old] = self.result[component.key]["availability"]
-                    availability_new[rows_old:, cols_old:] = availability
-                    self.result[component.key]["availability"] = availability_new
+                    self.result[component.key] = {"utilization": [], "availability": []}
+                self.result[component.key]["utilization"].append(utilization)
+                self.result[component.key]["availability"].append(availability)
 
             # handle thermalsystems
             elif component.type == "thermalsystem":
                 # read the result timeseries from the Simulation
                 utilization = (
-                    self.MVars[f"E_{component.key}_in"].X
-                    - self.MVars[f"E_{component.key}_out"].X
+                    self.solution[f"E_{component.key}_in"][0:steps]
+                    - self.solution[f"E_{component.key}_out"][0:steps]
                 )
-                temperature = self.MVars[f"T_{component.key}"].X
+                temperature = rounded[f"T_{component.key}"]
 
                 # apply rounding and threshold
                 utilization = self.__apply_threshold_and_rounding(
                     utilization, threshold, rounding_decimals
                 )
-                temperature = self.__apply_threshold_and_rounding(
-                    temperature, threshold, rounding_decimals
-                )
 
                 # write the results to the result dictionary
                 if first_iteration:
-                    self.result[component.key] = {
-                        "utilization": utilization,
-                        "temperature": temperature,
-                    }
-                else:
-                    self.result[component.key]["utilization"] = np.hstack((self.result[component.key]["utilization"], utilization))
-                    self.result[component.key]["temperature"] = np.hstack((self.result[component.key]["temperature"], temperature))
+                    self.result[component.key] = {}
+                self.__write_timeseries(self.result[component.key], "utilization", utilization, t_start)
+                self.__write_timeseries(self.result[component.key], "temperature", temperature, t_start)
 
 
             # handle triggerdemand
@@ -621,39 +574,70 @@ def __collect_results(
                 pass
                 # TODO: write result collection for triggerdemands
 
-        if first_iteration:
-            # calculate self sufficiency
-            if self.result["energy_generated_onsite"] > 0:
-                self.result["self_sufficiency"] = self.result["energy_generated_onsite"] / (self.result["energy_generated_onsite"] + self.result["energy_generated_offsite"])
-            else:
-                self.result["self_sufficiency"] = 0
-
-            # collect achieved costs/revenues (objective of target function - ambient_gain_punishment_term)
-            if "ambient_gains" in self.factory.components:
-                self.result["objective"] = self.m.objVal - sum(
-                    self.result["ambient_gains"]["utilization"]
-                    * self.factory.components["ambient_gains"].cost[t_start:t_start+interval_length+1]
-                )
-            else:
-                self.result["objective"] = self.m.objVal
+        # collect achieved costs/revenues
+        if self.lookahead is not None or self.aggregation is not None:
+            # in receding horizon mode only the costs of the collected timesteps are counted, the lookahead is discarded.
+            # Aggregated simulations are evaluated on the expanded timeseries instead of the weighted objective
+            interval_objective = committed_objective + total_emission_cost
+        elif "ambient_gains" in self.factory.components:
+            # objective of target function - ambient_gain_punishment_term
+            interval_objective = self.solution_objective - sum(
+                self.result["ambient_gains"]["utilization"][t_start:t_start+interval_length+1]
+                * self.factory.components["ambient_gains"].cost[t_start:t_start+interval_length+1]
+            )
+        else:
+            interval_objective = self.solution_objective
 
-            # write the total emission values to the result-dictionary
-            self.result["total_emissions"] = total_emissions
-            self.result["total_emission_cost"] = total_emission_cost
+        if first_iteration:
+            self.result["objective"] = 0
+            self.result["total_emission_cost"] = 0
 
+        # calculate self sufficiency
+        if self.result["energy_generated_onsite"] > 0:
+            self.result["self_sufficiency"] = self.result["energy_generated_onsite"] / (self.result["energy_generated_onsite"] + self.result["energy_generated_offsite"])
         else:
-            # collect achieved costs/revenues (objective of target function - ambient_gain_punishment_term)
-            if "ambient_gains" in self.factory.components:
-                self.result["objective"] += self.m.objVal - sum(
-                    self.result["ambient_gains"]["utilization"][t_start:t_start+interval_length+1]
-                    * self.factory.components["ambient_gains"].cost[t_start:t_start+interval_length+1]
-                )
-            else:
-                self.result["objective"] += self.m.objVal
+            self.result["self_sufficiency"] = 0
 
-            # add the emission values of the interval to the counters in the result-dictionary
-            self.result["total_emissions"] = np.hstack((self.result["total_emissions"], total_emissions))
-            self.result["total_emission_cost"] += total_emission_cost
+        self.result["objective"] += interval_objective
+
+        # add the emission values of the interval to the counters in the result-dictionary
+        self.__write_timeseries(self.result, "total_emissions", total_emissions + np.zeros(steps), t_start)
+        self.result["total_emission_cost"] += total_emission_cost
+
+    def __finalize_results(self):
+        """
+        This function combines the results that are collected blockwise during rolling simulations after all intervals
+        have been collected: The utilization and availability matrices of the schedules of all intervals are combined
+        into block diagonal matrices (timesteps x demands).
+        """
+        for component in self.factory.components.values():
+            if component.type == "schedule" and isinstance(self.result[component.key]["utilization"], list):
+                for field, fill_value in [("utilization", np.nan), ("availability", 0.0)]:
+                    blocks = self.result[component.key][field]
+                    matrix = np.full(
+                        (sum(block.shape[0] for block in blocks), sum(block.shape[1] for block in blocks)),
+                        fill_value,
+                    )
+                    row, column = 0, 0
+                    for block in blocks:
+                        matrix[row:row + block.shape[0], column:column + block.shape[1]] = block
+                        row += block.shape[0]
+                        column += block.shape[1]
+                    self.result[component.key][field] = matrix
+
+    def __write_timeseries(self, result, field, values, t_start):
+        """
+        This function writes the values of the current interval into the result timeseries of the given field. The
+        timeseries are allocated for the whole simulation timeframe when the first interval is collected, so that
+        every interval is written at its offset without reallocating the results.
+        :param result: [dict] Result dictionary that holds the timeseries
+        :param field: [str] Key of the timeseries within the result dictionary
+        :param values: [np.array] Values of the current interval
+        :param t_start: [int] first timestep of the current interval
+        """
+        if field not in result:
+            result[field] = np.zeros(self.T)
+        result[field][t_start:t_start + len(values)] = values
 
 
     def create_dash(self, authentication = None) -> object:
@@ -681,8 +665,10 @@ def __read_scenario_data(self):
 
     def save(self, file_path: str, *, name: str = None, overwrite: bool = False):
         """
-        This function saves a Simulation-object under the specified filepath as a single file.
-        :param file_path: [string] Path to the file to be created
+        This function saves a Simulation-object under the specified filepath in the columnar format of the ResultStore:
+        A folder "*name*.sim" containing a json manifest with metadata and scalar results, one .npy-file per result
+        timeseries and the pickled factory and scenario.
+        :param file_path: [string] Path to the folder that the simulation is saved in
         :param name: [sring] Option to give the saved simulation a specific name
         :param override: [boolean] Set True to allow the method to overwrite existing files.
         Otherwise an error will occur when trying to overwrite a file
@@ -691,34 +677,12 @@ def save(self, file_path: str, *, name: str = None, overwrite: bool = False):
 
         # create the filename
         if name is None:
-            filename = rf"{file_path}\{self.name} ({self.date_simulated}).sim"
+            filename = os.path.join(file_path, f"{self.name} ({self.date_simulated}).sim")
         else:
-            filename = rf"{file_path}\{name}.sim"
-
-        # check, if file already exists
-        file = Path(filename)
-        if file.is_file():
-            if overwrite:
-                logging.warning(
-                    f"WARNING: The specified file already exists and will be overwritten"
-                )
-            else:
-                logging.critical(
-                    f"ERROR: The specified file already exists! Saving Factory aborted!"
-                )
-                raise Exception
+            filename = os.path.join(file_path, f"{name}.sim")
 
-        # create a copy of the Simulation without the gurobi_model
-        simulation_data = self
-        simulation_data.m = []
-        simulation_data.MVars = []
-        simulation_data.C_objective = []
-        simulation_data.R_objective = []
-        simulation_data.emission_sources = []
-
-        # save the factory at the given path
-        with open(filename, "wb") as f:
-            pickle.dump(simulation_data, f)
+        # write the simulation into a result store at the given path
+        ResultStore(filename).write(self, overwrite=overwrite)
 
         logging.info(f"SIMULATION SAVED under{filename}")
 
@@ -749,18 +713,54 @@ def set_scenario(self, scenario):
     def simulate(
         self,
         *,
+        aggregation_period_length: int = 24,
+        aggregation_periods: int = None,
+        cache: bool = False,
+        cache_folder: str = None,
+        cache_size: float = 1000,
+        checkpoint_folder: str = None,
+        coarse_factor: int = None,
+        coarse_guidance: str = "start",
+        efficiency_breakpoints: int = None,
+        efficiency_tolerance: float = 0.001,
         interval_length: int = None,
+        lookahead: int = None,
+        reduce_model: bool = False,
+        resume: bool = False,
         rounding_decimals: int = None,
+        reuse_model: bool = False,
         solver_config: dict = {},
         threshold: float = None,
+        validate_aggregation: bool = False,
+        validate_coarse: bool = False,
+        warm_start: bool = False,
+        workers: int = None,
     ):
         """
         This function manages the simulation. It prepares the necessary data, splits the simulation into rolling intervals and collects the results.
 
+        :param aggregation_period_length: [int] Number of timesteps of one period of the time aggregation (24 = days for hourly timesteps)
+        :param aggregation_periods: [int] Set to solve the simulation on this number of representative periods instead of the whole timeframe. The periods are selected by clustering all timeseries of the factory, storages are linked across the periods and the results are expanded back to the whole timeframe (see TimeAggregation). None solves the whole timeframe
+        :param cache: [bool] Set True to enable the result cache: The result is loaded from the cache if the same factory/scenario-combination has already been simulated with the same settings, and stored in the cache after solving
+        :param cache_folder: [str] Folder of the result cache. Defaults to ~/.factory_flexibility_model/result_cache
+        :param cache_size: [float] Maximum size of the result cache in MB. The least recently used results are removed when it is exceeded
+        :param checkpoint_folder: [str] Folder to write the solution of every finished interval to. The checkpoints are removed once the simulation has been completed
+        :param coarse_factor: [int] Set to solve the factory on a coarse timeline first, on which this number of timesteps is combined into one timestep. The coarse solution (storage trajectories, on/off patterns, timing of triggerdemands) guides the solver on the original timeline, see coarse_guidance. None solves the original timeline directly
+        :param coarse_guidance: [str] How the coarse solution guides the solver: "start" hands the binary/integer variables over as MIP start and the continuous variables as hints (gurobi only), "fix" fixes the binary/integer variables to the coarse solution. If the fixings are infeasible, the interval is solved again without them
+        :param efficiency_breakpoints: [int] Set to model the output of converters with variable efficiency by a piecewise linear approximation of the efficiency curve with at least this number of breakpoints instead of the exact bilinear formulation. This keeps the problem a MILP. None uses the exact model
+        :param efficiency_tolerance: [float] Maximum deviation of the efficiency resulting from the piecewise linear approximation from the exact efficiency curve. Additional breakpoints are inserted where necessary
         :param interval_length: [int] Length of individually solved intervals during rolling optimization. A value of None means, that the whole simulation is solved at once.
+        :param lookahead: [int] Number of additional timesteps that are optimized beyond every interval without being committed. Specifying a lookahead (including 0) enables the receding horizon mode, in which the states of storages, thermalsystems, converters, deadtimes, schedules, triggerdemands and sink limits at the end of an interval are handed over to the next interval as initial conditions.
+        :param reduce_model: [bool] Set True to reduce the size of the optimization problem before it is built: Pools with a single input and output are collapsed and the total in-/outflows of sinks, sources and thermalsystems that duplicate a single connection are represented by the variable of that connection. The result is not affected
+        :param resume: [bool] Set True to continue an aborted simulation: Intervals with a checkpoint in checkpoint_folder are restored instead of being solved again
         :param rounding_decimals: [int] Number of decimals that the results are rounded to
-        :param solver_config: [dict] Optional dict with configuration parameters for the solver (max_solver_time, barrier_tolerance, solver_method, logger_level)
+        :param reuse_model: [bool] Set True to build the optimization problem only once and just update the timeseries data for subsequent intervals of the same length during rolling optimization
+        :param solver_config: [dict] Optional dict with configuration parameters for the solver (solver ("gurobi" or "highs"), max_solver_time, mip_gap, barrier_tolerance, solver_method, threads, log_solver, logger_level)
         :param threshold: [float] Threshold under whoch results are interpreted as zero
+        :param validate_aggregation: [bool] Set True to additionally solve the whole timeframe of an aggregated simulation and report the deviation of the objective under result["aggregation"]
+        :param validate_coarse: [bool] Set True to additionally solve a multi-resolution simulation without the coarse timeline and report the deviation of the objective and the runtimes under result["multiresolution"]
+        :param warm_start: [bool] Set True to seed the binary/integer variables (as MIP start) and the continuous variables (as hints) of every rolling interval with the shifted solution of the previously solved interval
+        :param workers: [int] Number of worker processes that solve the rolling intervals concurrently. Each worker uses its own gurobi environment and, unless specified in solver_config, an equal share of the available cores as thread budget. Not available in receding horizon mode, since the intervals depend on each other there.
         :return: [True] -> Adds an attribute .result to the Simulation object
         """
 
@@ -813,6 +813,50 @@ def simulate(
             logging.warning(f"The given simulation interval length ({interval_length}) is greater than the total number of simulation timesteps ({self.T}). The simulation will be solved in one run.")
             interval_length = self.T
 
+        if lookahead is not None and lookahead < 0:
+            logging.critical(f"ERROR: The lookahead of the simulation must not be negative (given: {lookahead})")
+            raise Exception
+        self.lookahead = lookahead
+
+        if workers is not None and workers > 1 and lookahead is not None:
+            logging.critical(f"ERROR: Intervals of a receding horizon simulation depend on each other and cannot be solved in parallel. Specify either workers or lookahead")
+            raise Exception
+
+        if efficiency_breakpoints is not None and (efficiency_breakpoints < 2 or efficiency_tolerance <= 0):
+            logging.critical(f"ERROR: A piecewise linear efficiency curve requires at least 2 breakpoints and a positive tolerance (given: {efficiency_breakpoints} breakpoints, tolerance {efficiency_tolerance})")
+            raise Exception
+        self.efficiency_breakpoints = efficiency_breakpoints
+        self.efficiency_tolerance = efficiency_tolerance
+
+        if aggregation_periods is not None:
+            if aggregation_periods < 1 or aggregation_period_length < 1:
+                logging.critical(f"ERROR: The time aggregation requires at least one representative period of at least one timestep (given: {aggregation_periods} periods of {aggregation_period_length} timesteps)")
+                raise Exception
+            if interval_length < self.T or lookahead is not None or checkpoint_folder is not None:
+                logging.critical(f"ERROR: An aggregated simulation is solved in one run and can not be combined with interval_length, lookahead or checkpoint_folder")
+                raise Exception
+            for component in self.factory.components.values():
+                if component.type in ["schedule", "triggerdemand"]:
+                    logging.critical(f"ERROR: The demands of {component.type} {component.name} refer to timesteps of the whole timeframe and can not be aggregated into representative periods")
+                    raise Exception
+            self.aggregation = TimeAggregation(self.factory, self.T, aggregation_periods, aggregation_period_length)
+        else:
+            self.aggregation = None
+
+        if coarse_factor is not None:
+            if coarse_factor < 2 or coarse_guidance not in ["start", "fix"]:
+                logging.critical(f"ERROR: A multi-resolution simulation requires a coarse_factor of at least 2 and coarse_guidance 'start' or 'fix' (given: {coarse_factor}, '{coarse_guidance}')")
+                raise Exception
+            if self.aggregation is not None:
+                logging.critical(f"ERROR: A simulation can either be aggregated into representative periods or solved on multiple resolutions")
+                raise Exception
+        self.coarse_guidance = coarse_guidance if coarse_factor is not None else None
+        self.coarse_solution = None
+
+        if resume and checkpoint_folder is None:
+            logging.critical(f"ERROR: A simulation can only be resumed if a checkpoint_folder is specified")
+            raise Exception
+
         # determine number of required simulation intervals using integer division
         num_of_intervals = int(self.T//interval_length)
 
@@ -820,22 +864,139 @@ def simulate(
         if self.T % interval_length > 0:
             num_of_intervals += 1
 
-        # start iteration
+        # make sure that no model, state or solution of a previous simulation run is being reused
+        self.model_reusable = False
+        self.model_interval_length = None
+        self.interval_state = {}
+        self.solution = {}
+        self.solution_t_start = None
+        self.solver_statistics = []
+        self.warm_start = warm_start
+        self.reduce_model = reduce_model
+
+        # determine first and last timestep of every interval
+        intervals = []
         for interval in range(num_of_intervals):
-            # determine first and last timestep of the current interval
             t_start = int(interval * interval_length)
             t_end = int(t_start + interval_length - 1)
             # make sure, that t_end is no later than the last valid timestep of the simulation task
             if t_end > self.T-1:
                 t_end = self.T-1
+            intervals.append((t_start, t_end))
+
+        # look up the result in the cache. The key of the cache also identifies the checkpoints of the simulation
+        cached = None
+        if cache or checkpoint_folder is not None:
+            result_cache = ResultCache(folder=cache_folder, max_size=cache_size)
+            self.cache_key = result_cache.get_key(
+                self,
+                {
+                    "aggregation": (aggregation_periods, aggregation_period_length) if aggregation_periods is not None else None,
+                    "coarse": (coarse_factor, coarse_guidance) if coarse_factor is not None else None,
+                    "efficiency_breakpoints": efficiency_breakpoints,
+                    "efficiency_tolerance": efficiency_tolerance if efficiency_breakpoints is not None else None,
+                    "interval_length": interval_length,
+                    "lookahead": lookahead,
+                    "reduce_model": reduce_model,
+                    "rounding_decimals": rounding_decimals,
+                    "solver_config": {
+                        key: value
+                        for key, value in solver_config.items()
+                        if key not in ["log_solver", "logger_level", "threads"]
+                    },
+                    "threshold": threshold,
+                    "warm_start": warm_start,
+                },
+            )
+        if cache:
+            cached = result_cache.load(self.cache_key)
+
+        # prepare the checkpoints of the finished intervals
+        checkpoint = None
+        if checkpoint_folder is not None and cached is None:
+            checkpoint = Checkpoint(folder=checkpoint_folder, key=self.cache_key)
+            if not resume:
+                checkpoint.clear()
+
+        # solve the coarse timeline of a multi-resolution simulation first to guide the solver on the original timeline
+        if cached is None and coarse_factor is not None:
+            logging.info(f"Simulating the coarse timeline ({coarse_factor} timesteps per coarse timestep)")
+            multiresolution = self.__solve_coarse_grid(CoarseGrid(self.factory, self.T, coarse_factor), solver_config)
+
+        if cached is not None:
+            logging.info(f"Result loaded from the cache ({self.cache_key})")
+            self.result = cached["result"]
+            self.problem_class = cached["problem_class"]
+        elif self.aggregation is not None:
+            # solve the representative periods and expand the results to the whole timeframe
+            logging.info(f"Simulating {len(self.aggregation.medoids)} representative periods")
+            self.__simulate_aggregated(solver_config, threshold, rounding_decimals)
+        elif workers is not None and workers > 1 and num_of_intervals > 1:
+            # solve the intervals concurrently
+            self.__simulate_intervals_parallel(intervals, workers, solver_config, threshold, rounding_decimals, reuse_model, checkpoint)
+        else:
+            # start iteration
+            for interval, (t_start, t_end) in enumerate(intervals):
+                # extend the optimized timeframe by the lookahead, the additional timesteps are not committed
+                t_horizon = t_end
+                if lookahead is not None:
+                    t_horizon = min(t_end + lookahead, self.T - 1)
+
+                # Call simulation routine for current interval
+                logging.info(f"Simulating Interval {interval+1} [{t_start+1} : {t_end+1}]")
+                self.__simulate_interval(t_start, t_horizon, solver_config, threshold, rounding_decimals, reuse_model, t_end - t_start + 1, checkpoint, interval)
+
+        # combine the blockwise collected results
+        if cached is None:
+            self.__finalize_results()
+
+        # report the coarse timeline of a multi-resolution simulation
+        if cached is None and coarse_factor is not None:
+            multiresolution["fine_runtime"] = sum(statistics["runtime"] for statistics in self.solver_statistics)
+            self.result["multiresolution"] = multiresolution
+
+        # compare the aggregated or multi-resolution simulation with a simulation of the original problem
+        reference_config = {
+            "cache": cache,
+            "cache_folder": cache_folder,
+            "cache_size": cache_size,
+            "efficiency_breakpoints": efficiency_breakpoints,
+            "efficiency_tolerance": efficiency_tolerance,
+            "reduce_model": reduce_model,
+            "rounding_decimals": rounding_decimals,
+            "solver_config": solver_config,
+            "threshold": threshold,
+        }
+        if validate_aggregation and self.aggregation is not None and "objective_full" not in self.result["aggregation"]:
+            self.__compare_with_reference(self.result["aggregation"], reference_config, "the whole timeframe")
+            logging.info(
+                f"Objective of the aggregated simulation deviates by {self.result['aggregation']['objective_deviation']:.2%} from the simulation of the whole timeframe"
+            )
+        if validate_coarse and coarse_factor is not None and "objective_full" not in self.result["multiresolution"]:
+            reference_config.update(
+                {
+                    "interval_length": interval_length,
+                    "lookahead": lookahead,
+                    "reuse_model": reuse_model,
+                    "warm_start": warm_start,
+                }
+            )
+            self.__compare_with_reference(self.result["multiresolution"], reference_config, "the original timeline only")
+            logging.info(
+                f"Objective of the multi-resolution simulation deviates by {self.result['multiresolution']['objective_deviation']:.2%} from the simulation of the original timeline only"
+            )
 
-            # Call simulation routine for current interval
-            logging.info(f"Simulating Interval {interval+1} [{t_start+1} : {t_end+1}]")
-            self.__simulate_interval(t_start, t_end, solver_config, threshold, rounding_decimals)
+        # store the result in the cache if all intervals have been solved to optimality
+        if cache and cached is None and all(statistics["status"] == "optimal" for statistics in self.solver_statistics):
+            result_cache.store(self.cache_key, {"result": self.result, "problem_class": self.problem_class})
 
         # validate results
         self.__validate_results()
 
+        # the checkpoints are not required anymore once the simulation has been completed
+        if checkpoint is not None:
+            checkpoint.clear()
+
         # mark Simulation as solved
         self.simulated = True
         logging.info(" -> Simulation solved")
@@ -845,19 +1006,438 @@ def simulate(
             )
 
 
-    def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding_decimals):
+    def __compare_with_reference(self, summary, reference_config, description):
+        """
+        This function simulates the factory again with the given configuration as a reference and writes the
+        objective and runtime of the reference as well as the relative deviation of the objective into the summary.
+
+        :param summary: [dict] Summary within the result of the simulation that the comparison is written to
+        :param reference_config: [dict] Keyword arguments for simulate() of the reference simulation
+        :param description: [str] Description of the reference simulation
+        """
+        reference = Simulation(factory=self.factory, scenario=self.scenario, name=f"{self.name} ({description})")
+        reference.simulate(**reference_config)
+        summary["objective_full"] = reference.result["objective"]
+        summary["objective_deviation"] = (
+            self.result["objective"] - reference.result["objective"]
+        ) / max(abs(reference.result["objective"]), 1e-9)
+        summary["runtime_full"] = sum(statistics["runtime"] for statistics in reference.solver_statistics)
+
+    def __simulate_aggregated(self, solver_config, threshold, rounding_decimals):
+        """
+        This function solves the representative periods of an aggregated simulation and collects the results for the
+        whole timeframe. The optimization problem is built for a copy of the factory that only covers the
+        representative periods, the solution is expanded and collected for a copy of the factory in which every period
+        uses the timeseries of its representative period. The factory of the simulation itself remains unchanged.
+
+        :param solver_config: [dict] Configuration parameters for the solver
+        :param threshold: [float] Threshold under which results are interpreted as zero
+        :param rounding_decimals: [int] Number of decimals that the results are rounded to
+        """
+        factory = self.factory
+        timesteps = self.T
+        try:
+            # SOLVE THE REPRESENTATIVE PERIODS
+            self.factory = self.aggregation.get_representative_factory()
+            self.T = self.aggregation.timesteps
+            self.solve_interval(0, self.T - 1, solver_config)
+
+            # COLLECT THE RESULTS FOR THE WHOLE TIMEFRAME
+            self.T = timesteps
+            self.solution = self.aggregation.expand_solution(self.solution)
+            self.factory = self.aggregation.get_expanded_factory()
+            self.__collect_results(threshold=threshold, rounding_decimals=rounding_decimals, interval_length=self.T - 1, t_start=0)
+        finally:
+            self.factory = factory
+            self.T = timesteps
+
+        self.result["aggregation"] = self.aggregation.get_summary()
+
+    def __solve_coarse_grid(self, coarse_grid, solver_config):
+        """
+        This function solves the factory on the coarse timeline of a multi-resolution simulation at once and stores
+        the solution mapped to the original timeline in simulation.coarse_solution, where it guides the solver during
+        solve_interval(). If the coarse timeline cannot be solved the simulation continues without guidance.
+
+        :param coarse_grid: [CoarseGrid] Coarse timeline of the simulation
+        :param solver_config: [dict] Configuration parameters for the solver
+        :return: [dict] Summary of the coarse simulation
+        """
+        factory = self.factory
+        timesteps = self.T
+        interval_length = self.interval_length
+        time_reference_factor = self.time_reference_factor
+        summary = {
+            "coarse_factor": coarse_grid.factor,
+            "guidance": self.coarse_guidance,
+            "coarse_objective": None,
+            "coarse_runtime": None,
+        }
+        try:
+            # every coarse timestep covers coarse_grid.factor timesteps of the original timeline
+            self.factory = coarse_grid.get_coarse_factory()
+            self.T = coarse_grid.timesteps
+            self.interval_length = interval_length * coarse_grid.factor
+            self.time_reference_factor = time_reference_factor * coarse_grid.factor
+            self.solve_interval(0, self.T - 1, solver_config)
+
+            statistics = self.solver_statistics.pop()
+            summary["coarse_objective"] = self.solution_objective
+            summary["coarse_runtime"] = statistics["runtime"]
+            self.coarse_solution = coarse_grid.refine_solution(self.solution)
+        except Exception:
+            logging.warning("The coarse timeline could not be solved, the simulation continues without guidance")
+            self.coarse_solution = None
+        finally:
+            self.factory = factory
+            self.T = timesteps
+            self.interval_length = interval_length
+            self.time_reference_factor = time_reference_factor
+
+        # the model of the coarse timeline cannot be reused for the original timeline
+        self.m = None
+        self.model_reusable = False
+        self.solution = {}
+        self.solution_t_start = None
+        return summary
+
+    def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding_decimals, reuse_model=False, committed_steps=None, checkpoint=None, interval=None):
         """
         This function builds and solves an optimization problem for a specific interval of the simulation timeframe. It is being called from the simulation.simulate() function.
 
         :param t_start: [int] first timestep of the simulation interval to solve
         :param t_end: [int] last timestep of the simulation interval to solve
+        :param reuse_model: [bool] Set True to reuse the model of the previous interval if it covers the same number of timesteps
+        :param committed_steps: [int] Number of timesteps at the beginning of the interval that are committed to the results. Defaults to the whole interval
+        :param checkpoint: [Checkpoint] Store to restore the solution of the interval from or to write it to after solving
+        :param interval: [int] Number of the interval within the checkpoint
+        """
+        if committed_steps is None:
+            committed_steps = t_end - t_start + 1
+
+        # RESTORE THE SOLUTION FROM A PREVIOUS RUN OR BUILD AND SOLVE THE OPTIMIZATION PROBLEM
+        entry = None
+        if checkpoint is not None:
+            entry = checkpoint.load(interval, t_start, t_end)
+        if entry is not None:
+            logging.info(f"Solution of interval {interval+1} restored from checkpoint")
+            self.__restore_interval(entry)
+        else:
+            self.solve_interval(t_start, t_end, solver_config, reuse_model)
+            if checkpoint is not None:
+                checkpoint.store(interval, self.__get_interval_checkpoint(t_start, t_end))
+
+        # COLLECT THE RESULTS
+        self.__collect_results(threshold=threshold, rounding_decimals=rounding_decimals, interval_length=committed_steps-1, t_start=t_start)
+
+        # HAND OVER THE STATES TO THE NEXT INTERVAL
+        if self.lookahead is not None:
+            self.__update_interval_state(t_start, committed_steps)
+
+    def __get_interval_checkpoint(self, t_start, t_end, solution=None, objective=None, problem_class=None, statistics=None):
+        """
+        This function assembles the checkpoint of a solved interval. Without arguments the current solution of the simulation is used.
+
+        :param t_start: [int] first timestep of the solved interval
+        :param t_end: [int] last timestep of the solved interval
+        :return: [dict] Everything required to collect the results of the interval without solving it again
+        """
+        return {
+            "t_start": t_start,
+            "t_end": t_end,
+            "solution": self.solution if solution is None else solution,
+            "solution_objective": self.solution_objective if objective is None else objective,
+            "problem_class": self.problem_class if problem_class is None else problem_class,
+            "statistics": self.solver_statistics[-1] if statistics is None else statistics,
+        }
+
+    def __store_finished_interval(self, checkpoint, interval, t_start, t_end, solution):
+        """
+        This function writes the checkpoint of an interval that has been solved by a worker process. It is called as soon as the worker is finished.
+
+        :param checkpoint: [Checkpoint] Store to write the interval to
+        :param interval: [int] Number of the interval
+        :param t_start: [int] first timestep of the interval
+        :param t_end: [int] last timestep of the interval
+        :param solution: [Future] Finished task of the worker process
+        """
+        if solution.cancelled() or solution.exception() is not None:
+            return
+        checkpoint.store(interval, self.__get_interval_checkpoint(t_start, t_end, *solution.result()))
+
+    def __restore_interval(self, entry):
+        """
+        This function takes the solution of an interval from a checkpoint as if the interval had just been solved.
+
+        :param entry: [dict] Checkpoint of the interval created by self.__get_interval_checkpoint()
+        :return: self.solution and the solver statistics are being set
+        """
+        self.solution = entry["solution"]
+        self.solution_objective = entry["solution_objective"]
+        self.solution_t_start = entry["t_start"]
+        self.solver_statistics.append(entry["statistics"])
+        if entry["problem_class"]["grade"] > self.problem_class["grade"]:
+            self.problem_class = entry["problem_class"]
+
+        # the model of the previous interval does not match the restored solution anymore
+        self.model_reusable = False
+
+    def __simulate_intervals_parallel(self, intervals, workers, solver_config, threshold, rounding_decimals, reuse_model=False, checkpoint=None):
+        """
+        This function solves independent rolling intervals concurrently in a pool of worker processes. Every worker receives a copy of the simulation once, builds the models of its intervals within its own gurobi environment and returns the solutions. The results are collected in the order of the intervals. It is being called from the simulation.simulate() function.
+
+        :param intervals: [list] (t_start, t_end)-tuples of all intervals to solve
+        :param workers: [int] Number of worker processes
+        :param solver_config: [dict] Configuration parameters for the solver
+        :param threshold: [float] Threshold under which numerical values are considered as zero
+        :param rounding_decimals: [int] Number of decimals that values are rounded to
+        :param reuse_model: [bool] Set True to let every worker reuse its model for subsequent intervals of the same length
+        :param checkpoint: [Checkpoint] Store to restore finished intervals from. Newly solved intervals are written to it as soon as they are finished
+        """
+        # restore the intervals that have already been solved in a previous run
+        restored = {}
+        if checkpoint is not None:
+            for interval, (t_start, t_end) in enumerate(intervals):
+                entry = checkpoint.load(interval, t_start, t_end)
+                if entry is not None:
+                    restored[interval] = entry
+        if restored:
+            logging.info(f"Solutions of {len(restored)} intervals restored from checkpoint")
+
+        workers = min(workers, len(intervals) - len(restored))
+        if workers < 1:
+            for interval, (t_start, t_end) in enumerate(intervals):
+                self.__restore_interval(restored[interval])
+                self.__collect_results(threshold=threshold, rounding_decimals=rounding_decimals, interval_length=t_end-t_start, t_start=t_start)
+            return
+
+        # share the available cores between the workers unless the thread budget is specified
+        solver_config = dict(solver_config)
+        if "threads" not in solver_config and solver_config.get("solver", "gurobi") == "gurobi":
+            solver_config["threads"] = max(1, (os.cpu_count() or 1) // workers)
+
+        # remove the gurobi objects of previous runs, since they cannot be handed over to the workers
+        self.m = None
+        self.MVars = {}
+        self.C_objective = []
+        self.R_objective = []
+        self.emission_sources = []
+        self.constr_emission_limit = None
+        self.interval_updates = []
+        self.model_reusable = False
+
+        logging.info(f"Solving {len(intervals)} intervals with {workers} worker processes")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_interval_worker,
+            initargs=(self, solver_config, reuse_model),
+        ) as executor:
+            solutions = {}
+            for interval, (t_start, t_end) in enumerate(intervals):
+                if interval in restored:
+                    continue
+                solutions[interval] = executor.submit(_solve_interval_in_worker, t_start, t_end)
+                # write the checkpoint as soon as the interval is finished, independent of the order of collection
+                if checkpoint is not None:
+                    solutions[interval].add_done_callback(
+                        partial(self.__store_finished_interval, checkpoint, interval, t_start, t_end)
+                    )
+
+            # collect the results in the order of the intervals, while the remaining intervals are still being solved
+            for interval, (t_start, t_end) in enumerate(intervals):
+                if interval in restored:
+                    self.__restore_interval(restored[interval])
+                else:
+                    solution, objective, problem_class, statistics = solutions[interval].result()
+                    self.__restore_interval(self.__get_interval_checkpoint(t_start, t_end, solution, objective, problem_class, statistics))
+                logging.info(f"Collecting Interval {interval+1} [{t_start+1} : {t_end+1}]")
+                self.__collect_results(threshold=threshold, rounding_decimals=rounding_decimals, interval_length=t_end-t_start, t_start=t_start)
+
+    def solve_interval(self, t_start, t_end, solver_config, reuse_model=False):
+        """
+        This function builds (or updates) and solves the optimization problem for a single interval without collecting the results. The values of all MVars are written to simulation.solution afterwards, so that they can be collected independently of the gurobi model (e.g. when the interval has been solved in a worker process).
+
+        :param t_start: [int] first timestep of the simulation interval to solve
+        :param t_end: [int] last timestep of the simulation interval to solve
+        :param solver_config: [dict] Configuration parameters for the solver
+        :param reuse_model: [bool] Set True to reuse the model of the previous interval if it covers the same number of timesteps
+        :return: simulation.solution, simulation.solution_objective and simulation.solver_statistics are being set
+        """
+        # BUILD OR UPDATE THE OPTIMIZATION PROBLEM
+        if (
+            reuse_model
+            and self.model_reusable
+            and self.model_interval_length == t_end - t_start + 1
+        ):
+            logging.info("UPDATING OPTIMIZATION PROBLEM")
+            if self.enable_time_tracking:
+                self.t_step = time.time()
+            oc.update_interval_data(self, t_start, t_end)
+            self.__set_objective()
+        else:
+            self.__build_model(t_start, t_end, solver_config)
+
+            # the first interval of a receding horizon simulation is built without initial states -> it cannot be reused
+            if self.lookahead is not None and not self.interval_state:
+                self.model_reusable = False
+
+        # SEED THE PROBLEM WITH THE SOLUTION OF THE PREVIOUS INTERVAL
+        if self.warm_start and self.solution_t_start is not None:
+            oc.set_warm_start(self, self.solution, self.solution_t_start, t_start)
+
+        # GUIDE THE PROBLEM BY THE SOLUTION OF THE COARSE TIMELINE
+        fixings = []
+        if self.coarse_solution is not None:
+            fixings = oc.set_coarse_guidance(self, t_start)
+
+        # CALL THE SOLVER (writes the values of all MVars to self.solution)
+        statistics = oc.solve(self, solver_config)
+        oc.release_coarse_fixings(fixings)
+        if statistics["status"] == "failed" and fixings:
+            # the fixings taken from the coarse timeline may be infeasible on the original timeline
+            logging.warning("The fixings of the coarse timeline are infeasible, solving the interval again without them")
+            statistics = oc.solve(self, solver_config)
+        statistics["t_start"] = t_start
+        statistics["t_end"] = t_end
+        self.solver_statistics.append(statistics)
+
+        # Check solver status
+        if statistics["status"] == "optimal":
+            logging.info("Problem solved successfully")
+        elif statistics["status"] == "time_limit":
+            logging.warning("Solver reached timelimit. Found solution might not be accurate")
+        else:
+            logging.error("Solver failed to find a valid solution in time")
+            raise Exception
+
+        self.solution_t_start = t_start
+
+    def __update_interval_state(self, t_start, steps):
+        """
+        This function determines the states of the components at the end of the committed timesteps of the current interval. During receding horizon simulations they are handed over to the next interval as initial conditions.
+
+        :param t_start: [int] first timestep of the current simulation interval
+        :param steps: [int] number of committed timesteps of the current simulation interval
+        :return: self.interval_state is being updated
+        """
+        for component in self.factory.components.values():
+            previous_state = self.interval_state.get(component.key)
+
+            # handle storages: hand over the SOC and keep the SOC_start of the first interval as target for the SOC_end
+            if component.type == "storage":
+                if previous_state is None:
+                    soc_target = (
+                        self.solution[f"SOC_{component.key}_start"][0] * component.capacity
+                    )
+                else:
+                    soc_target = previous_state["soc_target"]
+                self.interval_state[component.key] = {
+                    "soc": self.solution[f"SOC_{component.key}"][steps - 1],
+                    "soc_target": soc_target,
+                }
+
+            # handle thermalsystems: hand over the temperature reached after the last committed timestep
+            elif component.type == "thermalsystem":
+                temperature = self.solution[f"T_{component.key}"][steps - 1]
+                temperature_next = (
+                    temperature
+                    + (component.temperature_ambient[t_start + steps - 1] - temperature)
+                    * self.time_reference_factor
+                    / (component.R * component.C)
+                    + (
+                        self.solution[f"E_{component.key}_in"][steps - 1]
+                        - self.solution[f"E_{component.key}_out"][steps - 1]
+                    )
+                    * self.time_reference_factor
+                    / component.C
+                )
+                if previous_state is None:
+                    temperature_target = self.solution[f"T_{component.key}"][0]
+                else:
+                    temperature_target = previous_state["temperature_target"]
+                self.interval_state[component.key] = {
+                    "temperature": temperature_next,
+                    "temperature_target": temperature_target,
+                }
+
+            # handle converters: hand over the last operating point for ramping constraints and costs
+            elif component.type == "converter":
+                self.interval_state[component.key] = {
+                    "power": self.solution[f"P_{component.key}"][steps - 1]
+                }
+
+            # handle deadtimes: hand over the material that has been committed as input but not yet left the deadtime
+            elif component.type == "deadtime":
+                delay = int(component.delay / self.time_reference_factor)
+                inputs = self.solution[component.inputs[-1].key]
+                if previous_state is None:
+                    previous_transit = np.zeros(delay)
+                else:
+                    previous_transit = previous_state["in_transit"]
+                in_transit = np.zeros(delay)
+                for t in range(delay):
+                    t_input = steps + t - delay
+                    if t_input < 0:
+                        # material that has already been in transit at the beginning of the interval
+                        in_transit[t] = previous_transit[steps + t]
+                    elif t_input < len(inputs) - delay:
+                        # inputs at the end of the interval are either zero or taken by the slack
+                        in_transit[t] = inputs[t_input]
+                self.interval_state[component.key] = {"in_transit": in_transit}
+
+            # handle sinks: keep track of the total input if it is limited
+            elif component.type == "sink" and component.max_total_input_limited:
+                total_input = sum(self.solution[f"E_{component.key}"][0:steps])
+                if previous_state is not None:
+                    total_input += previous_state["total_input"]
+                self.interval_state[component.key] = {"total_input": total_input}
+
+            # handle schedules: keep track of the energy delivered for every demand
+            elif component.type == "schedule":
+                if previous_state is None:
+                    delivered = np.zeros(len(component.demands))
+                else:
+                    delivered = previous_state["delivered"].copy()
+                utilization = self.solution[f"E_{component.key}_in"][0:steps]
+                for column, row in enumerate(self.solution[f"X_{component.key}_demand_rows"]):
+                    delivered[row] += sum(utilization[:, column])
+                self.interval_state[component.key] = {"delivered": delivered}
+
+            # handle triggerdemands: hand over the remaining load of executions started within the committed timesteps
+            elif component.type == "triggerdemand":
+                executions = np.round(self.solution[f"{component.key}_executions"])
+                executions[steps:] = 0
+                carryover = {}
+                for load_type, profile in [
+                    ("energy", component.load_profile_energy),
+                    ("material", component.load_profile_mass),
+                    ("parallel", np.ones(component.profile_length)),
+                ]:
+                    if len(profile) == 0:
+                        profile = np.zeros(component.profile_length)
+                    load = np.convolve(executions, profile)
+                    load = np.append(load, np.zeros(component.profile_length))
+                    carryover[load_type] = load[steps : steps + component.profile_length - 1]
+                    if previous_state is not None:
+                        previous_load = previous_state[load_type][steps:]
+                        carryover[load_type][0 : len(previous_load)] += previous_load
+                self.interval_state[component.key] = carryover
+
+    def __build_model(self, t_start, t_end, solver_config):
+        """
+        This function builds a new optimization problem for a specific interval of the simulation timeframe. It is being called from the simulation.__simulate_interval() function.
+
+        :param t_start: [int] first timestep of the simulation interval
+        :param t_end: [int] last timestep of the simulation interval
+        :param solver_config: [dict] Configuration parameters for the solver
         """
 
         # INITIALIZE GUROBI MODEL
         logging.info("STARTING SIMULATION")
 
         # create new gurobi model
-        self.m = gp.Model("Factory")
+        self.m = gp.Model("Factory", env=self.env)
 
         # set solver logging
         if "log_solver" in solver_config:
@@ -873,6 +1453,19 @@ def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding
         self.R_objective = (
             list()
         )  # List of revenue terms that need to be summed up for the target function
+        self.emission_sources = (
+            list()
+        )  # list of emission terms that need to be added up to calculate the total emissions
+        self.constr_emission_limit = None  # constraint of the emission limit, recreated whenever the objective is set
+        self.interval_updates = (
+            list()
+        )  # List of routines that write the data of a new interval into the model when it is being reused
+        self.model_reusable = True  # may be revoked by components whose structure depends on the interval
+        self.model_variables = None  # determined when the solution is read for the first time
+        self.variable_index = None  # determined when the solution is read for the first time
+        self.model_interval_length = t_end - t_start + 1
+        self.aliases = {}  # filled by the model reduction
+        self.collapsed_pools = set()  # filled by the model reduction
 
         # ADAPTING SCENARIO DATA
         logging.info("SETTING SCENARIO_DATA")
@@ -880,9 +1473,6 @@ def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding
         # ENABLE EMISSION ACCOUNTING IF NECESSARY
         if self.factory.emission_accounting:
             logging.info("ENABLING EMISSION ACCOUNTING")
-            self.emission_sources = (
-                list()
-            )  # list of emission terms that need to be added up to calculate the total emissions
 
         # BUILDING OPTIMIZATION PROBLEM
         logging.info("BUILDING OPTIMIZATION PROBLEM")
@@ -891,6 +1481,10 @@ def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding
             logging.info(f"Preperations: {round(time.time()-self.t_start,2)}s")
             self.t_step = time.time()
 
+        # DETERMINE VARIABLES THAT ONLY DUPLICATE OTHERS
+        if self.reduce_model:
+            oc.reduce_model(self)
+
         # CREATE MVARS FOR ALL FLOWS IN THE FACTORY
         oc.add_flows(self, t_end-t_start+1)
 
@@ -925,51 +1519,8 @@ def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding
                 )
                 self.t_step = time.time()
 
-        # SET EMISSION RELATED COSTS AND CONSTRAINTS
-        if self.factory.emission_accounting:
-            # add MVar to keep track of total caused emissions
-            self.MVars["total_emissions"] = self.m.addMVar(
-                1, vtype=GRB.CONTINUOUS, name="total_emissions"
-            )
-
-            # calculate the total emissions throughout the entire factory layout
-            self.m.addConstr(
-                self.MVars[f"total_emissions"]
-                == sum(
-                    self.emission_sources[i] for i in range(len(self.emission_sources))
-                )
-            )
-
-            # add cost term for emissions
-            if self.factory.emission_cost is not None:
-                self.C_objective.append(
-                    self.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"C_emissions")
-                )
-                self.m.addConstr(
-                    self.C_objective[-1]
-                    == self.MVars["total_emissions"] * self.factory.emission_cost
-                )
-                logging.debug(
-                    f"        - CostFactor:   Costs for CO2 emission allowances"
-                )
-
-            # set constraint for the emission limit
-            if self.factory.emission_limit is not None:
-                self.m.addConstr(
-                    self.MVars[f"total_emissions"] <= self.factory.emission_limit
-                )
-                logging.debug(
-                    f"        - Constraint:   Total Emissions <= Emission Limit"
-                )
-
-        # SET OBJECTIVE FUNCTION
-        self.m.setObjective(
-            (
-                sum(self.C_objective[i] for i in range(len(self.C_objective)))
-                - sum(self.R_objective[i] for i in range(len(self.R_objective)))
-            ),
-            GRB.MINIMIZE,
-        )  # ...as sum of all created cost components
+        # SET EMISSION RELATED COSTS AND CONSTRAINTS AND THE OBJECTIVE FUNCTION
+        self.__set_objective()
         if self.enable_time_tracking:
             logging.info(
                 f"Creating objective function: {round(time.time() - self.t_step, 2)}s"
@@ -986,25 +1537,42 @@ def __simulate_interval(self, t_start, t_end, solver_config, threshold, rounding
             )
             self.t_start = time.time()  # reset timer
 
-        # CONFIGURE SOLVER
-        if "mip_gap" in solver_config.keys():
-            self.m.setParam("MIPGap", solver_config["mip_gap"])
-            logging.info(f"Solver MIP-Gap set to {solver_config['mip_gap']}")
 
-        oc.solve(self, solver_config)
+    def __set_objective(self):
+        """
+        This function sets the objective function as sum of all cost terms minus all revenue terms that have been
+        contributed by the components. If emission accounting is enabled, the total emissions are priced with the
+        emission cost and limited to the emission limit. It is called after the model has been built and whenever the
+        terms have been recreated for a new interval.
+        :return: self.m is being updated
+        """
+        objective = sum(self.C_objective) - sum(self.R_objective)
 
-        # Check solver status
-        if self.m.Status == GRB.OPTIMAL:
-            logging.info("Problem solved successfully")
-        elif self.m.Status == GRB.TIME_LIMIT:
-            logging.warning("Solver reached timelimit. Found solution might not be accurate")
-        else:
-            logging.error("Solver failed to find a valid solution in time")
-            raise Exception
+        # SET EMISSION RELATED COSTS AND CONSTRAINTS
+        if self.factory.emission_accounting:
+            # calculate the total emissions throughout the entire factory layout
+            total_emissions = sum(self.emission_sources)
 
-        # COLLECT THE RESULTS
-        self.__collect_results(threshold=threshold, rounding_decimals=rounding_decimals, interval_length=t_end-t_start, t_start=t_start)
+            # add cost term for emissions
+            if self.factory.emission_cost is not None:
+                objective = objective + total_emissions * self.factory.emission_cost
+                logging.debug(
+                    f"        - CostFactor:   Costs for CO2 emission allowances"
+                )
 
+            # set constraint for the emission limit
+            if self.factory.emission_limit is not None and self.emission_sources:
+                if self.constr_emission_limit is not None:
+                    self.m.remove(self.constr_emission_limit)
+                self.constr_emission_limit = self.m.addConstr(
+                    total_emissions <= self.factory.emission_limit
+                )
+                logging.debug(
+                    f"        - Constraint:   Total Emissions <= Emission Limit"
+                )
+
+        # SET OBJECTIVE FUNCTION
+        self.m.setObjective(objective, GRB.MINIMIZE)  # ...as sum of all created cost components
 
     def __validate_component(self, component):
         """
@@ -1252,6 +1820,40 @@ def __calculate_component_output_sum(self, component):
         # return calculated outputs
         return output_sum_energy, output_sum_material
 
+    def __round_solution(self, steps, threshold, rounding_decimals):
+        """
+        This function applies threshold and rounding on the first timesteps of all variable timeseries within
+        self.solution in a single vectorized operation instead of handling every timeseries separately.
+        :param steps: [int] Number of timesteps to be collected
+        :param threshold: [float] Threshold under which numerical values are considered as zero
+        :param rounding_decimals: [int] Number of decimals that values are rounded to
+        :return: [dict] {key: rounded values} for every timeseries of self.solution
+        """
+        # gather the relevant parts of all timeseries
+        keys = []
+        arrays = []
+        for key, value in self.solution.items():
+            if isinstance(value, np.ndarray) and value.ndim > 0:
+                keys.append(key)
+                arrays.append(value[0:steps])
+
+        if not arrays:
+            return {}
+
+        # round all values at once
+        values = self.__apply_threshold_and_rounding(
+            np.concatenate([array.reshape(-1) for array in arrays]), threshold, rounding_decimals
+        )
+
+        # split the rounded vector into the original timeseries again
+        rounded = {}
+        position = 0
+        for key, array in zip(keys, arrays):
+            rounded[key] = values[position:position + array.size].reshape(array.shape)
+            position += array.size
+
+        return rounded
+
     def __apply_threshold_and_rounding(
         self, data, threshold=float, rounding_decimals=int
     ):
@@ -1277,3 +1879,38 @@ def __apply_threshold_and_rounding(
 
         # return results
         return data
+
+
+# WORKER ROUTINES FOR PARALLEL INTERVALS
+_interval_worker = {}  # Simulation copy and solver configuration of the current worker process
+
+
+def _initialize_interval_worker(simulation, solver_config, reuse_model):
+    """
+    This function initializes a worker process of simulation.simulate(workers=...). It stores the handed over copy of the simulation and creates a separate gurobi environment that is used for all models of the worker.
+
+    :param simulation: [Simulation] Copy of the simulation without gurobi objects
+    :param solver_config: [dict] Configuration parameters for the solver
+    :param reuse_model: [bool] Set True to reuse the model of the worker for subsequent intervals of the same length
+    """
+    simulation.env = gp.Env(empty=True)
+    if "log_solver" in solver_config and not solver_config["log_solver"]:
+        simulation.env.setParam("OutputFlag", 0)
+    simulation.env.start()
+
+    _interval_worker["simulation"] = simulation
+    _interval_worker["solver_config"] = solver_config
+    _interval_worker["reuse_model"] = reuse_model
+
+
+def _solve_interval_in_worker(t_start, t_end):
+    """
+    This function solves a single interval within a worker process and returns the solution for the result collection in the main process.
+
+    :param t_start: [int] first timestep of the simulation interval to solve
+    :param t_end: [int] last timestep of the simulation interval to solve
+    :return: [tuple] solution dict, objective value, problem class and solver statistics of the interval
+    """
+    simulation = _interval_worker["simulation"]
+    simulation.solve_interval(t_start, t_end, _interval_worker["solver_config"], _interval_worker["reuse_model"])
+    return simulation.solution, simulation.solution_objective, simulation.problem_class, simulation.solver_statistics[-1]
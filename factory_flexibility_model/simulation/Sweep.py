@@ -0,0 +1,620 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: Sweep.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# PARAMETER SWEEPS
+
+# IMPORTS
+import copy
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import factory_flexibility_model.simulation.Simulation as fs
+from factory_flexibility_model.simulation.SweepCatalog import CLAIM_LEASE, SweepCatalog
+
+
+# CODE START
+SHARED_MIN_BYTES = 4096  # arrays of at least this size are handed over to the workers via shared memory
+
+
+class Sweep:
+    """
+    .. _Sweep:
+        Executes a set of simulation runs that vary the parameters of a common factory and base scenario.
+
+        The runs are either given as a parameter grid, of which all combinations are simulated, or as an explicit list.
+        Parameters that are addressed by a tuple (component, parameter) are written into the scenario configuration of
+        the component, the component can be given by its key or its name. All other parameters are handed over to the
+        configure-function, which may adapt the factory and scenario of the run arbitrarily.
+
+        The runs are executed in a pool of worker processes that is managed by the sweep itself:
+            - Every run is stored as "<name>_<number>_<hash>.sim" within the folder of the sweep as soon as it is
+              finished. Only small summaries are returned to the main process, so that the memory of the main process
+              does not grow with the number of runs.
+            - Runs that exceed the timeout are aborted by replacing their worker process. Runs that raise an error or
+              crash their worker process are reported as failed without affecting the remaining runs.
+            - Workers are replaced after max_runs_per_worker runs to release the memory accumulated by the solver.
+            - The status, objective and KPIs of every run are tracked in a SweepCatalog (catalog.sqlite within the
+              folder of the sweep). Runs that have been solved already are skipped, so that an aborted sweep can be
+              resumed by executing it again. Several sweeps may work on the same folder concurrently, every run is
+              only simulated by the sweep that has claimed it.
+            - Numerical arrays within the base scenario and the parameters of the runs (e.g. timeseries) are placed in
+              shared memory once. Workers and tasks only receive references to them, the workers access the arrays
+              as read-only numpy views. Numerical pandas Series are handed over as numpy arrays.
+
+        Example:
+            >>> sweep = Sweep(factory, scenario, folder="path/to/sweep",
+            >>>               parameters={("Speicher", "capacity"): [0, 100, 200], ("Netzanbindung", "power_max"): [300, 500]},
+            >>>               simulate_config={"interval_length": 730, "threshold": 0.000001}, workers=4, timeout=3600)
+            >>> for summary in sweep.iterate():
+            >>>     print(summary["name"], summary["status"], summary["objective"])
+    """
+
+    def __init__(
+        self,
+        factory,
+        scenario,
+        *,
+        folder: str,
+        parameters: dict = None,
+        runs: list = None,
+        configure=None,
+        name: str = "run",
+        simulate_config: dict = None,
+        workers: int = 1,
+        timeout: float = None,
+        max_runs_per_worker: int = 10,
+        overwrite: bool = False,
+        kpis=None,
+    ):
+        """
+        :param factory: [factory.Factory or factory.Blueprint] Factory that is simulated in every run
+        :param scenario: [simulation.Scenario] Base scenario that the parameters of the runs are applied to
+        :param folder: [str] Folder that the simulations of the runs are stored in
+        :param parameters: [dict] Parameter grid {parameter: [values]}. All combinations of the values are simulated
+        :param runs: [list] Explicit list of runs as dicts {parameter: value}. Used instead of a parameter grid
+        :param configure: [function] Optional function configure(factory, scenario, run) that applies the parameters of a run which are no (component, parameter)-tuples. It has to be defined on module level, so that it can be handed over to the worker processes
+        :param name: [str] Name prefix of the stored simulations
+        :param simulate_config: [dict] Keyword arguments handed over to Simulation.simulate() for every run
+        :param workers: [int] Number of worker processes
+        :param timeout: [float] Maximum time in seconds for a single run. None = no limit
+        :param max_runs_per_worker: [int] Number of runs after which a worker process is replaced. None = never
+        :param overwrite: [bool] Set True to simulate runs again that have already been solved
+        :param kpis: [function] Optional function kpis(simulation) that returns a dict of additional KPIs of a solved run, which are stored in the catalog. It has to be defined on module level
+        """
+        if (parameters is None) == (runs is None):
+            logging.critical("ERROR: A sweep requires either a parameter grid or a list of runs")
+            raise Exception
+        if workers < 1 or (timeout is not None and timeout <= 0) or (max_runs_per_worker is not None and max_runs_per_worker < 1):
+            logging.critical(
+                f"ERROR: Invalid sweep configuration (workers: {workers}, timeout: {timeout}, max_runs_per_worker: {max_runs_per_worker})"
+            )
+            raise Exception
+
+        if hasattr(factory, "to_factory"):
+            factory = factory.to_factory()
+
+        self.factory = factory
+        self.scenario = scenario
+        self.folder = Path(folder)
+        self.configure = configure
+        self.name = name
+        self.simulate_config = dict(simulate_config) if simulate_config is not None else {}
+        self.workers = workers
+        self.timeout = timeout
+        self.max_runs_per_worker = max_runs_per_worker
+        self.overwrite = overwrite
+        self.kpis = kpis
+        self.__catalog = None
+
+        # list all runs of the sweep
+        if parameters is not None:
+            keys = list(parameters.keys())
+            self.runs = [dict(zip(keys, values)) for values in itertools.product(*parameters.values())]
+        else:
+            self.runs = [dict(run) for run in runs]
+
+        # make sure that all components addressed by the parameters exist
+        for run in self.runs:
+            for parameter in run:
+                if isinstance(parameter, tuple) and _get_component_key(self.factory, parameter[0]) is None:
+                    logging.critical(f"ERROR: The sweep parameter {parameter} addresses an unknown component")
+                    raise Exception
+
+        # share the available cores between the workers unless the thread budget is specified
+        solver_config = dict(self.simulate_config.get("solver_config", {}))
+        if workers > 1 and "threads" not in solver_config and solver_config.get("solver", "gurobi") == "gurobi":
+            solver_config["threads"] = max(1, (os.cpu_count() or 1) // workers)
+        self.simulate_config["solver_config"] = solver_config
+
+    def __len__(self):
+        return len(self.runs)
+
+    def get_run_name(self, index: int) -> str:
+        """
+        This function returns the name that the simulation of a run is stored under. The name contains a hash of the
+        parameters of the run, so that a changed run is never mistaken for a stored one when a sweep is resumed.
+        :param index: [int] Number of the run
+        :return: [str] Name of the run
+        """
+        return f"{self.name}_{index:05d}_{_hash_run(self.runs[index])}"
+
+    def get_run_file(self, index: int) -> Path:
+        """
+        :param index: [int] Number of the run
+        :return: [Path] Path of the stored simulation of the run
+        """
+        return self.folder / f"{self.get_run_name(index)}.sim"
+
+    @property
+    def catalog(self) -> SweepCatalog:
+        """The catalog of the runs within the folder of the sweep"""
+        if self.__catalog is None:
+            self.__catalog = SweepCatalog(self.folder / "catalog.sqlite")
+        return self.__catalog
+
+    def run(self) -> list:
+        """
+        This function executes all runs of the sweep and waits until they are finished.
+        :return: [list] Summaries of all runs, ordered by the number of the run (see iterate())
+        """
+        return sorted(self.iterate(), key=lambda summary: summary["index"])
+
+    def iterate(self):
+        """
+        This generator executes all runs of the sweep and yields the summary of every run as soon as it is finished.
+        A summary is a dict with the keys:
+            - index: number of the run
+            - name: name of the run
+            - parameters: parameters of the run
+            - status: "solved", "stored" (skipped, since it has already been solved), "claimed" (skipped, since it is
+              being simulated by another sweep), "failed" or "timeout"
+            - objective, emissions, emission_cost, solver_time, kpis: results of the simulation (solved runs only)
+            - runtime: time required for the run in seconds
+            - file: path of the stored simulation
+            - error: description of the error (failed runs only)
+        """
+        # register all runs in the catalog. Runs are claimed before they are simulated, so that concurrent sweeps
+        # on the same folder never simulate the same run
+        catalog = self.catalog
+        catalog.register(
+            [
+                {"name": self.get_run_name(index), "sweep_index": index, "parameters": {str(parameter): value for parameter, value in run.items()}, "file": self.get_run_file(index)}
+                for index, run in enumerate(self.runs)
+            ],
+            reset=self.overwrite,
+        )
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        renewal = time.time() + CLAIM_LEASE / 10
+
+        pending = deque(range(len(self.runs)))
+        finished = 0
+        workers = []  # [process, connection, index of the current run, start of the current run, number of runs, startup thread]
+        context = multiprocessing.get_context("spawn")
+        t_start = time.time()
+
+        # place the timeseries of the base scenario and the runs in shared memory
+        shared_arrays = _SharedArrays()
+        scenario = copy.copy(self.scenario)
+        scenario.configurations = shared_arrays.share(self.scenario.configurations)
+        runs = [shared_arrays.share(run) for run in self.runs]
+        if shared_arrays.blocks:
+            logging.debug(
+                f"Sweep: {len(shared_arrays.blocks)} arrays ({round(sum(block.size for block in shared_arrays.blocks.values()) / 1e6, 2)} MB) placed in shared memory"
+            )
+
+        # the factory, base scenario and functions of the sweep are pickled only once for all workers
+        base = pickle.dumps(
+            (self.factory, scenario, self.configure, self.simulate_config, self.kpis, catalog, owner),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        def start_worker():
+            # the base data is sent by a background thread, since sending blocks until the new process has started up.
+            # The worker answers with "ready" once it has received the base data and is then handed over runs
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_run_sweep_worker, args=(worker_connection,))
+            process.start()
+            worker_connection.close()
+            sender = threading.Thread(target=_send_base, args=(connection, base), daemon=True)
+            sender.start()
+            return [process, connection, None, None, 0, sender]
+
+        def stop_worker(worker, terminate=False):
+            process, connection, sender = worker[0], worker[1], worker[5]
+            if terminate or sender is not None:
+                process.terminate()
+            else:
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+            process.join()
+            if sender is not None:
+                sender.join()
+            connection.close()
+            workers.remove(worker)
+
+        def summarize(index, status, **values):
+            nonlocal finished
+            finished += 1
+            summary = {
+                "index": index,
+                "name": self.get_run_name(index),
+                "parameters": self.runs[index],
+                "status": status,
+                "objective": None,
+                "emissions": None,
+                "emission_cost": None,
+                "solver_time": None,
+                "kpis": None,
+                "runtime": 0.0,
+                "file": str(self.get_run_file(index)),
+                "error": None,
+                **values,
+            }
+            logging.info(
+                f"Sweep run {finished}/{len(self.runs)} ({summary['name']}): {status} after {round(summary['runtime'], 2)}s"
+            )
+            return summary
+
+        try:
+            while pending or any(worker[2] is not None for worker in workers):
+                # hand over the next runs to idle workers, runs that cannot be claimed are skipped
+                while pending:
+                    index = pending[0]
+                    name = self.get_run_name(index)
+                    entry = catalog.get(name)
+                    if entry["status"] == "solved":
+                        pending.popleft()
+                        yield summarize(index, "stored", **{key: entry[key] for key in _SUMMARY_COLUMNS})
+                        continue
+                    idle = [worker for worker in workers if worker[2] is None and worker[5] is None]
+                    if not idle:
+                        # start as many workers as there are runs left, they are handed over runs once they are ready
+                        starting = sum(worker[5] is not None for worker in workers)
+                        while len(workers) < self.workers and starting < len(pending):
+                            workers.append(start_worker())
+                            starting += 1
+                        break
+                    pending.popleft()
+                    if not catalog.claim(name, owner):
+                        entry = catalog.get(name)
+                        if entry["status"] == "solved":
+                            yield summarize(index, "stored", **{key: entry[key] for key in _SUMMARY_COLUMNS})
+                        else:
+                            yield summarize(index, "claimed")
+                        continue
+                    worker = idle[0]
+                    t_run = time.time()
+                    deadline = t_run + self.timeout if self.timeout is not None else None
+                    try:
+                        worker[1].send((index, name, runs[index], str(self.get_run_file(index)), deadline))
+                    except OSError:
+                        # the worker process died while it was idle
+                        stop_worker(worker, terminate=True)
+                        error = "Worker process terminated before the run started"
+                        catalog.finish(name, owner, "failed", error=error)
+                        yield summarize(index, "failed", error=error)
+                        continue
+                    worker[2], worker[3] = index, t_run
+
+                # extend the lease of the claimed runs
+                if time.time() >= renewal:
+                    catalog.renew(owner)
+                    renewal = time.time() + CLAIM_LEASE / 10
+
+                # only busy workers and workers that are starting up are watched
+                active = [worker for worker in workers if worker[2] is not None or worker[5] is not None]
+                if not active:
+                    continue
+
+                # wait until a run is finished, a worker is ready or dies or the next run exceeds the timeout
+                wait_time = max(0.0, renewal - time.time())
+                if self.timeout is not None:
+                    for worker in active:
+                        if worker[2] is not None:
+                            wait_time = min(wait_time, max(0.0, worker[3] + self.timeout - time.time()))
+                ready = wait([worker[1] for worker in active] + [worker[0].sentinel for worker in active], wait_time)
+
+                for worker in active:
+                    process, connection, index, t_run = worker[0], worker[1], worker[2], worker[3]
+                    if index is None:
+                        # the worker is starting up
+                        if connection in ready or process.sentinel in ready:
+                            try:
+                                connection.recv()
+                            except (EOFError, OSError):
+                                stop_worker(worker, terminate=True)
+                                logging.critical(
+                                    f"ERROR: A worker process of the sweep terminated during its startup with exit code {process.exitcode}"
+                                )
+                                raise Exception
+                            worker[5].join()
+                            worker[5] = None
+                    elif self.timeout is not None and time.time() - t_run >= self.timeout:
+                        # abort the run by replacing its worker. A result that arrives after the timeout is discarded
+                        # and replaced in the catalog, even if the worker has written it already
+                        stop_worker(worker, terminate=True)
+                        runtime = time.time() - t_run
+                        catalog.finish(
+                            self.get_run_name(index), owner, "timeout", replace=True, **{**dict.fromkeys(_SUMMARY_COLUMNS), "runtime": runtime}
+                        )
+                        yield summarize(index, "timeout", runtime=runtime)
+                    elif connection in ready or process.sentinel in ready:
+                        try:
+                            summary = connection.recv()
+                        except (EOFError, OSError):
+                            # the worker process died during the run
+                            stop_worker(worker, terminate=True)
+                            error = f"Worker process terminated with exit code {process.exitcode}"
+                            catalog.finish(self.get_run_name(index), owner, "failed", runtime=time.time() - t_run, error=error)
+                            yield summarize(index, "failed", runtime=time.time() - t_run, error=error)
+                            continue
+                        worker[2], worker[3], worker[4] = None, None, worker[4] + 1
+                        if self.max_runs_per_worker is not None and worker[4] >= self.max_runs_per_worker:
+                            stop_worker(worker)
+                        yield summarize(index, **summary)
+        finally:
+            for worker in list(workers):
+                if worker[2] is not None:
+                    # runs that have been interrupted can be claimed again immediately
+                    catalog.finish(self.get_run_name(worker[2]), owner, "pending")
+                stop_worker(worker, terminate=worker[2] is not None)
+            shared_arrays.close()
+
+        logging.info(f"Sweep finished: {len(self.runs)} runs within {round(time.time() - t_start, 2)}s")
+
+
+_SUMMARY_COLUMNS = ["objective", "emissions", "emission_cost", "solver_time", "runtime", "kpis"]
+
+
+def _get_component_key(factory, component):
+    """
+    This function returns the key of a component or connection that is given by its key or name.
+    :param factory: [factory.Factory]
+    :param component: [str] Key or name of the component
+    :return: [str] Key of the component, None if it does not exist
+    """
+    if component in factory.components or component in factory.connections:
+        return component
+    return factory.get_key(component)
+
+
+def _hash_run(run: dict) -> str:
+    """
+    This function calculates a short hash of the parameters of a run.
+    :param run: [dict] Parameters of the run
+    :return: [str] 8 hexadecimal characters
+    """
+    hasher = hashlib.sha1()
+    for parameter, value in run.items():
+        hasher.update(repr(parameter).encode())
+        if isinstance(value, np.ndarray):
+            hasher.update(value.tobytes())
+        elif hasattr(value, "to_numpy"):
+            hasher.update(value.to_numpy().tobytes())
+        else:
+            hasher.update(repr(value).encode())
+    return hasher.hexdigest()[:8]
+
+
+class _SharedArray:
+    """
+    Reference to a numpy array that has been placed in shared memory by _SharedArrays.
+    """
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: tuple, dtype: str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return self.name, self.shape, self.dtype
+
+    def __setstate__(self, state):
+        self.name, self.shape, self.dtype = state
+
+
+class _SharedArrays:
+    """
+    Shared memory blocks holding the arrays of a sweep. Every array is placed in shared memory only once, even if it
+    is referenced by many runs.
+    """
+
+    def __init__(self):
+        self.blocks = {}  # shared memory blocks by name
+        self.__references = {}  # references to the shared arrays by id of the original array
+
+    def share(self, value):
+        """
+        This function replaces all large numerical arrays within the given value by references to copies in shared
+        memory. Dicts, lists and tuples are searched recursively and returned as copies, all other values are kept.
+        :param value: Value to be handed over to the workers
+        :return: Value with references instead of the arrays
+        """
+        if isinstance(value, dict):
+            return {key: self.share(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.share(item) for item in value)
+        if isinstance(value, pd.Series) and pd.api.types.is_numeric_dtype(value.dtype):
+            array = value.to_numpy()
+        elif isinstance(value, np.ndarray) and value.dtype.kind in "biuf":
+            array = value
+        else:
+            return value
+        if array.nbytes < SHARED_MIN_BYTES:
+            return value
+
+        if id(value) not in self.__references:
+            block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks[block.name] = block
+            # keep the original value alive, so that its id cannot be reused by another array
+            self.__references[id(value)] = (_SharedArray(block.name, array.shape, array.dtype.str), value)
+        return self.__references[id(value)][0]
+
+    def close(self):
+        """
+        This function releases all shared memory blocks.
+        """
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+        self.__references = {}
+
+
+def _attach_arrays(value, views: dict):
+    """
+    This function replaces the references to shared arrays within the given value by read-only numpy views onto the
+    shared memory. The views are created once per worker process and collected in views.
+    :param value: Value received from the main process
+    :param views: [dict] Views onto the shared arrays that have already been attached, by name of the block
+    :return: Value with numpy arrays instead of the references
+    """
+    if isinstance(value, dict):
+        return {key: _attach_arrays(item, views) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_attach_arrays(item, views) for item in value)
+    if not isinstance(value, _SharedArray):
+        return value
+    if value.name not in views:
+        block = shared_memory.SharedMemory(name=value.name)
+        view = np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=block.buf)
+        view.flags.writeable = False
+        views[value.name] = (block, view)
+    return views[value.name][1]
+
+
+def _apply_run(factory, scenario, run, configure):
+    """
+    This function applies the parameters of a run to the given factory and scenario.
+    :param factory: [factory.Factory] Copy of the factory of the sweep
+    :param scenario: [simulation.Scenario] Copy of the base scenario of the sweep
+    :param run: [dict] Parameters of the run
+    :param configure: [function] configure-function of the sweep or None
+    """
+    for parameter, value in run.items():
+        if isinstance(parameter, tuple):
+            component_key = _get_component_key(factory, parameter[0])
+            scenario.configurations[component_key] = {**scenario.configurations.get(component_key, {}), parameter[1]: value}
+    if configure is not None:
+        configure(factory, scenario, run)
+
+
+# WORKER ROUTINE OF SWEEPS
+def _send_base(connection, base: bytes):
+    """
+    This function sends the pickled base data of a sweep to a new worker process. A worker that dies meanwhile is
+    detected by the main loop of the sweep.
+    :param connection: [multiprocessing.connection.Connection] Connection to the worker process
+    :param base: [bytes] Pickled factory, base scenario, configure-function, simulate_config, kpis-function, catalog and owner
+    """
+    try:
+        connection.send_bytes(base)
+    except OSError:
+        pass
+
+
+def _run_sweep_worker(connection):
+    """
+    This function is executed by the worker processes of a sweep. It first receives the base data of the sweep and
+    answers with "ready". Then it receives runs (index, name, parameters, file, deadline) until it receives None,
+    simulates them, writes their outcome into the catalog and answers with a short summary of every run. Runs that
+    are finished after their deadline are reported as timeout and not stored.
+    :param connection: [multiprocessing.connection.Connection] Connection to the main process
+    """
+    # the catalog opens its own connection within the worker
+    factory, scenario, configure, simulate_config, kpis, catalog, owner = pickle.loads(connection.recv_bytes())
+    connection.send("ready")
+
+    # the factory and scenario of the sweep are only received once, every run works on its own copies. The shared
+    # arrays are not copied, they are read-only views onto the shared memory
+    base_factory = pickle.dumps(factory, protocol=pickle.HIGHEST_PROTOCOL)
+    views = {}
+    configurations = _attach_arrays(scenario.configurations, views)
+    del factory
+
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        index, name, run, file, deadline = task
+        t_start = time.time()
+        try:
+            run_factory = pickle.loads(base_factory)
+            run_scenario = copy.copy(scenario)
+            run_scenario.configurations = {key: dict(config) for key, config in configurations.items()}
+            run = _attach_arrays(run, views)
+            _apply_run(run_factory, run_scenario, run, configure)
+
+            simulation = fs.Simulation(factory=run_factory, scenario=run_scenario, name=Path(file).stem)
+            simulation.simulate(**copy.deepcopy(simulate_config))
+            if deadline is not None and time.time() >= deadline:
+                # the main process aborts the run anyway, the late result is not stored
+                summary = {"status": "timeout", "runtime": time.time() - t_start}
+            else:
+                simulation.info = {"sweep_run": index, "parameters": {str(parameter): value for parameter, value in run.items()}}
+                simulation.save(str(Path(file).parent), name=Path(file).stem, overwrite=True)
+
+                summary = {
+                    "status": "solved",
+                    "objective": simulation.result["objective"],
+                    "emissions": float(np.sum(simulation.result["total_emissions"])),
+                    "emission_cost": simulation.result["total_emission_cost"],
+                    "solver_time": sum(statistics["runtime"] for statistics in simulation.solver_statistics),
+                    "kpis": kpis(simulation) if kpis is not None else None,
+                    "runtime": time.time() - t_start,
+                }
+            del simulation
+        except Exception as e:
+            summary = {"status": "failed", "runtime": time.time() - t_start, "error": f"{type(e).__name__}: {e}"}
+        if not catalog.finish(name, owner, **summary):
+            logging.warning(f"WARNING: The outcome of sweep run {name} could not be written, it is no longer claimed by this sweep")
+        connection.send(summary)
+    catalog.close()
+    connection.close()
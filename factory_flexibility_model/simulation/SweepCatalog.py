@@ -0,0 +1,272 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: SweepCatalog.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# RUN CATALOG OF PARAMETER SWEEPS
+
+# IMPORTS
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# CODE START
+CATALOG_VERSION = 1  # increase whenever the layout of the catalog changes
+CLAIM_LEASE = 600  # seconds after which a run that is not renewed by its owner can be claimed by another sweep
+
+COLUMNS = [
+    "name",
+    "sweep_index",
+    "parameters",
+    "status",
+    "owner",
+    "updated",
+    "objective",
+    "emissions",
+    "emission_cost",
+    "solver_time",
+    "runtime",
+    "file",
+    "error",
+    "kpis",
+]
+
+
+class SweepCatalog:
+    """
+    .. _SweepCatalog:
+        SQLite database holding one row per run of a parameter sweep.
+
+        Every row contains the parameters, the status and the location of the stored simulation of a run as well as
+        its objective, emissions, solver time and the user defined KPIs once it has been finished. The status of a run
+        changes from "pending" to "running" when it is claimed by a sweep and to "solved", "failed" or "timeout" when
+        it is finished. All transitions are single conditional updates, so that the catalog can be shared by any
+        number of worker processes and sweeps: a run is only ever claimed by one sweep and only its owner can finish
+        it. Runs that are still marked as running by a sweep that has been aborted can be claimed again once their
+        lease has expired.
+
+        Example:
+            >>> catalog = SweepCatalog("path/to/sweep/catalog.sqlite")
+            >>> catalog.progress()
+            {'solved': 118, 'failed': 2, 'pending': 40}
+            >>> solved = catalog.to_dataframe(status="solved")
+    """
+
+    def __init__(self, file: str):
+        """
+        :param file: [str] Path of the database file. It is created if it does not exist
+        """
+        self.file = Path(file)
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.file, timeout=60, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, CATALOG_VERSION):
+            logging.critical(f"ERROR: The sweep catalog {self.file} has been written with an incompatible version")
+            raise Exception
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                name TEXT PRIMARY KEY,
+                sweep_index INTEGER,
+                parameters TEXT,
+                status TEXT NOT NULL,
+                owner TEXT,
+                updated REAL,
+                objective REAL,
+                emissions REAL,
+                emission_cost REAL,
+                solver_time REAL,
+                runtime REAL,
+                file TEXT,
+                error TEXT,
+                kpis TEXT
+            )"""
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS runs_status ON runs (status)")
+        self.connection.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+
+    def __getstate__(self):
+        # the connection cannot be handed over to other processes, they open their own
+        return {"file": self.file}
+
+    def __setstate__(self, state):
+        self.__init__(state["file"])
+
+    def close(self):
+        """
+        This function closes the connection to the database.
+        """
+        self.connection.close()
+
+    def register(self, runs: list, *, reset: bool = False):
+        """
+        This function adds runs to the catalog. Runs that are already known keep their status.
+        :param runs: [list] Dicts with the keys name, sweep_index, parameters and file of the runs
+        :param reset: [bool] Set True to mark all given runs that are not running as pending again
+        """
+        rows = [
+            (run["name"], run["sweep_index"], json.dumps(run["parameters"], default=_to_json), "pending", str(run["file"]))
+            for run in runs
+        ]
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO runs (name, sweep_index, parameters, status, file) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            if reset:
+                self.connection.executemany(
+                    "UPDATE runs SET status = 'pending', owner = NULL WHERE name = ? AND status != 'running'",
+                    [(row[0],) for row in rows],
+                )
+
+    def claim(self, name: str, owner: str) -> bool:
+        """
+        This function marks a run as running by the given owner. Pending, failed and timed out runs can be claimed as
+        well as running runs whose lease has expired.
+        :param name: [str] Name of the run
+        :param owner: [str] Identifier of the claiming sweep
+        :return: [bool] True if the run has been claimed
+        """
+        now = time.time()
+        cursor = self.connection.execute(
+            """UPDATE runs SET status = 'running', owner = ?, updated = ?, error = NULL
+            WHERE name = ? AND (status IN ('pending', 'failed', 'timeout') OR (status = 'running' AND updated < ?))""",
+            (owner, now, name, now - CLAIM_LEASE),
+        )
+        return cursor.rowcount == 1
+
+    def renew(self, owner: str):
+        """
+        This function extends the lease of all runs that are running by the given owner.
+        :param owner: [str] Identifier of the sweep
+        """
+        self.connection.execute(
+            "UPDATE runs SET updated = ? WHERE status = 'running' AND owner = ?", (time.time(), owner)
+        )
+
+    def finish(self, name: str, owner: str, status: str, replace: bool = False, **values) -> bool:
+        """
+        This function writes the outcome of a run. Only the owner of a running run can finish it.
+        :param name: [str] Name of the run
+        :param owner: [str] Identifier of the sweep that has claimed the run
+        :param status: [str] "solved", "failed" or "timeout"
+        :param replace: [bool] If True, an outcome that the owner has already written is replaced as well
+        :param values: Values of the columns objective, emissions, emission_cost, solver_time, runtime, error and kpis
+        :return: [bool] True if the outcome has been written
+        """
+        values = {key: value for key, value in values.items() if key in COLUMNS}
+        if "kpis" in values:
+            values["kpis"] = json.dumps(values["kpis"], default=_to_json)
+        assignments = "".join(f", {key} = ?" for key in values)
+        condition = "status IN ('running', 'solved', 'failed', 'timeout')" if replace else "status = 'running'"
+        cursor = self.connection.execute(
+            f"UPDATE runs SET status = ?, updated = ?{assignments} WHERE name = ? AND {condition} AND owner = ?",
+            (status, time.time(), *[_to_sql(value) for value in values.values()], name, owner),
+        )
+        return cursor.rowcount == 1
+
+    def get(self, name: str):
+        """
+        :param name: [str] Name of the run
+        :return: [dict] Row of the run or None if the run is unknown
+        """
+        row = self.connection.execute("SELECT * FROM runs WHERE name = ?", (name,)).fetchone()
+        return _from_row(row) if row is not None else None
+
+    def progress(self) -> dict:
+        """
+        :return: [dict] Number of runs per status
+        """
+        return {
+            row["status"]: row["count"]
+            for row in self.connection.execute("SELECT status, COUNT(*) AS count FROM runs GROUP BY status")
+        }
+
+    def query(self, status: str = None) -> list:
+        """
+        :param status: [str] Only return runs with the given status. None returns all runs
+        :return: [list] Rows of the runs as dicts, ordered by their number within the sweep
+        """
+        if status is None:
+            rows = self.connection.execute("SELECT * FROM runs ORDER BY sweep_index")
+        else:
+            rows = self.connection.execute("SELECT * FROM runs WHERE status = ? ORDER BY sweep_index", (status,))
+        return [_from_row(row) for row in rows]
+
+    def to_dataframe(self, status: str = None):
+        """
+        This function returns the runs as a pandas DataFrame with one column per parameter and KPI.
+        :param status: [str] Only return runs with the given status. None returns all runs
+        :return: [pd.DataFrame]
+        """
+        records = []
+        for row in self.query(status):
+            parameters, kpis = row.pop("parameters") or {}, row.pop("kpis") or {}
+            records.append({**row, **parameters, **kpis})
+        return pd.DataFrame.from_records(records)
+
+
+def _to_json(value):
+    """
+    Converts values that are not supported by json. Arrays are only described by their shape, since the catalog
+    is meant for the scalar parameters and KPIs of the runs.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, "shape"):
+        return f"<{type(value).__name__} {tuple(value.shape)}>"
+    return repr(value)
+
+
+def _to_sql(value):
+    """
+    Converts numpy scalars into values that can be written into the database.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_row(row) -> dict:
+    """
+    Converts a row of the database into a dict and decodes the json columns.
+    """
+    values = dict(row)
+    for column in ["parameters", "kpis"]:
+        if values[column] is not None:
+            values[column] = json.loads(values[column])
+    return values
@@ -0,0 +1,299 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: TimeAggregation.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# TIME AGGREGATION OF ANNUAL SIMULATIONS
+
+# IMPORTS
+import copy
+import logging
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+# CODE START
+def get_timeseries(component, timesteps: int) -> list:
+    """
+    This function lists all timeseries of a component.
+    :param component: [factory.Component] Component of the factory
+    :param timesteps: [int] Number of timesteps of the simulation timeframe
+    :return: [list] (attribute name, timeseries) for every timeseries of the component
+    """
+    return [
+        (attribute, value)
+        for attribute, value in vars(component).items()
+        if isinstance(value, np.ndarray) and value.ndim == 1 and len(value) >= timesteps
+    ]
+
+
+class TimeAggregation:
+    """
+    .. _TimeAggregation:
+        Aggregation of the simulation timeframe into representative periods.
+
+        The timeframe is split into periods of equal length (e.g. days) which are clustered by all timeseries of the
+        factory using k-medoids. Every cluster is represented by its medoid, a real period of the timeframe, so the
+        timeseries within a representative period remain consistent with each other. The simulation is then solved
+        on the concatenated representative periods only:
+            - Costs, revenues and emission factors are weighted with the number of periods that a representative
+              period stands for, as well as the total input of sinks with a limited total input (see add_sink).
+              Capacity charges and ramping costs are scaled to the full timeframe.
+            - Storages are linked across periods: The SOC at the borders of all periods of the original timeframe is
+              tracked and changed by the SOC difference of the respective representative period (see add_storage).
+            - Thermalsystems are cyclic within every representative period (see add_thermalsystem), the states of
+              converters and deadtimes are continued from one representative period to the next one.
+        An incomplete final period is kept as a representative period of its own.
+
+        Example:
+            >>> aggregation = TimeAggregation(factory, timesteps=8760, periods=12, period_length=24)
+            >>> representative_factory = aggregation.get_representative_factory()
+            >>> solution = aggregation.expand_solution(solution)
+    """
+
+    def __init__(self, factory, timesteps: int, periods: int, period_length: int = 24):
+        """
+        :param factory: [factory.Factory] Factory with all scenario configurations applied
+        :param timesteps: [int] Number of timesteps of the simulation timeframe
+        :param periods: [int] Number of representative periods
+        :param period_length: [int] Number of timesteps of one period
+        """
+        self.factory = factory
+        self.period_length = period_length
+        self.T = timesteps
+
+        # split the timeframe into complete periods and an incomplete final period
+        full_periods = timesteps // period_length
+        tail = timesteps % period_length
+        if full_periods == 0:
+            logging.critical(
+                f"ERROR: The simulation timeframe ({timesteps} timesteps) is shorter than one aggregation period ({period_length} timesteps)"
+            )
+            raise Exception
+        if periods > full_periods:
+            logging.warning(
+                f"WARNING: The number of representative periods ({periods}) exceeds the number of periods within the simulation timeframe ({full_periods}). Every period is used."
+            )
+            periods = full_periods
+
+        # cluster the complete periods
+        medoids, assignment = self.__cluster(self.__get_features(full_periods), periods)
+
+        # the incomplete final period represents itself
+        lengths = np.full(len(medoids), period_length)
+        if tail > 0:
+            medoids = np.append(medoids, full_periods)
+            assignment = np.append(assignment, len(medoids) - 1)
+            lengths = np.append(lengths, tail)
+
+        self.medoids = medoids  # period of the original timeframe that every representative period is taken from
+        self.assignment = assignment  # representative period of every period of the original timeframe
+        self.weights = np.bincount(assignment, minlength=len(medoids))  # number of periods represented
+        self.period_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))  # first timestep of every representative period
+        self.period_ends = self.period_starts + lengths - 1  # last timestep of every representative period
+        self.period_lengths = lengths  # number of timesteps of every representative period
+        self.timesteps = int(lengths.sum())  # number of timesteps of the representative timeframe
+
+        # representative period and original timestep of every timestep of the representative timeframe
+        self.timestep_period = np.repeat(np.arange(len(medoids)), lengths)
+        self.timestep_weights = self.weights[self.timestep_period]  # number of original timesteps represented
+        self.source_index = np.concatenate(
+            [np.arange(length) + medoid * period_length for medoid, length in zip(medoids, lengths)]
+        )
+
+        # timestep of the representative timeframe that every timestep of the original timeframe is mapped to
+        self.timestep_map = np.concatenate(
+            [self.period_starts[period] + np.arange(lengths[period]) for period in assignment]
+        )
+
+        logging.info(
+            f"Simulation timeframe aggregated into {len(medoids)} representative periods ({self.timesteps} of {timesteps} timesteps)"
+        )
+
+    def __get_features(self, periods: int) -> np.ndarray:
+        """
+        This function assembles the feature vectors of the complete periods for the clustering. Every timeseries of
+        the factory is normalized to [0, 1], constant timeseries are ignored.
+        :param periods: [int] Number of complete periods
+        :return: [np.array] periods x features
+        """
+        features = []
+        for component in self.factory.components.values():
+            for attribute, timeseries in get_timeseries(component, self.T):
+                timeseries = timeseries[: periods * self.period_length].astype(float)
+                spread = timeseries.max() - timeseries.min()
+                if spread > 0:
+                    features.append(((timeseries - timeseries.min()) / spread).reshape(periods, self.period_length))
+
+        if not features:
+            return np.zeros((periods, 1))
+        return np.concatenate(features, axis=1)
+
+    def __cluster(self, features: np.ndarray, k: int):
+        """
+        This function clusters the periods with k-medoids. The medoids are initialized greedily (BUILD step of PAM),
+        afterwards the assignment of the periods and the medoids of the clusters are updated alternately until the
+        medoids do not change anymore.
+        :param features: [np.array] periods x features
+        :param k: [int] Number of clusters
+        :return: [tuple] (sorted medoids, cluster of every period)
+        """
+        distances = cdist(features, features)
+
+        # greedy initialization: every new medoid reduces the total distance of the periods to their medoid the most
+        medoids = [int(np.argmin(distances.sum(axis=1)))]
+        nearest = distances[medoids[0]]
+        while len(medoids) < k:
+            gain = np.maximum(nearest[np.newaxis, :] - distances, 0).sum(axis=1)
+            gain[medoids] = -1
+            medoids.append(int(np.argmax(gain)))
+            nearest = np.minimum(nearest, distances[medoids[-1]])
+
+        medoids = np.sort(medoids)
+        for _ in range(100):
+            assignment = self.__assign(distances, medoids)
+            updated = medoids.copy()
+            for cluster in range(k):
+                members = np.flatnonzero(assignment == cluster)
+                updated[cluster] = members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]
+            updated = np.sort(updated)
+            if np.array_equal(updated, medoids):
+                break
+            medoids = updated
+
+        return medoids, self.__assign(distances, medoids)
+
+    def __assign(self, distances: np.ndarray, medoids: np.ndarray) -> np.ndarray:
+        """
+        This function assigns every period to the cluster of its nearest medoid. Medoids are always assigned to
+        their own cluster, even if another medoid is identical.
+        :param distances: [np.array] periods x periods
+        :param medoids: [np.array] Periods that represent the clusters
+        :return: [np.array] cluster of every period
+        """
+        assignment = np.argmin(distances[:, medoids], axis=1)
+        assignment[medoids] = np.arange(len(medoids))
+        return assignment
+
+    def get_representative_factory(self):
+        """
+        This function creates a copy of the factory that only covers the representative periods. Costs, revenues and
+        emission factors are weighted with the number of periods that a representative period stands for.
+        :return: [factory.Factory] Factory with the timeseries of the representative timeframe
+        """
+        factory = copy.deepcopy(self.factory)
+        factory.timesteps = self.timesteps
+        scale = self.T / self.timesteps
+
+        for component in factory.components.values():
+            for attribute, timeseries in get_timeseries(component, self.T):
+                setattr(component, attribute, timeseries[self.source_index])
+
+            # weight all timeseries that enter the objective or the emission accounting
+            for attribute in ["cost", "revenue", "co2_emissions_per_unit"]:
+                if isinstance(getattr(component, attribute, None), np.ndarray):
+                    setattr(component, attribute, getattr(component, attribute) * self.timestep_weights)
+
+            # scale the terms and limits that refer to the whole timeframe
+            if getattr(component, "capacity_charge", 0) > 0:
+                component.capacity_charge = component.capacity_charge * scale
+            if getattr(component, "rampup_cost", 0) > 0:
+                component.rampup_cost = component.rampup_cost * scale
+
+        return factory
+
+    def get_expanded_factory(self):
+        """
+        This function creates a copy of the factory in which every period of the timeframe uses the timeseries of its
+        representative period. The results of the aggregated simulation are consistent with this factory.
+        :return: [factory.Factory] Factory with the expanded timeseries of the representative periods
+        """
+        factory = copy.deepcopy(self.factory)
+        index = self.source_index[self.timestep_map]
+        for component in factory.components.values():
+            for attribute, timeseries in get_timeseries(component, self.T):
+                setattr(component, attribute, timeseries[index])
+
+        return factory
+
+    def expand_solution(self, solution: dict) -> dict:
+        """
+        This function maps the solution of the representative timeframe back to the original timeframe. The SOC of
+        storages is reconstructed from the SOC at the borders of the periods and the SOC trajectory of the
+        representative periods.
+        :param solution: [dict] Values of all MVars of the aggregated simulation
+        :return: [dict] Values of all MVars for the original timeframe
+        """
+        expanded = {}
+        storages = [component for component in self.factory.components.values() if component.type == "storage"]
+        linking = {
+            f"SOC_{component.key}{suffix}"
+            for component in storages
+            for suffix in ["", "_start", "_inter", "_period_max", "_period_min"]
+        }
+
+        for key, value in solution.items():
+            if key in linking:
+                continue
+            if isinstance(value, np.ndarray) and value.ndim > 0 and value.shape[0] == self.timesteps:
+                expanded[key] = value[self.timestep_map]
+            else:
+                expanded[key] = value
+
+        for component in storages:
+            soc_inter = solution[f"SOC_{component.key}_inter"]
+            soc_start = solution[f"SOC_{component.key}_start"] * component.capacity
+
+            # SOC(t) = SOC at the beginning of the period + change of SOC within the representative period
+            period = np.repeat(np.arange(len(self.assignment)), self.period_lengths[self.assignment])
+            expanded[f"SOC_{component.key}"] = (
+                soc_inter[period]
+                + solution[f"SOC_{component.key}"][self.timestep_map]
+                - soc_start[self.assignment[period]]
+            )
+            # storages without capacity are always empty
+            if component.capacity == 0:
+                expanded[f"SOC_{component.key}_start"] = np.zeros(1)
+            else:
+                expanded[f"SOC_{component.key}_start"] = soc_inter[0:1] / component.capacity
+
+        return expanded
+
+    def get_summary(self) -> dict:
+        """
+        This function summarizes the aggregation for the result dictionary of the simulation.
+        :return: [dict] periods, period_length, medoids, assignment and weights of the aggregation
+        """
+        return {
+            "periods": len(self.medoids),
+            "period_length": self.period_length,
+            "medoids": self.medoids,
+            "assignment": self.assignment,
+            "weights": self.weights,
+        }
@@ -10,4 +10,8 @@
 from .add_thermalsystem import add_thermalsystem
 from .add_triggerdemand import add_triggerdemand
 from .add_heatpump import add_heatpump
+from .reduce_model import reduce_model
+from .set_coarse_guidance import release_coarse_fixings, set_coarse_guidance
+from .set_warm_start import set_warm_start
 from .solve import solve
+from .update_interval_data import update_interval_data
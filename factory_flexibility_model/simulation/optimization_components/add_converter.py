@@ -31,11 +31,105 @@
 # IMPORTS
 import logging
 
-import gurobipy as gp
+import numpy as np
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_update,
+    update_coefficients,
+)
+
 
 # CODE START
+def get_efficiency_breakpoints(simulation, component):
+    """
+    This function determines the breakpoints of a piecewise linear approximation of the output power P * Eta(P) of a
+    converter with variable efficiency. simulation.efficiency_breakpoints points are spread evenly over the operating
+    range, the nominal operating point is always included. Segments are split further until the efficiency resulting
+    from the approximation deviates by no more than simulation.efficiency_tolerance from the exact curve. On a segment
+    [a, b] the maximum deviation is delta_eta * (sqrt(b) - sqrt(a))^2.
+    :param simulation: [simulation-object]
+    :param component: components.converter-object
+    :return: [np.array] operating points P of the breakpoints or None if the operating range is not bounded
+    """
+    # determine the operating range: P is limited by power_max and by the operating points where the efficiency drops to zero
+    lower = 0
+    if component.delta_eta_low > 0:
+        lower = max(0, component.power_nominal - component.eta_max / component.delta_eta_low)
+    upper = []
+    if component.power_max_limited:
+        upper.append(np.max(component.power_max * component.availability))
+    if component.delta_eta_high > 0:
+        upper.append(component.power_nominal + component.eta_max / component.delta_eta_high)
+    if not upper:
+        return None
+    upper = min(upper)
+
+    points = list(np.linspace(lower, upper, max(simulation.efficiency_breakpoints, 2)))
+    if lower < component.power_nominal < upper:
+        points.append(component.power_nominal)
+    points = sorted(set(points))
+
+    # split segments until the tolerance is met
+    breakpoints = [points[0]]
+    for a, b in zip(points[:-1], points[1:]):
+        segments = [(a, b)]
+        while segments:
+            a_i, b_i = segments.pop(0)
+            delta_eta = component.delta_eta_high if a_i >= component.power_nominal else component.delta_eta_low
+            if delta_eta * (np.sqrt(b_i) - np.sqrt(a_i)) ** 2 > simulation.efficiency_tolerance:
+                segments[0:0] = [(a_i, (a_i + b_i) / 2), ((a_i + b_i) / 2, b_i)]
+            else:
+                breakpoints.append(b_i)
+
+    return np.array(breakpoints)
+
+
+def get_deviation_limits(component):
+    """
+    This function determines upper bounds of the deviations from the nominal operating point that are valid while a
+    switchable converter is switched on. They are used to force the deviations to zero while the converter is switched
+    off, which keeps the calculation of the operating point linear.
+    If the deviations only determine the operating point, every operating point 0 <= P <= power_max can be expressed
+    with devneg <= power_nominal and devpos <= power_max - power_nominal. If they also determine the efficiency, both
+    deviations may be increased simultaneously to lower the efficiency. The limits are then derived from Eta >= 0.
+    :param component: components.converter-object
+    :return: [tuple] maximum positive and negative deviation (np.inf if no finite limit is known)
+    """
+    power_max = np.inf
+    if component.power_max_limited:
+        power_max = np.max(component.power_max * component.availability)
+
+    if not (component.eta_variable and (component.delta_eta_high > 0 or component.delta_eta_low > 0)):
+        return max(power_max - component.power_nominal, 0), component.power_nominal
+
+    limit_pos = np.inf
+    limit_neg = np.inf
+    if component.delta_eta_high > 0:
+        limit_pos = component.eta_max / component.delta_eta_high
+    if component.delta_eta_low > 0:
+        limit_neg = component.eta_max / component.delta_eta_low
+
+    # P = power_nominal - devneg + devpos must stay within [0, power_max]
+    return (
+        min(limit_pos, max(power_max - component.power_nominal, 0) + limit_neg),
+        min(limit_neg, component.power_nominal + limit_pos),
+    )
+
+
+def get_efficiency(component, power):
+    """
+    :param component: components.converter-object
+    :param power: [np.array] operating points P of the converter
+    :return: [np.array] exact efficiency Eta(P) of the converter at the given operating points
+    """
+    return (
+        component.eta_max
+        - np.maximum(power - component.power_nominal, 0) * component.delta_eta_high
+        - np.maximum(component.power_nominal - power, 0) * component.delta_eta_low
+    )
+
+
 def add_converter(simulation, component, t_start, t_end):
     """
     This function adds all necessary MVARS and constraints to the optimization problem that are
@@ -46,9 +140,23 @@ def add_converter(simulation, component, t_start, t_end):
     """
     interval_length = t_end-t_start+1
 
+    # get the state handed over from the previous interval during receding horizon simulations
+    state = simulation.interval_state.get(component.key)
+
+    # power limits of converters without switching state are set as bounds of the utilization
+    def get_power_bounds(t_start, t_end):
+        lower_bound = np.zeros(t_end - t_start + 1)
+        upper_bound = np.full(t_end - t_start + 1, GRB.INFINITY)
+        if not component.switchable and component.power_min_limited:
+            lower_bound = component.power_min[t_start : t_end + 1] * component.availability[t_start : t_end + 1]
+        if not component.switchable and component.power_max_limited:
+            upper_bound = component.power_max[t_start : t_end + 1] * component.availability[t_start : t_end + 1]
+        return lower_bound, upper_bound
+
     # create a timeseries of decision variables to represent the utilization U(t)
+    lower_bound, upper_bound = get_power_bounds(t_start, t_end)
     simulation.MVars[f"P_{component.key}"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"P_{component.name}"
+        interval_length, vtype=GRB.CONTINUOUS, lb=lower_bound, ub=upper_bound, name=f"P_{component.name}"
     )
     logging.debug(
         f"        - Variable:     {component.name} (timeseries of the nominal power of {component.name})"
@@ -62,74 +170,172 @@ def add_converter(simulation, component, t_start, t_end):
         interval_length, vtype=GRB.CONTINUOUS, name=f"P_{component.name}_devneg"
     )
 
-    # Calculate the efficiency of operation for each timestep based on the deviations
+    # Calculate the efficiency of operation for each timestep based on the deviations. A fixed efficiency is set by the bounds
     simulation.MVars[f"Eta_{component.key}"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"Eta_{component.name}"
+        interval_length,
+        vtype=GRB.CONTINUOUS,
+        lb=0 if component.eta_variable else 1,
+        ub=GRB.INFINITY if component.eta_variable else 1,
+        name=f"Eta_{component.name}",
     )
     logging.debug(
         f"        - Variable:     {component.name}                              "
         f"(Operating efficiency of {component.name}"
     )
 
+    # converters with variable efficiency may be approximated piecewise linear to avoid the bilinear output calculation
+    breakpoints = None
+    if component.eta_variable and simulation.efficiency_breakpoints is not None:
+        breakpoints = get_efficiency_breakpoints(simulation, component)
+        if breakpoints is None:
+            logging.warning(
+                f"The operating range of converter {component.name} is unbounded, the efficiency curve can not be "
+                f"approximated piecewise linear. The exact bilinear model is used instead"
+            )
+
     if component.eta_variable:
-        if simulation.problem_class["grade"] < 2:
+        if breakpoints is None and simulation.problem_class["grade"] < 2:
             simulation.problem_class["grade"] = 2
-        simulation.m.addConstrs(
-            simulation.MVars[f"Eta_{component.key}"][t]
+        simulation.m.addConstr(
+            simulation.MVars[f"Eta_{component.key}"]
             == component.eta_max
-            - simulation.MVars[f"P_{component.key}_devpos"][t]
-            * component.delta_eta_high
-            - simulation.MVars[f"P_{component.key}_devneg"][t] * component.delta_eta_low
-            for t in range(interval_length)
+            - simulation.MVars[f"P_{component.key}_devpos"] * component.delta_eta_high
+            - simulation.MVars[f"P_{component.key}_devneg"] * component.delta_eta_low
         )
         logging.debug(f"        - Constraint:   Calculate Eta(t) for {component.name}")
     else:
-        simulation.m.addConstrs(
-            simulation.MVars[f"Eta_{component.key}"][t] == 1
-            for t in range(interval_length)
+        logging.debug(f"        - Bound:        Efficiency of {component.name} fixed to 100%")
+
+    if breakpoints is not None:
+        # The operating point is expressed as convex combination of two neighbouring breakpoints (SOS2 condition
+        # modelled with one binary per segment). The deviations and the output power P * Eta(P) are interpolated
+        # between the values at the breakpoints, which is exact for the deviations and Eta.
+        simulation.MVars[f"Lambda_{component.key}"] = simulation.m.addMVar(
+            (interval_length, len(breakpoints)), vtype=GRB.CONTINUOUS, name=f"Lambda_{component.name}"
+        )
+        simulation.MVars[f"Bool_{component.key}_segment"] = simulation.m.addMVar(
+            (interval_length, len(breakpoints) - 1), vtype=GRB.BINARY, name=f"{component.name}_segment"
+        )
+        simulation.MVars[f"P_eta_{component.key}"] = simulation.m.addMVar(
+            interval_length, vtype=GRB.CONTINUOUS, name=f"P_eta_{component.name}"
+        )
+        simulation.problem_class["type"] = "mixed integer"
+        weights = simulation.MVars[f"Lambda_{component.key}"]
+        segments = simulation.MVars[f"Bool_{component.key}_segment"]
+
+        # switchable converters only operate on the curve while they are switched on
+        if component.switchable:
+            simulation.MVars[f"Bool_{component.key}_state"] = simulation.m.addMVar(
+                interval_length, vtype=GRB.BINARY, name=f"{component.name}_state"
+            )
+            active = simulation.MVars[f"Bool_{component.key}_state"]
+        else:
+            active = 1
+        simulation.m.addConstr(weights.sum(axis=1) == active)
+        simulation.m.addConstr(segments.sum(axis=1) == active)
+
+        # only the weights of the two breakpoints enclosing the selected segment may be non-zero
+        simulation.m.addConstr(weights[:, 0] <= segments[:, 0])
+        simulation.m.addConstr(weights[:, -1] <= segments[:, -1])
+        if len(breakpoints) > 2:
+            simulation.m.addConstr(weights[:, 1:-1] <= segments[:, :-1] + segments[:, 1:])
+
+        # interpolate deviations and output power between the breakpoints
+        simulation.m.addConstr(
+            simulation.MVars[f"P_{component.key}_devpos"]
+            == weights @ np.maximum(breakpoints - component.power_nominal, 0)
+        )
+        simulation.m.addConstr(
+            simulation.MVars[f"P_{component.key}_devneg"]
+            == weights @ np.maximum(component.power_nominal - breakpoints, 0)
+        )
+        simulation.m.addConstr(
+            simulation.MVars[f"P_eta_{component.key}"]
+            == weights @ (breakpoints * get_efficiency(component, breakpoints))
+        )
+        logging.debug(
+            f"        - Constraint:   P_{component.name} * Eta_{component.name} approximated by {len(breakpoints)} breakpoints"
         )
-        logging.debug(f"        - Constraint:   Efficiency of {component.name} fixed to 100%")
 
     # calculate the absolute operating point out of the nominal operating point, the deviations and the switching state
     # Can the Converter be turned on/off regardless of the power constraints?
     if component.switchable:
         simulation.problem_class["type"] = "mixed integer"
-        # introduce a variable representing the switching state of the converter
-        simulation.MVars[f"Bool_{component.key}_state"] = simulation.m.addMVar(
-            interval_length, vtype=GRB.BINARY, name=f"{component.name}_state"
-        )
+        if breakpoints is not None:
+            # the operating point is the interpolated breakpoint, which is zero while switched off
+            simulation.m.addConstr(
+                simulation.MVars[f"P_{component.key}"]
+                == simulation.MVars[f"Lambda_{component.key}"] @ breakpoints
+            )
+        else:
+            # introduce a variable representing the switching state of the converter
+            simulation.MVars[f"Bool_{component.key}_state"] = simulation.m.addMVar(
+                interval_length, vtype=GRB.BINARY, name=f"{component.name}_state"
+            )
 
-        # calculate the operating point concerning the switching state
-        simulation.m.addConstrs(
-            simulation.MVars[f"P_{component.key}"][t]
-            == (
-                component.power_nominal
-                - simulation.MVars[f"P_{component.key}_devneg"][t]
-                + simulation.MVars[f"P_{component.key}_devpos"][t]
+            # calculate the operating point concerning the switching state: P = (P_nominal - devneg + devpos) * Bool is
+            # linearized exactly by forcing the deviations to zero while the converter is switched off
+            simulation.m.addConstr(
+                simulation.MVars[f"P_{component.key}"]
+                == component.power_nominal * simulation.MVars[f"Bool_{component.key}_state"]
+                - simulation.MVars[f"P_{component.key}_devneg"]
+                + simulation.MVars[f"P_{component.key}_devpos"]
+            )
+            for deviation, limit in zip(["devpos", "devneg"], get_deviation_limits(component)):
+                if np.isfinite(limit):
+                    simulation.m.addConstr(
+                        simulation.MVars[f"P_{component.key}_{deviation}"]
+                        <= limit * simulation.MVars[f"Bool_{component.key}_state"]
+                    )
+                else:
+                    # no finite bound known -> use an indicator constraint instead of big M
+                    simulation.m.addGenConstrIndicator(
+                        simulation.MVars[f"Bool_{component.key}_state"], False,
+                        simulation.MVars[f"P_{component.key}_{deviation}"], GRB.LESS_EQUAL, 0.0
+                    )
+            logging.debug(
+                f"        - Constraint:   P_{component.name} == (P_nominal - devneg + devpos) * Bool_{component.name}_state"
             )
-            * simulation.MVars[f"Bool_{component.key}_state"][t]
-            for t in range(interval_length)
-        )
 
         # is the operating power of the converter limited? If yes: add power_max and power_min constraints
         if component.power_max_limited:
-            simulation.m.addConstr(
+            constr_power_max = simulation.m.addConstr(
                 simulation.MVars[f"P_{component.key}"]
                 <= component.power_max[t_start: t_end + 1]
                 * component.availability[t_start: t_end + 1]
                 * simulation.MVars[f"Bool_{component.key}_state"]
             )
+            register_interval_update(
+                simulation,
+                lambda t_start, t_end: update_coefficients(
+                    simulation,
+                    constr_power_max,
+                    simulation.MVars[f"Bool_{component.key}_state"],
+                    -component.power_max[t_start : t_end + 1]
+                    * component.availability[t_start : t_end + 1],
+                ),
+            )
             logging.debug(
                 f"        - Constraint:   P_{component.name} <= {component.name}_max"
             )
 
         if component.power_min_limited:
-            simulation.m.addConstr(
+            constr_power_min = simulation.m.addConstr(
                 simulation.MVars[f"P_{component.key}"]
                 >= component.power_min[t_start: t_end + 1]
                 * component.availability[t_start: t_end + 1]
                 * simulation.MVars[f"Bool_{component.key}_state"]
             )
+            register_interval_update(
+                simulation,
+                lambda t_start, t_end: update_coefficients(
+                    simulation,
+                    constr_power_min,
+                    simulation.MVars[f"Bool_{component.key}_state"],
+                    -component.power_min[t_start : t_end + 1]
+                    * component.availability[t_start : t_end + 1],
+                ),
+            )
             logging.debug(f"        - Constraint:   P_{component.name} >= {component.name}_min")
     else:
         # calculate the operating point without a switching state
@@ -140,24 +346,18 @@ def add_converter(simulation, component, t_start, t_end):
             + simulation.MVars[f"P_{component.key}_devpos"]
         )
 
-        # is the operating power of the converter limited? If yes: add power_max and power_min constraints
-        if component.power_max_limited:
-            simulation.m.addConstr(
-                simulation.MVars[f"P_{component.key}"]
-                <= component.power_max[t_start: t_end + 1]
-                * component.availability[t_start: t_end + 1]
-            )
-            logging.debug(
-                f"        - Constraint:   P_{component.name} <= {component.name}_max"
-            )
+        # is the operating power of the converter limited? If yes: the limits are set as bounds of P
+        if component.power_max_limited or component.power_min_limited:
 
-        if component.power_min_limited:
-            simulation.m.addConstr(
-                simulation.MVars[f"P_{component.key}"]
-                >= component.power_min[t_start: t_end + 1]
-                * component.availability[t_start: t_end + 1]
+            def update_power_bounds(t_start, t_end):
+                lower_bound, upper_bound = get_power_bounds(t_start, t_end)
+                simulation.MVars[f"P_{component.key}"].setAttr("LB", lower_bound)
+                simulation.MVars[f"P_{component.key}"].setAttr("UB", upper_bound)
+
+            register_interval_update(simulation, update_power_bounds)
+            logging.debug(
+                f"        - Bound:        {component.name}_min <= P_{component.name} <= {component.name}_max"
             )
-            logging.debug(f"        - Constraint:   P_{component.name} >= {component.name}_min")
 
     # set ramping constraints if needed:
     if component.ramp_power_limited:
@@ -171,6 +371,24 @@ def add_converter(simulation, component, t_start, t_end):
             >= simulation.MVars[f"P_{component.key}"][0 : interval_length - 1]
             - component.power_ramp_max_neg
         )  # restrict ramping down
+
+        # restrict the ramping from the last operating point of the previous interval
+        if state is not None:
+            constr_ramp_pos = simulation.m.addConstr(
+                simulation.MVars[f"P_{component.key}"][0]
+                <= state["power"] + component.power_ramp_max_pos
+            )
+            constr_ramp_neg = simulation.m.addConstr(
+                simulation.MVars[f"P_{component.key}"][0]
+                >= state["power"] - component.power_ramp_max_neg
+            )
+
+            def update_ramping(t_start, t_end):
+                power = simulation.interval_state[component.key]["power"]
+                constr_ramp_pos.setAttr("RHS", power + component.power_ramp_max_pos)
+                constr_ramp_neg.setAttr("RHS", power - component.power_ramp_max_neg)
+
+            register_interval_update(simulation, update_ramping)
         logging.debug(
             f"        - Constraint:   Ramping constraints for {component.name}"
         )
@@ -186,7 +404,17 @@ def add_converter(simulation, component, t_start, t_end):
 
     # set the flows of outgoing connections
     for connection in component.outputs:
-        if connection.flowtype.is_energy():
+        if connection.flowtype.is_energy() and breakpoints is not None:
+            simulation.m.addConstr(
+                simulation.MVars[connection.key]
+                == simulation.MVars[f"P_eta_{component.key}"]
+                * connection.weight
+                * simulation.interval_length
+            )
+            logging.debug(
+                f"        - Added energy output calculation with piecewise linear losses for {connection.name}"
+            )
+        elif connection.flowtype.is_energy() and component.eta_variable:
             simulation.m.addConstr(
                 simulation.MVars[connection.key]
                 == simulation.MVars[f"P_{component.key}"]
@@ -197,6 +425,17 @@ def add_converter(simulation, component, t_start, t_end):
             logging.debug(
                 f"        - Added energy output calculation with losses for {connection.name}"
             )
+        elif connection.flowtype.is_energy():
+            # the efficiency is fixed to 100% -> keep the output calculation linear
+            simulation.m.addConstr(
+                simulation.MVars[connection.key]
+                == simulation.MVars[f"P_{component.key}"]
+                * connection.weight
+                * simulation.interval_length
+            )
+            logging.debug(
+                f"        - Added energy output calculation for {connection.name}"
+            )
         else:
             simulation.m.addConstr(
                 simulation.MVars[connection.key]
@@ -232,33 +471,37 @@ def add_converter(simulation, component, t_start, t_end):
     if component.rampup_cost > 0:
         # If yes: Add an MVar for calculating the occuring rampups
         # create single float Mvar
+        # P_rampup(t) represents the rampup from timestep t-1 to timestep t
         simulation.MVars[f"P_rampup_{component.key}"] = simulation.m.addMVar(
-            interval_length - 1,
+            interval_length,
             vtype=GRB.CONTINUOUS,
             lb=0,
             name=f"P_rampup_{component.key}",
         )
 
         # define the Mvar as the realized rampup
-        simulation.m.addConstrs(
-            simulation.MVars[f"P_rampup_{component.key}"]
-            >= simulation.MVars[f"P_{component.key}"][t + 1]
-            - simulation.MVars[f"P_{component.key}"][t]
-            for t in range(interval_length - 1)
+        simulation.m.addConstr(
+            simulation.MVars[f"P_rampup_{component.key}"][1:interval_length]
+            >= simulation.MVars[f"P_{component.key}"][1:interval_length]
+            - simulation.MVars[f"P_{component.key}"][0 : interval_length - 1]
         )
 
-        # create new cost term
-        simulation.C_objective.append(
-            simulation.m.addMVar(
-                1, vtype=GRB.CONTINUOUS, name=f"C_rampup_{component.key}"
+        # the first timestep ramps up from the last operating point of the previous interval
+        if state is not None:
+            constr_rampup_start = simulation.m.addConstr(
+                simulation.MVars[f"P_rampup_{component.key}"][0]
+                >= simulation.MVars[f"P_{component.key}"][0] - state["power"]
+            )
+            register_interval_update(
+                simulation,
+                lambda t_start, t_end: constr_rampup_start.setAttr(
+                    "RHS", -simulation.interval_state[component.key]["power"]
+                ),
             )
-        )
 
-        # define the cost term
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == gp.quicksum(simulation.MVars[f"P_rampup_{component.key}"])
-            * component.rampup_cost
+        # add the cost term
+        simulation.C_objective.append(
+            simulation.MVars[f"P_rampup_{component.key}"].sum() * component.rampup_cost
         )
 
         logging.debug(f"        - CostFactor:   Cost for ramping of {component.name}")
@@ -271,29 +514,16 @@ def add_converter(simulation, component, t_start, t_end):
             1, vtype=GRB.CONTINUOUS, name=f"P_max_{component.key}"
         )
 
-        # define the Mvar as the maximum used utilization
+        # define the Mvar as the maximum used utilization. Since the capacity charge is minimized, an upper bound
+        # for every timestep is sufficient and keeps the problem linear
         simulation.m.addConstr(
-            simulation.MVars[f"P_max_{component.key}"][0]
-            == gp.max_(
-                (
-                    simulation.MVars[f"P_{component.key}"][t]
-                    for t in range(interval_length)
-                ),
-                constant=0,
-            )
+            simulation.MVars[f"P_max_{component.key}"]
+            >= simulation.MVars[f"P_{component.key}"]
         )
 
-        # create new cost term
+        # add the cost term -> capacity_charge is specified on yearly basis and has to be broken down to simulation timeframe
         simulation.C_objective.append(
-            simulation.m.addMVar(
-                1, vtype=GRB.CONTINUOUS, name=f"C_Capacity_{component.key}"
-            )
-        )
-
-        # define the costs -> capacity_charge is specified on yearly basis and has to be broken down to simulation timeframe
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == simulation.interval_length
+            simulation.interval_length
             * interval_length
             / 8760
             * component.capacity_charge
@@ -31,6 +31,10 @@
 # IMPORTS
 import logging
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_update,
+)
+
 
 # CODE START
 def add_deadtime(simulation, component, t_start, t_end):
@@ -51,11 +55,23 @@ def add_deadtime(simulation, component, t_start, t_end):
         )
     delay = int(delay)
 
+    # get the material that is still in transit from the previous interval during receding horizon simulations
+    state = simulation.interval_state.get(component.key)
+
     # check, if the deadtime is slacked:
     if len(component.outputs) == 1:
         # no slacks...
-        # set output_flow = slack for start interval
-        simulation.m.addConstr(simulation.MVars[component.outputs[0].key][0:delay] == 0)
+        if state is None:
+            # set output_flow = slack for start interval
+            simulation.m.addConstr(
+                simulation.MVars[component.outputs[0].key][0:delay] == 0
+            )
+        else:
+            # set output_flow = material in transit for start interval
+            constr_transit = simulation.m.addConstr(
+                simulation.MVars[component.outputs[0].key][0:delay]
+                == state["in_transit"][0:interval_length]
+            )
 
         # set output(t) = input(t-delay) for middle interval
         simulation.m.addConstr(
@@ -66,29 +82,52 @@ def add_deadtime(simulation, component, t_start, t_end):
         # set input(t) = slack for end interval
         simulation.m.addConstr(
             simulation.MVars[component.inputs[0].key][
-                interval_length - delay : interval_length - 1
+                interval_length - delay : interval_length
             ]
             == 0
         )
 
     else:
         # set output_flow = slack for start interval
-        simulation.m.addConstrs(
-            simulation.MVars[component.outputs[1].key][t]
-            == simulation.MVars[component.inputs[0].key][t]
-            for t in range(delay)
-        )
+        if delay > 0:
+            if state is None:
+                simulation.m.addConstr(
+                    simulation.MVars[component.outputs[1].key][0:delay]
+                    == simulation.MVars[component.inputs[0].key][0:delay]
+                )
+            else:
+                # set output_flow = material in transit for start interval and disable the slack
+                constr_transit = simulation.m.addConstr(
+                    simulation.MVars[component.outputs[1].key][0:delay]
+                    == state["in_transit"][0:interval_length]
+                )
+                simulation.m.addConstr(
+                    simulation.MVars[component.inputs[0].key][0:delay] == 0
+                )
 
         # set output(t) = input(t-delay) for middle interval
-        simulation.m.addConstrs(
-            simulation.MVars[component.outputs[1].key][t + delay]
-            == simulation.MVars[component.inputs[1].key][t]
-            for t in range(interval_length - delay)
+        simulation.m.addConstr(
+            simulation.MVars[component.outputs[1].key][delay:interval_length]
+            == simulation.MVars[component.inputs[1].key][0 : interval_length - delay]
         )
 
         # set input(t) = slack for end interval
-        simulation.m.addConstrs(
-            simulation.MVars[component.inputs[1].key][interval_length - t - 1]
-            == simulation.MVars[component.outputs[0].key][t]
-            for t in range(delay)
+        if delay > 0:
+            simulation.m.addConstr(
+                simulation.MVars[component.inputs[1].key][
+                    interval_length - delay : interval_length
+                ][::-1]
+                == simulation.MVars[component.outputs[0].key][0:delay]
+            )
+
+    # when the model is reused: hand over the material in transit from the previous interval
+    if state is not None and delay > 0:
+        register_interval_update(
+            simulation,
+            lambda t_start, t_end: constr_transit.setAttr(
+                "RHS",
+                simulation.interval_state[component.key]["in_transit"][
+                    0:interval_length
+                ],
+            ),
         )
@@ -41,6 +41,10 @@ def add_flows(simulation, interval_length):
     """
     # iterate over all existing connections
     for connection in simulation.factory.connections.values():
+        # connections that have been merged by the model reduction share the variable of another connection
+        if connection.key in simulation.aliases:
+            continue
+
         # create a timeseries of decision variables for the flowtype on every connection in the graph
         simulation.MVars[connection.key] = simulation.m.addMVar(
             interval_length, vtype=GRB.CONTINUOUS, name=connection.key
@@ -49,3 +53,7 @@ def add_flows(simulation, interval_length):
         logging.debug(
             f"        - Variable:     {connection.name}                                (timeseries of flowtype on connection {connection.name})"
         )
+
+    for connection in simulation.factory.connections.values():
+        if connection.key in simulation.aliases:
+            simulation.MVars[connection.key] = simulation.MVars[simulation.aliases[connection.key]]
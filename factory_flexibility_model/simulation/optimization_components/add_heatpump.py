@@ -32,6 +32,11 @@
 import gurobipy as gp
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_update,
+    update_coefficients,
+)
+
 
 # CODE START
 def add_heatpump(simulation, component, t_start, t_end):
@@ -49,16 +54,24 @@ def add_heatpump(simulation, component, t_start, t_end):
     simulation.MVars[f"P_{component.key}"] = simulation.m.addMVar(interval_length, vtype=GRB.CONTINUOUS, name=f"P_{component.name}")
     logging.debug(f"        - Variable:     {component.name} (timeseries of the nominal power of {component.name})")
 
-    # is the operating power of the heatpump limited? If yes: add power_max constraints
+    # is the operating power of the heatpump limited? If yes: set power_max as upper bound of the utilization
     if component.power_max_limited:
-        simulation.m.addConstr(simulation.MVars[f"P_{component.key}"]<= component.power_max[t_start:t_end+1])
-        logging.debug(f"        - Constraint:   {component.key} <= {component.name}_max")
+        simulation.MVars[f"P_{component.key}"].setAttr("UB", component.power_max[t_start:t_end+1])
+        register_interval_update(simulation, lambda t_start, t_end: simulation.MVars[f"P_{component.key}"].setAttr("UB", component.power_max[t_start:t_end+1]))
+        logging.debug(f"        - Bound:        {component.key} <= {component.name}_max")
 
     # set the flow coming from the main input
     simulation.m.addConstr(simulation.MVars[component.input_main.key] == simulation.MVars[f"P_{component.key}"])
 
     # set the flow coming from the gains input
-    simulation.m.addConstr(simulation.MVars[component.input_gains.key] == simulation.MVars[f"P_{component.key}"] * (component.cop[t_start:t_end+1]-1))
+    constr_gains = simulation.m.addConstr(simulation.MVars[component.input_gains.key] == simulation.MVars[f"P_{component.key}"] * (component.cop[t_start:t_end+1]-1))
 
     # set flow at output
-    simulation.m.addConstr(simulation.MVars[component.outputs[0].key] == simulation.MVars[f"P_{component.key}"] * component.cop[t_start:t_end+1])
\ No newline at end of file
+    constr_output = simulation.m.addConstr(simulation.MVars[component.outputs[0].key] == simulation.MVars[f"P_{component.key}"] * component.cop[t_start:t_end+1])
+
+    # when the model is reused: adapt the cop of the new interval
+    def update_cop(t_start, t_end):
+        update_coefficients(simulation, constr_gains, simulation.MVars[f"P_{component.key}"], 1 - component.cop[t_start:t_end+1])
+        update_coefficients(simulation, constr_output, simulation.MVars[f"P_{component.key}"], -component.cop[t_start:t_end+1])
+
+    register_interval_update(simulation, update_cop)
@@ -42,6 +42,13 @@ def add_pool(simulation, component):
     :param component: components.pool-object
     :return: simulation.m is beeing extended
     """
+    # pools with a single input and output have been collapsed by the model reduction and do not need a constraint
+    if component.key in simulation.collapsed_pools:
+        logging.debug(
+            f"        - Reduction:    Pool {component.name} collapsed into a single flow"
+        )
+        return
+
     # create constraint that ensures, that the sum of inputs equals the sum of outputs in every timestep
     simulation.m.addConstr(
         gp.quicksum(
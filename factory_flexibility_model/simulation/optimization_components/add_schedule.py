@@ -31,7 +31,6 @@
 # IMPORTS
 import logging
 
-import gurobipy as gp
 import numpy as np
 from gurobipy import GRB
 
@@ -48,9 +47,16 @@ def add_schedule(simulation, component, t_start, t_end):
     # calculate interval length
     interval_length = t_end - t_start + 1
 
+    # the structure of the schedule depends on the demands overlapping the interval -> the model cannot be reused
+    simulation.model_reusable = False
+
+    # get the energy delivered in previous intervals during receding horizon simulations
+    state = simulation.interval_state.get(component.key)
+
     # calculate the list of relevant demands for the current simulation interval and split demands if necessary
     relevant_demands = []
-    for row in component.demands:
+    demand_rows = []
+    for row_id, row in enumerate(component.demands):
         start_time = row[0]
         end_time = row[1]
         total_energy = row[2]
@@ -66,14 +72,23 @@ def add_schedule(simulation, component, t_start, t_end):
             new_duration = overlap_end - overlap_start + 1
 
             # calculate the relative amount of energy assigned to the current interval
-            energy_within_interval = total_energy / (end_time-start_time+1) * new_duration
+            if state is None:
+                energy_within_interval = total_energy / (end_time-start_time+1) * new_duration
+            else:
+                # split the energy that has not been delivered yet over the remaining duration of the demand
+                energy_within_interval = (
+                    (total_energy - state["delivered"][row_id])
+                    / (end_time - overlap_start + 1)
+                    * new_duration
+                )
 
             # create adapted row in the demands matrix
             adjusted_row = [overlap_start - t_start, overlap_end - t_start, energy_within_interval, max_power]
             relevant_demands.append(adjusted_row)
+            demand_rows.append(row_id)
 
     # turn list of demands into np array
-    relevant_demands = np.array(relevant_demands)
+    relevant_demands = np.array(relevant_demands).reshape(-1, 4)
 
     # get number of resulting relevant demands
     rows = len(relevant_demands)
@@ -86,72 +101,54 @@ def add_schedule(simulation, component, t_start, t_end):
         ):
             availability[column - 1, row] = 0
     simulation.MVars[f"X_{component.key}_availability"] = availability
+    simulation.MVars[f"X_{component.key}_demand_rows"] = demand_rows
 
-    # create decision variables for the demands
+    # create decision variables for the demands. Part demands are only allowed to be fed while available and have
+    # to adhere their individual power_max, which is both set by the upper bounds
     simulation.MVars[f"E_{component.key}_in"] = simulation.m.addMVar(
-        (interval_length, rows), vtype=GRB.CONTINUOUS, name=f"{component.name}_Pin"
+        (interval_length, rows),
+        vtype=GRB.CONTINUOUS,
+        ub=np.where(availability == 0, relevant_demands[:, 3] * simulation.interval_length, 0),
+        name=f"{component.name}_Pin",
     )
     logging.debug(
         f"        - Variable(s):  Energy_in for {rows} part demands of {component.name}"
     )
+    logging.debug(
+        f"        - Bound:        Part demands of {component.name} can only be fed when available and adhere their power_max"
+    )
 
     # define constraint: input and output must be equal at any timestep to ensure, that the Component just does flowtype control
-    simulation.m.addConstrs(
-        simulation.MVars[component.outputs[0].key][t]
-        == simulation.MVars[component.inputs[0].key][t]
-        for t in range(interval_length)
+    simulation.m.addConstr(
+        simulation.MVars[component.outputs[0].key]
+        == simulation.MVars[component.inputs[0].key]
     )
     logging.debug(f"        - Constraint:   Energy_in == Energy_out for {component.name}")
 
     # define constraint: taken inputs for demand fulfillment must equal the used input in every timestep
-    simulation.m.addConstrs(
-        gp.quicksum(simulation.MVars[f"E_{component.key}_in"][t][:])
-        == simulation.MVars[component.inputs[0].key][t]
-        for t in range(interval_length)
+    simulation.m.addConstr(
+        simulation.MVars[f"E_{component.key}_in"].sum(axis=1)
+        == simulation.MVars[component.inputs[0].key]
     )
     logging.debug(
         f"        - Constraint:   Energy demands must be fed by inputs within {component.name}"
     )
 
     # define constraint: each part demand must have its individual demand fulfilled
-    simulation.m.addConstrs(
-        gp.quicksum(simulation.MVars[f"E_{component.key}_in"][0 : interval_length, i])
-        == relevant_demands[i, 2]
-        for i in range(rows)
+    simulation.m.addConstr(
+        simulation.MVars[f"E_{component.key}_in"].sum(axis=0)
+        == relevant_demands[:, 2]
     )
     logging.debug(
         f"        - Constraint:   Each part demand of {component.name} must have its demand fulfilled"
     )
 
-    # define constraint: part demands are only allowed to be fed while available
-    simulation.m.addConstrs(
-        simulation.MVars[f"E_{component.key}_in"][0 : interval_length, i]
-        @ availability[0 : interval_length, i]
-        == 0
-        for i in range(rows)
-    )
-    logging.debug(
-        f"        - Constraint:   Part demands of {component.name} can only be fed when available"
-    )
-
-    # define constraint: adhere power_max constraints per part demand
-    simulation.m.addConstrs(
-        simulation.MVars[f"E_{component.key}_in"][t, i] / simulation.interval_length
-        <= relevant_demands[i, 3]
-        for t in range(interval_length)
-        for i in range(rows)
-    )
-    logging.debug(
-        f"        - Constraint:   Adhere the power_max constraints for every part demand of {component.name}"
-    )
-
     # define constraint: adhere power_max for total power if needed
     if component.power_max_limited:
-        simulation.m.addConstrs(
-            gp.quicksum(simulation.MVars[f"E_{component.key}_in"][t][:])
+        simulation.m.addConstr(
+            simulation.MVars[f"E_{component.key}_in"].sum(axis=1)
             / simulation.interval_length
-            <= component.power_max[t]
-            for t in range(interval_length)
+            <= component.power_max[t_start : t_end + 1]
         )
         logging.debug(
             f"        - Constraint:   power_total(t) <= power_max for {component.name}"
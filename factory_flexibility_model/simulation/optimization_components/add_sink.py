@@ -31,8 +31,14 @@
 # IMPORTS
 import logging
 import gurobipy as gp
+import numpy as np
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_term,
+    register_interval_update,
+)
+
 
 # CODE START
 def add_sink(simulation, component, t_start, t_end):
@@ -48,84 +54,115 @@ def add_sink(simulation, component, t_start, t_end):
 
     interval_length = t_end - t_start + 1
 
-    # create a timeseries of decision variables to represent the total inflow (energy/material) going into the sink
-    simulation.MVars[f"E_{component.key}"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"E_{component.name}"
-    )
-    logging.debug(
-        f"        - Variable:     {component.name}                                  (timeseries of global outflows to {component.name})"
-    )
+    # the determined demand and the power limits of the sink are set as bounds of the inflow
+    def get_bounds(t_start, t_end):
+        lower_bound = np.zeros(interval_length)
+        upper_bound = np.full(interval_length, GRB.INFINITY)
+        if component.power_min_limited:
+            lower_bound = component.power_min[t_start : t_end + 1] * simulation.interval_length
+        if component.power_max_limited:
+            upper_bound = component.power_max[t_start : t_end + 1] * component.availability[t_start : t_end + 1]
+        if component.determined:
+            lower_bound = np.maximum(lower_bound, component.demand[t_start : t_end + 1])
+            upper_bound = np.minimum(upper_bound, component.demand[t_start : t_end + 1])
+        return lower_bound, upper_bound
 
-    if component.determined:
-        # set the incoming flow to meet the power demand
+    lower_bound, upper_bound = get_bounds(t_start, t_end)
+    if f"E_{component.key}" in simulation.aliases:
+        # the model reduction represents the inflow of the sink by the variable of its input connection
+        simulation.MVars[f"E_{component.key}"] = simulation.MVars[simulation.aliases[f"E_{component.key}"]]
+        if component.determined or component.power_min_limited or component.power_max_limited:
+            simulation.MVars[f"E_{component.key}"].setAttr("LB", lower_bound)
+            simulation.MVars[f"E_{component.key}"].setAttr("UB", upper_bound)
+        logging.debug(
+            f"        - Reduction:    {component.name} represented by flow {component.inputs[0].name}"
+        )
+    else:
+        # create a timeseries of decision variables to represent the total inflow (energy/material) going into the sink
+        simulation.MVars[f"E_{component.key}"] = simulation.m.addMVar(
+            interval_length, vtype=GRB.CONTINUOUS, lb=lower_bound, ub=upper_bound, name=f"E_{component.name}"
+        )
+        logging.debug(
+            f"        - Variable:     {component.name}                                  (timeseries of global outflows to {component.name})"
+        )
+
+        # set the inflow of the component to match the input flow
         simulation.m.addConstr(
             simulation.MVars[component.inputs[0].key]
-            == component.demand[t_start : t_end + 1]
+            == simulation.MVars[f"E_{component.key}"]
         )
+        logging.debug(f"        - Constraint:   {component.name} == sum of incoming flows")
+
+    if component.determined or component.power_min_limited or component.power_max_limited:
+
+        def update_bounds(t_start, t_end):
+            lower_bound, upper_bound = get_bounds(t_start, t_end)
+            simulation.MVars[f"E_{component.key}"].setAttr("LB", lower_bound)
+            simulation.MVars[f"E_{component.key}"].setAttr("UB", upper_bound)
+
+        register_interval_update(simulation, update_bounds)
+
+    if component.determined:
         logging.debug(
-            f"        - Constraint:   Sum of incoming flows == determined total demand              ({component.name} determined by timeseries)"
+            f"        - Bound:        Sum of incoming flows == determined total demand              ({component.name} determined by timeseries)"
         )
 
-    # set the inflow of the component to match the input flow
-    simulation.m.addConstr(
-        simulation.MVars[component.inputs[0].key]
-        == simulation.MVars[f"E_{component.key}"]
-    )
-    logging.debug(f"        - Constraint:   {component.name} == sum of incoming flows")
-
     # is the total cumulative input of the sink limited? If yes: add sum constraint
     if component.max_total_input_limited:
-        simulation.m.addConstr(
-            gp.quicksum(simulation.MVars[f"E_{component.key}"])
-            <= component.max_total_input
+        # during receding horizon simulations only the part of the limit that has not been used in previous intervals remains
+        def remaining_total_input():
+            state = simulation.interval_state.get(component.key)
+            if state is None:
+                return component.max_total_input
+            return component.max_total_input - state["total_input"]
+
+        if simulation.aggregation is None:
+            total_input = gp.quicksum(simulation.MVars[f"E_{component.key}"])
+        else:
+            # every timestep of an aggregated simulation stands for all periods of its representative period
+            total_input = simulation.aggregation.timestep_weights @ simulation.MVars[f"E_{component.key}"]
+        constr_total_input = simulation.m.addConstr(
+            total_input <= remaining_total_input()
+        )
+        register_interval_update(
+            simulation,
+            lambda t_start, t_end: constr_total_input.setAttr(
+                "RHS", remaining_total_input()
+            ),
         )
         logging.debug(
             f"        - Constraint:   sum({component.name}(t)) <= {component.name}_max_total"
         )
 
-    # is the maximum output power of the destination limited? If yes: Add power_max constraint
+    # is the power of the destination limited? The limits are set as bounds of the inflow
     if component.power_max_limited:
-        simulation.m.addConstr(
-            simulation.MVars[f"E_{component.key}"]
-            <= component.power_max[t_start : t_end + 1]
-            * component.availability[t_start : t_end + 1]
-        )
         logging.debug(
-            f"        - Constraint:   {component.key} <= {component.name}_max"
+            f"        - Bound:        {component.key} <= {component.name}_max"
         )
-
-    # is the minimum output power of the source limited? If yes: Add power_min constraint
     if component.power_min_limited:
-        simulation.m.addConstrs(
-            simulation.MVars[f"E_{component.key}"] / interval_length
-            >= component.power_min[t]
-            for t in range(interval_length)
-        )
         logging.debug(
-            f"        - Constraint:   {component.name} >= {component.name}_min"
+            f"        - Bound:        {component.name} >= {component.name}_min"
         )
 
     # does the utilization of the destination cost something? If yes: Add the corresponding cost factors
     if component.chargeable:
-        simulation.C_objective.append(
-            simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"C_{component.key}")
-        )
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == component.cost[t_start : t_end + 1]
-            @ simulation.MVars[f"E_{component.key}"]
+        register_interval_term(
+            simulation,
+            simulation.C_objective,
+            lambda t_start, t_end: component.cost[t_start : t_end + 1] @ simulation.MVars[f"E_{component.key}"],
+            t_start,
+            t_end,
         )
         logging.debug(f"        - CostFactor:   Cost for dumping into {component.name}")
 
     # does the utilization of the destination create revenue? If yes: Add the corresponding negative cost factors
     if component.refundable:
-        simulation.R_objective.append(
-            simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"R_{component.key}")
-        )
-        simulation.m.addConstr(
-            simulation.R_objective[-1]
-            == component.revenue[t_start : t_end + 1]
-            @ simulation.MVars[f"E_{component.key}"]
+        register_interval_term(
+            simulation,
+            simulation.R_objective,
+            lambda t_start, t_end: component.revenue[t_start : t_end + 1] @ simulation.MVars[f"E_{component.key}"],
+            t_start,
+            t_end,
         )
         logging.debug(
             f"        - CostFactor:   Revenue for sales generated by {component.name}"
@@ -133,13 +170,13 @@ def add_sink(simulation, component, t_start, t_end):
 
     if component.causes_emissions:
         # additional emissions
-        simulation.emission_sources.append(
-            simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"CO2_{component.key}")
-        )
-        simulation.m.addConstr(
-            simulation.emission_sources[-1]
-            == component.co2_emissions_per_unit[t_start : t_end + 1]
-            @ simulation.MVars[f"E_{component.key}"]
+        register_interval_term(
+            simulation,
+            simulation.emission_sources,
+            lambda t_start, t_end: component.co2_emissions_per_unit[t_start : t_end + 1]
+            @ simulation.MVars[f"E_{component.key}"],
+            t_start,
+            t_end,
         )
         logging.debug(
             f"        - EmissionFactor:   Emissions caused by usage of {component.name}"
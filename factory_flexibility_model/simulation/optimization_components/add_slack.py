@@ -31,7 +31,9 @@
 # IMPORTS
 import logging
 
-from gurobipy import GRB
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_term,
+)
 
 
 # CODE START
@@ -50,24 +52,24 @@ def add_slack(simulation, component, t_start, t_end):
 
     # add a cost term for negative slack usage to the target function
     for i in range(len(component.inputs)):
-        simulation.C_objective.append(
-            simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"C_{component.key}_neg")
-        )
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == component.cost[0 : interval_length]
-            @ simulation.MVars[component.inputs[i].key][0 : interval_length]
+        register_interval_term(
+            simulation,
+            simulation.C_objective,
+            lambda t_start, t_end, i=i: component.cost[t_start : t_end + 1]
+            @ simulation.MVars[component.inputs[i].key][0 : interval_length],
+            t_start,
+            t_end,
         )
         logging.debug(f"        - CostFactor:   C_{component.key}_negative")
 
     # add a cost term for negative slack usage to the target function
     for i in range(len(component.outputs)):
-        simulation.C_objective.append(
-            simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"C_{component.key}_pos")
-        )
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == component.cost[0 : interval_length]
-            @ simulation.MVars[component.outputs[i].key][0 : interval_length]
+        register_interval_term(
+            simulation,
+            simulation.C_objective,
+            lambda t_start, t_end, i=i: component.cost[t_start : t_end + 1]
+            @ simulation.MVars[component.outputs[i].key][0 : interval_length],
+            t_start,
+            t_end,
         )
         logging.debug(f"        - CostFactor:   C_{component.key}_positive")
@@ -31,8 +31,14 @@
 # IMPORTS
 import logging
 import gurobipy as gp
+import numpy as np
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_term,
+    register_interval_update,
+)
+
 
 # CODE START
 def add_source(simulation, component, t_start, t_end):
@@ -45,96 +51,82 @@ def add_source(simulation, component, t_start, t_end):
 
     interval_length = t_end-t_start+1
 
-    # create a timeseries of decision variables to represent the total inflow coming from the source
-    simulation.MVars[f"E_{component.key}"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"P_{component.key}"
-    )
-
-    logging.debug(
-        f"        - Variable:     {component.name}                              (timeseries of global inputs from E_{component.name})"
-    )
+    # the determined supply and the power limits of the source are set as bounds of the total inflow
+    def get_bounds(t_start, t_end):
+        lower_bound = np.zeros(interval_length)
+        upper_bound = np.full(interval_length, GRB.INFINITY)
+        if component.power_min_limited:
+            lower_bound = component.power_min[t_start:t_end+1] * simulation.interval_length
+        if component.power_max_limited:
+            upper_bound = component.power_max[t_start:t_end+1] * component.availability[t_start:t_end+1] * simulation.interval_length
+        elif simulation.factory.enable_slacks:
+            upper_bound = np.full(interval_length, simulation.big_m)
+        if component.determined:
+            lower_bound = np.maximum(lower_bound, component.determined_power[t_start:t_end+1])
+            upper_bound = np.minimum(upper_bound, component.determined_power[t_start:t_end+1])
+        return lower_bound, upper_bound
+
+    lower_bound, upper_bound = get_bounds(t_start, t_end)
+    if f"E_{component.key}" in simulation.aliases:
+        # the model reduction represents the outflow of the source by the variable of its output connection
+        simulation.MVars[f"E_{component.key}"] = simulation.MVars[simulation.aliases[f"E_{component.key}"]]
+        if component.determined or component.power_min_limited or component.power_max_limited or simulation.factory.enable_slacks:
+            simulation.MVars[f"E_{component.key}"].setAttr("LB", lower_bound)
+            simulation.MVars[f"E_{component.key}"].setAttr("UB", upper_bound)
+        logging.debug(
+            f"        - Reduction:    {component.name} represented by flow {component.outputs[0].name}"
+        )
+    else:
+        # create a timeseries of decision variables to represent the total inflow coming from the source
+        simulation.MVars[f"E_{component.key}"] = simulation.m.addMVar(
+            interval_length, vtype=GRB.CONTINUOUS, lb=lower_bound, ub=upper_bound, name=f"P_{component.key}"
+        )
+        logging.debug(
+            f"        - Variable:     {component.name}                              (timeseries of global inputs from E_{component.name})"
+        )
 
-    # set the sum of outgoing flows to meet the fixed supply
-    if component.determined:
+        # add constraints to calculate the total inflow to the system as the sum of all flows of outgoing connections
         simulation.m.addConstr(
             gp.quicksum(
                 simulation.MVars[component.outputs[o].key]
                 for o in range(len(component.outputs))
             )
-            == component.determined_power[t_start:t_end+1]
+            == simulation.MVars[f"E_{component.key}"]
         )
+        logging.debug(f"        - Constraint:   {component.name} == sum of outgoing flows")
 
-    # add constraints to calculate the total inflow to the system as the sum of all flows of outgoing connections
-    simulation.m.addConstr(
-        gp.quicksum(
-            simulation.MVars[component.outputs[o].key]
-            for o in range(len(component.outputs))
-        )
-        == simulation.MVars[f"E_{component.key}"]
-    )
+    if component.determined or component.power_min_limited or component.power_max_limited:
 
-    logging.debug(f"        - Constraint:   {component.name} == sum of outgoing flows")
+        def update_bounds(t_start, t_end):
+            lower_bound, upper_bound = get_bounds(t_start, t_end)
+            simulation.MVars[f"E_{component.key}"].setAttr("LB", lower_bound)
+            simulation.MVars[f"E_{component.key}"].setAttr("UB", upper_bound)
 
-    # is the maximum output power of the source limited? If yes: Add power_max constraint
+        register_interval_update(simulation, update_bounds)
+
+    # is the output power of the source limited? The limits are set as bounds of the total inflow
     if component.power_max_limited:
-        simulation.m.addConstr(
-            gp.quicksum(
-                simulation.MVars[component.outputs[o].key]
-                for o in range(len(component.outputs))
-            )
-            / simulation.interval_length
-            <= component.power_max[t_start:t_end+1] * component.availability[t_start:t_end+1]
-        )
         logging.debug(
-            f"        - Constraint:   {component.name} <= P_{component.name}_max"
+            f"        - Bound:        {component.name} <= P_{component.name}_max"
         )
     elif simulation.factory.enable_slacks:
-        simulation.m.addConstr(
-            gp.quicksum(
-                simulation.MVars[component.outputs[o].key]
-                for o in range(len(component.outputs))
-            )
-            <= simulation.big_m
-        )
         logging.debug(
-            f"        - Constraint:   {component.name} <= SECURITY                            -> Prevent Model from being unbounded"
+            f"        - Bound:        {component.name} <= SECURITY                            -> Prevent Model from being unbounded"
         )
 
-    # is the minimum output power of the source limited? If yes: Add power_min constraint
     if component.power_min_limited:
-        simulation.m.addConstr(
-            gp.quicksum(
-                simulation.MVars[component.outputs[o].key]
-                for o in range(len(component.outputs))
-            )
-            / simulation.interval_length
-            >= component.power_min[t_start:t_end+1]
-        )
-
         logging.debug(
-            f"        - Constraint:   {component.name} >= {component.name}_min"
+            f"        - Bound:        {component.name} >= {component.name}_min"
         )
 
-    # does the utilization of the source cost something? If yes: Add the corresponding cost factors
+    # does the utilization of the source cost something? If yes: Add the corresponding cost term
     if component.chargeable:
-        if min(component.cost[t_start:t_end+1]) < 0:
-            # if negative prices are possible the lower bound of the decision variable has to allow negative values
-            simulation.C_objective.append(
-                simulation.m.addMVar(
-                    1,
-                    vtype=GRB.CONTINUOUS,
-                    lb=-GRB.INFINITY,
-                    name=f"C_{component.key}",
-                )
-            )
-        else:
-            # otherwise the lower bound is kept at 0 for better solver performance
-            simulation.C_objective.append(
-                simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"C_{component.key}")
-            )
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == component.cost[t_start:t_end+1] @ simulation.MVars[f"E_{component.key}"]
+        register_interval_term(
+            simulation,
+            simulation.C_objective,
+            lambda t_start, t_end: component.cost[t_start : t_end + 1] @ simulation.MVars[f"E_{component.key}"],
+            t_start,
+            t_end,
         )
         logging.debug(f"        - CostFactor:   Cost for usage of {component.name}")
 
@@ -146,29 +138,16 @@ def add_source(simulation, component, t_start, t_end):
             1, vtype=GRB.CONTINUOUS, name=f"P_max_{component.key}"
         )
 
-        # define the Mvar as the maximum used output power
+        # define the Mvar as the maximum used output power. Since the capacity charge is minimized, an upper bound
+        # for every timestep is sufficient and keeps the problem linear
         simulation.m.addConstr(
-            simulation.MVars[f"P_max_{component.key}"][0]
-            == gp.max_(
-                (
-                    simulation.MVars[f"E_{component.key}"][t]
-                    for t in range(t_end-t_start+1)
-                ),
-                constant=0,
-            )
+            simulation.MVars[f"P_max_{component.key}"]
+            >= simulation.MVars[f"E_{component.key}"]
         )
 
-        # create new cost term
+        # add the cost term -> capacity_charge is specified on yearly basis
         simulation.C_objective.append(
-            simulation.m.addMVar(
-                1, vtype=GRB.CONTINUOUS, name=f"C_Capacity_{component.key}"
-            )
-        )
-
-        # define the costs -> capacity_charge is specified on yearly basis
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == simulation.interval_length
+            simulation.interval_length
             * (t_end-t_start+1)
             / 8760
             * component.capacity_charge
@@ -181,14 +160,14 @@ def add_source(simulation, component, t_start, t_end):
 
     # does the source cause direct or indirect emissions when used?
     if component.causes_emissions:
-        # calculate total emissions
-        simulation.emission_sources.append(
-            simulation.m.addMVar(1, vtype=GRB.CONTINUOUS, name=f"CO2_{component.key}")
-        )
-        simulation.m.addConstr(
-            simulation.emission_sources[-1]
-            == component.co2_emissions_per_unit[t_start:t_end+1]
-            @ simulation.MVars[f"E_{component.key}"]
+        # add the emissions to the total emissions
+        register_interval_term(
+            simulation,
+            simulation.emission_sources,
+            lambda t_start, t_end: component.co2_emissions_per_unit[t_start : t_end + 1]
+            @ simulation.MVars[f"E_{component.key}"],
+            t_start,
+            t_end,
         )
         logging.debug(
             f"        - EmissionFactor:   Emissions caused by usage of {component.name}"
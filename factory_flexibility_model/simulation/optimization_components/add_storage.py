@@ -34,8 +34,151 @@
 import numpy as np
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_update,
+)
+
 
 # CODE START
+def get_flow_limit(simulation, connection):
+    """
+    This function determines the upper bound of a connection that is limited by the charging power of the storage at
+    its destination and/or the discharging power of the storage at its origin. Both storages set the same combined
+    bound, so the order in which the storages are added does not matter.
+    :param simulation: [simulation-object]
+    :param connection: [factory.connection-object] connection from/to a storage
+    :return: [float] Maximum flow on the connection per timestep
+    """
+    limits = []
+    if connection.destination.type == "storage" and connection.destination.power_max_charge is not None:
+        limits.append(connection.destination.power_max_charge * simulation.interval_length)
+    if connection.origin.type == "storage" and connection.origin.power_max_discharge is not None:
+        limits.append(connection.origin.power_max_discharge * simulation.interval_length)
+    return min(limits)
+
+
+def get_throughput_limits(simulation, component):
+    """
+    This function determines the smallest valid big-M values for the constraints that prevent a storage from charging
+    and discharging within the same timestep. While charging, the inflow of a timestep can not exceed the capacity
+    plus the losses of the timestep, while discharging the outflow can not exceed the capacity. The power limits of
+    the storage and of the components at the other end of the flows tighten the values further.
+    :param simulation: [simulation-object]
+    :param component: components.storage-object
+    :return: [tuple] maximum charging and discharging flow per timestep
+    """
+    # limits derived from the capacity
+    charge_limits = [component.capacity]
+    discharge_limits = [component.capacity]
+    if component.leakage_SOC > 0 or component.leakage_time > 0 or component.efficiency < 1:
+        charge_limits[0] += (
+            component.capacity * component.leakage_SOC**simulation.time_reference_factor
+            + component.leakage_time * component.capacity * simulation.time_reference_factor
+        )
+
+    # limits of the storage itself
+    if component.power_max_charge is not None:
+        charge_limits.append(component.power_max_charge * simulation.interval_length)
+    if component.power_max_discharge is not None:
+        discharge_limits.append(component.power_max_discharge * simulation.interval_length)
+
+    # limits of the components that supply the charging flow and receive the discharging flow
+    charge_limits.append(__get_counterpart_limit(simulation, component.inputs[0], component.inputs[0].origin))
+    discharge_limits.append(__get_counterpart_limit(simulation, component.outputs[0], component.outputs[0].destination))
+
+    return min(charge_limits), min(discharge_limits)
+
+
+def __get_counterpart_limit(simulation, connection, counterpart):
+    """
+    This function determines the maximum flow on a connection of a storage that results from the power limits of the
+    component at the other end of the connection. The limit is taken over the whole simulation timeframe, so that it
+    remains valid when the model is reused for other intervals.
+    :param simulation: [simulation-object]
+    :param connection: [factory.connection-object] charging or discharging connection of the storage
+    :param counterpart: [factory.component-object] component at the other end of the connection
+    :return: [float] maximum flow per timestep (np.inf if the counterpart does not limit the flow)
+    """
+    if counterpart.type == "source" and counterpart.power_max_limited:
+        return np.max(counterpart.power_max * counterpart.availability) * simulation.interval_length
+    if counterpart.type == "sink" and counterpart.power_max_limited:
+        return np.max(counterpart.power_max * counterpart.availability)
+    if counterpart.type == "converter" and counterpart.power_max_limited and not counterpart.eta_variable:
+        return np.max(counterpart.power_max * counterpart.availability) * connection.weight * simulation.interval_length
+    return np.inf
+
+
+def __link_representative_periods(simulation, component):
+    """
+    This function calculates the SOC of a storage within the representative periods of an aggregated simulation and
+    links the periods of the original timeframe: The SOC at the borders of all original periods is tracked by
+    SOC_inter and changes by the SOC difference of the respective representative period. Every representative period
+    starts with the SOC that the original timeframe has at the beginning of the period it is taken from. The SOC
+    within an original period may neither exceed the capacity nor fall below zero, which is ensured via the maximum
+    and minimum SOC of the representative periods.
+    :param simulation: [simulation-object]
+    :param component: components.storage-object
+    :return: simulation.m is being extended
+    """
+    aggregation = simulation.aggregation
+    soc = simulation.MVars[f"SOC_{component.key}"]
+    soc_start = simulation.MVars[f"SOC_{component.key}_start"] * component.capacity
+    balance = (
+        simulation.MVars[component.inputs[0].key]
+        - simulation.MVars[component.outputs[0].key]
+        - simulation.MVars[component.to_losses.key]
+    )
+
+    # calculate SOC for every timestep recursively, starting from the initial SOC at the beginning of every
+    # representative period: SOC(t) = SOC(t-1) + E_in(t) - E_out(t) - E_losses(t)
+    first = aggregation.period_starts
+    following = np.setdiff1d(np.arange(aggregation.timesteps), first)
+    simulation.m.addConstr(soc[first] == soc_start + balance[first])
+    simulation.m.addConstr(soc[following] == soc[following - 1] + balance[following])
+    logging.debug(
+        f"        - Constraint:   Calculate SOC_end(t) within the representative periods for storage {component.name} "
+    )
+
+    # track the SOC at the borders of the original periods
+    simulation.MVars[f"SOC_{component.key}_inter"] = simulation.m.addMVar(
+        len(aggregation.assignment) + 1, vtype=GRB.CONTINUOUS, lb=0, ub=component.capacity, name=f"SOC_{component.key}_inter"
+    )
+    soc_inter = simulation.MVars[f"SOC_{component.key}_inter"]
+    assignment = aggregation.assignment
+    simulation.m.addConstr(
+        soc_inter[1:] == soc_inter[:-1] + soc[aggregation.period_ends[assignment]] - soc_start[assignment]
+    )
+    simulation.m.addConstr(soc_start == soc_inter[aggregation.medoids])
+    logging.debug(
+        f"        - Constraint:   SOC_inter(p+1) = SOC_inter(p) + SOC change of the representative period for storage {component.name}"
+    )
+
+    # keep the SOC within all original periods between zero and the capacity
+    simulation.MVars[f"SOC_{component.key}_period_max"] = simulation.m.addMVar(
+        len(aggregation.medoids), vtype=GRB.CONTINUOUS, name=f"SOC_{component.key}_period_max"
+    )
+    simulation.MVars[f"SOC_{component.key}_period_min"] = simulation.m.addMVar(
+        len(aggregation.medoids), vtype=GRB.CONTINUOUS, name=f"SOC_{component.key}_period_min"
+    )
+    soc_max = simulation.MVars[f"SOC_{component.key}_period_max"]
+    soc_min = simulation.MVars[f"SOC_{component.key}_period_min"]
+    simulation.m.addConstr(soc_max[aggregation.timestep_period] >= soc)
+    simulation.m.addConstr(soc_min[aggregation.timestep_period] <= soc)
+    simulation.m.addConstr(soc_inter[:-1] + soc_max[assignment] - soc_start[assignment] <= component.capacity)
+    simulation.m.addConstr(soc_inter[:-1] + soc_min[assignment] - soc_start[assignment] >= 0)
+    logging.debug(
+        f"        - Constraint:   0 <= SOC_inter(p) + SOC within the representative period <= Capacity for storage {component.name}"
+    )
+
+    # set SOC_end = SOC_start for the original timeframe
+    simulation.m.addConstr(soc_inter[-1] == soc_inter[0])
+    if component.soc_start_determined:
+        simulation.m.addConstr(soc_inter[0] == component.soc_start * component.capacity)
+    logging.debug(
+        f"        - Constraint:   SOC_end == SOC_start for storage {component.name}"
+    )
+
+
 def add_storage(simulation, component, t_start, t_end):
     """
     This function adds all necessary MVARS and constraints to the optimization problem that are
@@ -46,11 +189,34 @@ def add_storage(simulation, component, t_start, t_end):
 
     interval_length = t_end-t_start+1
 
-    # create  variable for initial SOC
+    # get the state handed over from the previous interval during receding horizon simulations
+    state = simulation.interval_state.get(component.key)
+
+    # create  variable for initial SOC. In aggregated simulations every representative period has its own initial SOC
+    periods = 1 if simulation.aggregation is None else len(simulation.aggregation.medoids)
     simulation.MVars[f"SOC_{component.key}_start"] = simulation.m.addMVar(
-        1, vtype=GRB.CONTINUOUS, name=f"SOC_{component.key}_start"
+        periods, vtype=GRB.CONTINUOUS, name=f"SOC_{component.key}_start"
     )
-    if component.soc_start_determined:
+    if simulation.aggregation is not None:
+        # the initial SOC of the representative periods is set by the linking of the periods below
+        simulation.MVars[f"SOC_{component.key}_start"].setAttr("UB", 1)
+        logging.debug(f"        - Variable:     SOC_start of every representative period for storage {component.name}")
+    elif state is not None:
+        # continue with the SOC that the storage had at the end of the previous interval
+        constr_soc_start = simulation.m.addConstr(
+            simulation.MVars[f"SOC_{component.key}_start"] * component.capacity
+            == state["soc"]
+        )
+        register_interval_update(
+            simulation,
+            lambda t_start, t_end: constr_soc_start.setAttr(
+                "RHS", simulation.interval_state[component.key]["soc"]
+            ),
+        )
+        logging.debug(
+            f"        - Constraint:   SOC_start == SOC_end of previous interval for storage {component.name}"
+        )
+    elif component.soc_start_determined:
         simulation.m.addConstr(
             simulation.MVars[f"SOC_{component.key}_start"] == component.soc_start
         )
@@ -58,73 +224,74 @@ def add_storage(simulation, component, t_start, t_end):
             f"        - Constraint:   SOC_start == {component.soc_start} for storage {component.name}"
         )
     else:
-        simulation.m.addConstr(simulation.MVars[f"SOC_{component.key}_start"] <= 1)
+        simulation.MVars[f"SOC_{component.key}_start"].setAttr("UB", 1)
         logging.debug(f"        - Variable:     SOC_start for storage {component.name}")
 
-    # create variable for SOC
+    # create variable for SOC. The capacity boundary is set by the bounds: cumsum of all inputs and outputs plus
+    # initial soc must not be more than the capacity and not less than zero in any timestep
     simulation.MVars[f"SOC_{component.key}"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"SOC_{component.key}"
+        interval_length, vtype=GRB.CONTINUOUS, lb=0, ub=component.capacity, name=f"SOC_{component.key}"
     )
     logging.debug(f"        - Variable:     SOC for storage {component.name} ")
-
-    # calculate SOC for every timestep using cumsum + SOC_start
-    cumsum_matrix = np.tril(
-        np.ones(interval_length)
-    )  # create a matrix with ones on- and under the main diagonal to quickly perform cumsum-calculations in matrix form
-    simulation.m.addConstr(
-        simulation.MVars[f"SOC_{component.key}"]
-        == cumsum_matrix
-        @ (
-            simulation.MVars[component.inputs[0].key]
-            - simulation.MVars[component.outputs[0].key]
-            - simulation.MVars[component.to_losses.key]
-        )
-        + component.capacity * simulation.MVars[f"SOC_{component.key}_start"][0]
-    )
-
     logging.debug(
-        f"        - Constraint:   Calculate SOC_end(t) for storage {component.name} "
+        f"        - Bound:        0 <= Cumsum(E) <= Capacity for {component.name} "
     )
 
-    # set SOC_end = SOC_start
-    simulation.m.addConstr(
-        simulation.MVars[f"SOC_{component.key}"][interval_length - 1]
-        == simulation.MVars[f"SOC_{component.key}_start"][0] * component.capacity
-    )
-    logging.debug(
-        f"        - Constraint:   SOC_end == SOC_start for storage {component.name}"
-    )
+    if simulation.aggregation is not None:
+        # calculate the SOC within the representative periods and link the periods of the original timeframe
+        __link_representative_periods(simulation, component)
+    else:
+        # calculate SOC for every timestep recursively: SOC(t) = SOC(t-1) + E_in(t) - E_out(t) - E_losses(t)
+        simulation.m.addConstr(
+            simulation.MVars[f"SOC_{component.key}"][0]
+            == component.capacity * simulation.MVars[f"SOC_{component.key}_start"][0]
+            + simulation.MVars[component.inputs[0].key][0]
+            - simulation.MVars[component.outputs[0].key][0]
+            - simulation.MVars[component.to_losses.key][0]
+        )
+        simulation.m.addConstr(
+            simulation.MVars[f"SOC_{component.key}"][1:interval_length]
+            == simulation.MVars[f"SOC_{component.key}"][0 : interval_length - 1]
+            + simulation.MVars[component.inputs[0].key][1:interval_length]
+            - simulation.MVars[component.outputs[0].key][1:interval_length]
+            - simulation.MVars[component.to_losses.key][1:interval_length]
+        )
 
-    # don't violate the capacity boundary: cumsum of all inputs and outputs plus initial soc must not be more than the capacity in any timestep
-    simulation.m.addConstr(
-        simulation.MVars[f"SOC_{component.key}"] <= component.capacity
-    )
-    logging.debug(
-        f"        - Constraint:   Cumsum(E) <= Capacity for {component.name} "
-    )
+        logging.debug(
+            f"        - Constraint:   Calculate SOC_end(t) for storage {component.name} "
+        )
 
-    # don't take out more than stored: cumsum of all inputs and outputs plus initial soc must be more than zero in any timestep
-    simulation.m.addConstr(simulation.MVars[f"SOC_{component.key}"] >= 0)
-    logging.debug(f"        - Constraint:   Cumsum(E) >= 0 for {component.name} ")
+        # set SOC_end = SOC_start (of the first interval, if the state is handed over between intervals)
+        if state is not None:
+            simulation.m.addConstr(
+                simulation.MVars[f"SOC_{component.key}"][interval_length - 1]
+                == state["soc_target"]
+            )
+        else:
+            simulation.m.addConstr(
+                simulation.MVars[f"SOC_{component.key}"][interval_length - 1]
+                == simulation.MVars[f"SOC_{component.key}_start"][0] * component.capacity
+            )
+        logging.debug(
+            f"        - Constraint:   SOC_end == SOC_start for storage {component.name}"
+        )
 
-    # create Pcharge_max-constraint
+    # set Pcharge_max as upper bound of the charging flow
     if component.power_max_charge is not None:
-        simulation.m.addConstr(
-            simulation.MVars[component.inputs[0].key]
-            <= component.power_max_charge * simulation.interval_length
+        simulation.MVars[component.inputs[0].key].setAttr(
+            "UB", get_flow_limit(simulation, component.inputs[0])
         )
         logging.debug(
-            f"        - Constraint:   power_charge <= power_charge_max for {component.name}"
+            f"        - Bound:        power_charge <= power_charge_max for {component.name}"
         )
 
-    # create Pdischarge_max-constraint
+    # set Pdischarge_max as upper bound of the discharging flow
     if component.power_max_discharge is not None:
-        simulation.m.addConstr(
-            simulation.MVars[component.outputs[0].key]
-            <= component.power_max_discharge * simulation.interval_length
+        simulation.MVars[component.outputs[0].key].setAttr(
+            "UB", get_flow_limit(simulation, component.outputs[0])
         )
         logging.debug(
-            f"        - Constraint:   power_discharge <= power_discharge_max for {component.name}"
+            f"        - Bound:        power_discharge <= power_discharge_max for {component.name}"
         )
 
     # create constraint to calculate the occuring losses if necessary
@@ -139,15 +306,12 @@ def add_storage(simulation, component, t_start, t_end):
             * component.capacity
             * simulation.time_reference_factor
         )
-        simulation.m.addConstrs(
-            (
-                simulation.MVars[component.to_losses.key][t]
-                == simulation.MVars[f"SOC_{component.key}"][t] * soc_leakage
-                + lin_leakage
-                + simulation.MVars[component.outputs[0].key][t]
-                * (1 / component.efficiency - 1)
-            )
-            for t in range(interval_length)
+        simulation.m.addConstr(
+            simulation.MVars[component.to_losses.key]
+            == simulation.MVars[f"SOC_{component.key}"] * soc_leakage
+            + lin_leakage
+            + simulation.MVars[component.outputs[0].key]
+            * (1 / component.efficiency - 1)
         )
         logging.debug(
             f"        - Constraint:   Energy_losses = Energy_discharge * (1-efficiency) for {component.name}"
@@ -165,20 +329,19 @@ def add_storage(simulation, component, t_start, t_end):
         simulation.MVars[f"{component.key}_charging"] = simulation.m.addMVar(
             interval_length, vtype=GRB.BINARY, name=f"{component.key}_charging"
         )
-        # use big M method to force either input or output to be zero
-        simulation.m.addConstrs(
-            simulation.MVars[component.inputs[0].key][t]
-            <= simulation.big_m * simulation.MVars[f"{component.key}_charging"][t]
-            for t in range(interval_length)
+        # use big M method with the tightest valid values to force either input or output to be zero
+        charge_limit, discharge_limit = get_throughput_limits(simulation, component)
+        simulation.m.addConstr(
+            simulation.MVars[component.inputs[0].key]
+            <= charge_limit * simulation.MVars[f"{component.key}_charging"]
         )
-        simulation.m.addConstrs(
-            simulation.MVars[component.outputs[0].key][t]
-            <= simulation.big_m * (1 - simulation.MVars[f"{component.key}_charging"][t])
-            for t in range(interval_length)
+        simulation.m.addConstr(
+            simulation.MVars[component.outputs[0].key]
+            <= discharge_limit * (1 - simulation.MVars[f"{component.key}_charging"])
         )
 
         logging.debug(
-            f"        - Constraint:   Preventing direct throughput on {component.name}"
+            f"        - Constraint:   Preventing direct throughput on {component.name}            (M_charge = {charge_limit}, M_discharge = {discharge_limit})"
         )
 
     # is the storage afflicted with a capital cost per used capacity?
@@ -190,23 +353,24 @@ def add_storage(simulation, component, t_start, t_end):
         )
 
         # define the Mvar as the maximum used utilization
-        simulation.m.addConstrs(
-            simulation.MVars[f"SOC_max_{component.key}"][0]
-            >= simulation.MVars[f"SOC_{component.key}"][t]
-            for t in range(interval_length)
-        )
-
-        # create new cost term
-        simulation.C_objective.append(
-            simulation.m.addMVar(
-                1, vtype=GRB.CONTINUOUS, name=f"C_Capacity_{component.key}"
+        if simulation.aggregation is not None:
+            # the maximum SOC of all periods of the original timeframe
+            assignment = simulation.aggregation.assignment
+            simulation.m.addConstr(
+                simulation.MVars[f"SOC_max_{component.key}"][0]
+                >= simulation.MVars[f"SOC_{component.key}_inter"][:-1]
+                + simulation.MVars[f"SOC_{component.key}_period_max"][assignment]
+                - simulation.MVars[f"SOC_{component.key}_start"][assignment] * component.capacity
+            )
+        else:
+            simulation.m.addConstr(
+                simulation.MVars[f"SOC_max_{component.key}"][0]
+                >= simulation.MVars[f"SOC_{component.key}"]
             )
-        )
 
-        # define the costs -> capacity_charge is specified on yearly basis and has to be broken down to simulation timeframe
-        simulation.m.addConstr(
-            simulation.C_objective[-1]
-            == simulation.interval_length
+        # add the cost term -> capacity_charge is specified on yearly basis and has to be broken down to simulation timeframe
+        simulation.C_objective.append(
+            simulation.interval_length
             * interval_length
             / 8760
             * component.capacity_charge
@@ -31,9 +31,13 @@
 # IMPORTS
 import logging
 
-import gurobipy as gp
+import numpy as np
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_update,
+)
+
 
 # CODE START
 def add_thermalsystem(simulation, component, t_start, t_end):
@@ -46,159 +50,194 @@ def add_thermalsystem(simulation, component, t_start, t_end):
     interval_length = t_end - t_start + 1
 
     # create a timeseries of decision variables to represent the total inflow going into the thermal demand:
-    simulation.MVars[f"E_{component.key}_in"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"E_{component.key}_in"
-    )
-    simulation.m.addConstrs(
-        (
-            simulation.MVars[f"E_{component.key}_in"][t]
-            == gp.quicksum(
-                simulation.MVars[component.inputs[input_id].key][t]
-                for input_id in range(len(component.inputs))
-            )
+    if f"E_{component.key}_in" in simulation.aliases:
+        # the model reduction represents the inflow by the variable of the only input connection
+        simulation.MVars[f"E_{component.key}_in"] = simulation.MVars[simulation.aliases[f"E_{component.key}_in"]]
+        logging.debug(
+            f"        - Reduction:    {component.name}_in represented by flow {component.inputs[0].name}"
+        )
+    else:
+        simulation.MVars[f"E_{component.key}_in"] = simulation.m.addMVar(
+            interval_length, vtype=GRB.CONTINUOUS, name=f"E_{component.key}_in"
+        )
+        simulation.m.addConstr(
+            simulation.MVars[f"E_{component.key}_in"]
+            == sum(simulation.MVars[input_i.key] for input_i in component.inputs)
+        )
+        logging.debug(
+            f"        - Variable:     {component.name}_in                                 (timeseries of incoming thermal energy at {component.name})"
         )
-        for t in range(interval_length)
-    )
-    logging.debug(
-        f"        - Variable:     {component.name}_in                                 (timeseries of incoming thermal energy at {component.name})"
-    )
 
     # create a timeseries of decision variables to represent the total outflow going out of the thermal demand:
-    simulation.MVars[f"E_{component.key}_out"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"E_{component.key}_out"
-    )
-    simulation.m.addConstrs(
-        (
-            simulation.MVars[f"E_{component.key}_out"][t]
-            == gp.quicksum(
-                simulation.MVars[component.outputs[output_id].key][t]
-                for output_id in range(len(component.outputs))
-            )
+    if f"E_{component.key}_out" in simulation.aliases:
+        # the model reduction represents the outflow by the variable of the only output connection
+        simulation.MVars[f"E_{component.key}_out"] = simulation.MVars[simulation.aliases[f"E_{component.key}_out"]]
+        logging.debug(
+            f"        - Reduction:    {component.name}_out represented by flow {component.outputs[0].name}"
+        )
+    else:
+        simulation.MVars[f"E_{component.key}_out"] = simulation.m.addMVar(
+            interval_length, vtype=GRB.CONTINUOUS, name=f"E_{component.key}_out"
+        )
+        simulation.m.addConstr(
+            simulation.MVars[f"E_{component.key}_out"]
+            == sum(simulation.MVars[output_i.key] for output_i in component.outputs)
+        )
+        logging.debug(
+            f"        - Variable:     {component.name}_out                                  (timeseries of removed thermal energy at {component.name})"
         )
-        for t in range(interval_length)
-    )
-    logging.debug(
-        f"        - Variable:     {component.name}_out                                  (timeseries of removed thermal energy at {component.name})"
-    )
 
-    # create a timeseries for the internal temperature:
+    # create a timeseries for the internal temperature. The allowed boundaries are set as bounds of the variable:
     simulation.MVars[f"T_{component.key}"] = simulation.m.addMVar(
-        interval_length, vtype=GRB.CONTINUOUS, name=f"T_{component.key}"
+        interval_length,
+        vtype=GRB.CONTINUOUS,
+        lb=component.temperature_min[t_start : t_end + 1],
+        ub=component.temperature_max[t_start : t_end + 1],
+        name=f"T_{component.key}",
     )
     logging.debug(
         f"        - Variable:     {component.key}                                  (Internal Temperature of {component.name})"
     )
+    logging.debug(
+        f"        - Bound:        Tmin < T_{component.name} < Tmax for {component.name}"
+    )
 
 
-    # set the starting temperature if specified:
-    if component.temperature_start is not None:
+    # get the state handed over from the previous interval during receding horizon simulations
+    state = simulation.interval_state.get(component.key)
+
+    # set the starting temperature:
+    if state is not None:
+        # continue with the temperature reached at the end of the previous interval
+        constr_temperature_start = simulation.m.addConstr(
+            simulation.MVars[f"T_{component.key}"][0] == state["temperature"]
+        )
+        logging.debug(
+            f"        - Constraint:   {component.name}[0] = temperature at the end of previous interval"
+        )
+    elif component.temperature_start is not None:
         # add constraint to set the starting temperature to the given value
         simulation.m.addConstr(simulation.MVars[f"T_{component.key}"][0] == component.temperature_start)
         # write log
         logging.debug(f"        - Constraint:   {component.name}[0] = {component.temperature_start}")
 
+    # determine the timesteps that follow on a previous timestep. In aggregated simulations every representative
+    # period is cyclic, so that the first timestep of a period follows on its last timestep
+    if simulation.aggregation is None:
+        following = slice(1, interval_length)
+        previous = slice(0, interval_length - 1)
+    else:
+        following = np.arange(interval_length)
+        previous = following - 1
+        previous[simulation.aggregation.period_starts] = simulation.aggregation.period_ends
 
     # add constraint for the thermal R-C-factory
-    simulation.m.addConstrs(
-        (
-            simulation.MVars[f"T_{component.key}"][t]
-            == simulation.MVars[f"T_{component.key}"][t - 1]
-            + (  # t-1 temperature
-                component.temperature_ambient[t - 1]
-                - simulation.MVars[f"T_{component.key}"][t - 1]
-            )
-            * simulation.time_reference_factor
-            / (component.R * component.C)
-            + (  # thermal inertia
-                simulation.MVars[f"E_{component.key}_in"][t - 1]
-                - simulation.MVars[f"E_{component.key}_out"][t - 1]
-            )
-            * simulation.time_reference_factor
-            / component.C
+    constr_rc = simulation.m.addConstr(
+        simulation.MVars[f"T_{component.key}"][following]
+        == simulation.MVars[f"T_{component.key}"][previous]
+        + (  # t-1 temperature
+            component.temperature_ambient[t_start : t_end + 1][previous]
+            - simulation.MVars[f"T_{component.key}"][previous]
+        )
+        * simulation.time_reference_factor
+        / (component.R * component.C)
+        + (  # thermal inertia
+            simulation.MVars[f"E_{component.key}_in"][previous]
+            - simulation.MVars[f"E_{component.key}_out"][previous]
         )
-        for t in range(1, interval_length)
+        * simulation.time_reference_factor
+        / component.C
     )  # heating/cooling impact
 
-    # keep the temperature within the allowed boundaries during Simulation interval:
-    simulation.m.addConstrs(
-        (simulation.MVars[f"T_{component.key}"][t] >= component.temperature_min[t])
-        for t in range(interval_length)
-    )
-    simulation.m.addConstrs(
-        (simulation.MVars[f"T_{component.key}"][t] <= component.temperature_max[t])
-        for t in range(interval_length)
-    )
-    logging.debug(
-        f"        - Constraint:   Tmin < T_{component.name} < Tmax for {component.name}"
+    # calculate the temperature at timestep T+1
+    temperature_end = (
+        simulation.MVars[f"T_{component.key}"][interval_length - 1]
+        + (
+            component.temperature_ambient[t_end]
+            - simulation.MVars[f"T_{component.key}"][interval_length - 1]
+        )
+        * simulation.time_reference_factor
+        / (component.R * component.C)
+        + (
+            simulation.MVars[f"E_{component.key}_in"][interval_length - 1]
+            - simulation.MVars[f"E_{component.key}_out"][interval_length - 1]
+        )
+        * simulation.time_reference_factor
+        / component.C
     )
 
     # set the end temperature:
-    if component.sustainable:
-        simulation.m.addConstr(
-            simulation.MVars[f"T_{component.key}"][interval_length - 1]
-            + (
-                component.temperature_ambient[interval_length - 1]
-                - simulation.MVars[f"T_{component.key}"][interval_length - 1]
+    if simulation.aggregation is not None:
+        logging.debug(f"        - Constraint:   T_{component.name} is cyclic within every representative period")
+    elif component.sustainable:
+        if state is not None:
+            # return to the starting temperature of the first interval
+            constr_temperature_end = simulation.m.addConstr(
+                temperature_end == state["temperature_target"]
             )
-            * simulation.time_reference_factor
-            / (component.R * component.C)
-            + (
-                simulation.MVars[f"E_{component.key}_in"][interval_length - 1]
-                - simulation.MVars[f"E_{component.key}_out"][interval_length - 1]
+        else:
+            constr_temperature_end = simulation.m.addConstr(
+                temperature_end == simulation.MVars[f"T_{component.key}"][0]
             )
-            * simulation.time_reference_factor
-            / component.C
-            == simulation.MVars[f"T_{component.key}"][0]
-        )
         logging.debug(f"        - Constraint:   T_{component.name}[T] = Tstart")
     else:
         # keep the temperature within allowed boundaries at timestep T+1
-        simulation.m.addConstr(
-            simulation.MVars[f"T_{component.key}"][interval_length - 1]
-            + (
-                component.temperature_ambient[interval_length - 1]
-                - simulation.MVars[f"T_{component.key}"][interval_length - 1]
-            )
-            * simulation.time_reference_factor
-            / (component.R * component.C)
-            + (
-                simulation.MVars[f"E_{component.key}_in"][interval_length - 1]
-                - simulation.MVars[f"E_{component.key}_out"][interval_length - 1]
-            )
-            * simulation.time_reference_factor
-            / component.C
-            >= component.temperature_min[interval_length - 1]
+        constr_temperature_end_min = simulation.m.addConstr(
+            temperature_end >= component.temperature_min[t_end]
         )
-
-        simulation.m.addConstr(
-            simulation.MVars[f"T_{component.key}"][interval_length - 1]
-            + (
-                component.temperature_ambient[interval_length - 1]
-                - simulation.MVars[f"T_{component.key}"][interval_length - 1]
-            )
-            * simulation.time_reference_factor
-            / (component.R * component.C)
-            + (
-                simulation.MVars[f"E_{component.key}_in"][interval_length - 1]
-                - simulation.MVars[f"E_{component.key}_out"][interval_length - 1]
-            )
-            * simulation.time_reference_factor
-            / component.C
-            <= component.temperature_max[interval_length - 1]
+        constr_temperature_end_max = simulation.m.addConstr(
+            temperature_end <= component.temperature_max[t_end]
         )
 
     # calculate the losses:
-    simulation.m.addConstrs(
-        simulation.MVars[component.to_losses.key][t]
-        - simulation.MVars[component.from_gains.key][t]
+    constr_losses = simulation.m.addConstr(
+        simulation.MVars[component.to_losses.key]
+        - simulation.MVars[component.from_gains.key]
         == (
-            simulation.MVars[f"T_{component.key}"][t] - component.temperature_ambient[t]
+            simulation.MVars[f"T_{component.key}"]
+            - component.temperature_ambient[t_start : t_end + 1]
         )
         * simulation.time_reference_factor
         / component.R
-        for t in range(interval_length)
     )
 
     logging.debug(
         f"        - Constraint:     calculation of thermal losses for {component.name}"
     )
+
+    # when the model is reused: adapt the temperature related right hand sides to the new interval
+    def update_temperatures(t_start, t_end):
+        ambient_impact = (
+            component.temperature_ambient[t_start : t_end + 1]
+            * simulation.time_reference_factor
+            / (component.R * component.C)
+        )
+        constr_rc.setAttr("RHS", ambient_impact[previous])
+        simulation.MVars[f"T_{component.key}"].setAttr("LB", component.temperature_min[t_start : t_end + 1])
+        simulation.MVars[f"T_{component.key}"].setAttr("UB", component.temperature_max[t_start : t_end + 1])
+        if component.sustainable:
+            if state is not None:
+                constr_temperature_end.setAttr(
+                    "RHS", state["temperature_target"] - ambient_impact[-1]
+                )
+            else:
+                constr_temperature_end.setAttr("RHS", -ambient_impact[-1])
+        else:
+            constr_temperature_end_min.setAttr(
+                "RHS", component.temperature_min[t_end] - ambient_impact[-1]
+            )
+            constr_temperature_end_max.setAttr(
+                "RHS", component.temperature_max[t_end] - ambient_impact[-1]
+            )
+        constr_losses.setAttr(
+            "RHS",
+            -component.temperature_ambient[t_start : t_end + 1]
+            * simulation.time_reference_factor
+            / component.R,
+        )
+        if state is not None:
+            constr_temperature_start.setAttr(
+                "RHS", simulation.interval_state[component.key]["temperature"]
+            )
+
+    register_interval_update(simulation, update_temperatures)
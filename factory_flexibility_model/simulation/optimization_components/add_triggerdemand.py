@@ -32,8 +32,13 @@
 import logging
 
 import numpy as np
+import scipy.sparse as sp
 from gurobipy import GRB
 
+from factory_flexibility_model.simulation.optimization_components.update_interval_data import (
+    register_interval_update,
+)
+
 
 # CODE START
 def add_triggerdemand(simulation, component, t_start, t_end):
@@ -46,26 +51,41 @@ def add_triggerdemand(simulation, component, t_start, t_end):
 
     interval_length = t_end - t_start + 1
 
-    # create Matrix with all executable load-profiles
+    # get the load of executions started in previous intervals during receding horizon simulations
+    def carryover(load_type):
+        load = np.zeros(interval_length)
+        state = simulation.interval_state.get(component.key)
+        if state is not None:
+            steps = min(interval_length, component.profile_length - 1)
+            load[0:steps] = state[load_type][0:steps]
+        return load
+
+    # create sparse matrices with all executable load-profiles: column i holds the profile starting at timestep i, so
+    # the profile values are placed on the main diagonal and the profile_length-1 subdiagonals below it
     possibilities = interval_length - component.profile_length + 1
+    offsets = -np.arange(component.profile_length)
     if component.input_energy:
-        profiles_energy = np.zeros([possibilities, interval_length])
+        profiles_energy = sp.diags(
+            np.asarray(component.load_profile_energy, dtype=float),
+            offsets,
+            shape=(interval_length, possibilities),
+            format="csr",
+        )
+        profiles_energy.eliminate_zeros()
     if component.input_material:
-        profiles_material = np.zeros([possibilities, interval_length])
-    parallelcheck = np.zeros([possibilities, interval_length])
-
-    for i in range(possibilities):
-        if component.input_energy:
-            profiles_energy[
-                i, i : i + component.profile_length
-            ] = component.load_profile_energy
-        if component.input_material:
-            profiles_material[
-                i, i : i + component.profile_length
-            ] = component.load_profile_mass
-        parallelcheck[i, i : i + component.profile_length] = np.ones(
-            component.profile_length
+        profiles_material = sp.diags(
+            np.asarray(component.load_profile_mass, dtype=float),
+            offsets,
+            shape=(interval_length, possibilities),
+            format="csr",
         )
+        profiles_material.eliminate_zeros()
+    parallelcheck = sp.diags(
+        np.ones(component.profile_length),
+        offsets,
+        shape=(interval_length, possibilities),
+        format="csr",
+    )
 
     # create decision variable vector
     simulation.MVars[f"{component.key}_executions"] = simulation.m.addMVar(
@@ -77,9 +97,10 @@ def add_triggerdemand(simulation, component, t_start, t_end):
 
     # limit the number of parallel executions
     if component.max_parallel > 0:
-        simulation.m.addConstr(
-            parallelcheck.transpose() @ simulation.MVars[f"{component.key}_executions"]
+        constr_parallel = simulation.m.addConstr(
+            parallelcheck @ simulation.MVars[f"{component.key}_executions"]
             <= np.ones(interval_length) * component.max_parallel
+            - carryover("parallel")
         )
         logging.debug(
             f"        - Constraint:   Limit the maximum parallel executions at {component.name}"
@@ -121,20 +142,22 @@ def add_triggerdemand(simulation, component, t_start, t_end):
             )
 
     if component.input_energy:
-        simulation.m.addConstr(
+        constr_profile_energy = simulation.m.addConstr(
             simulation.MVars[f"{component.key}_loadprofile_energy"][
                 component.Tstart - 1 : component.Tend
             ]
-            == profiles_energy.transpose()
+            == profiles_energy
             @ simulation.MVars[f"{component.key}_executions"]
+            + carryover("energy")
         )
     if component.input_material:
-        simulation.m.addConstr(
+        constr_profile_material = simulation.m.addConstr(
             simulation.MVars[f"{component.key}_loadprofile_material"][
                 component.Tstart - 1 : component.Tend
             ]
-            == profiles_material.transpose()
+            == profiles_material
             @ simulation.MVars[f"{component.key}_executions"]
+            + carryover("material")
         )
 
     if component.Tend < interval_length:
@@ -154,6 +177,19 @@ def add_triggerdemand(simulation, component, t_start, t_end):
             )
     logging.debug(f"        - Constraint:   Calculate load profile at {component.name}")
 
+    # when the model is reused: hand over the load of executions started in the previous interval
+    def update_carryover(t_start, t_end):
+        if component.max_parallel > 0:
+            constr_parallel.setAttr(
+                "RHS", component.max_parallel - carryover("parallel")
+            )
+        if component.input_energy:
+            constr_profile_energy.setAttr("RHS", carryover("energy"))
+        if component.input_material:
+            constr_profile_material.setAttr("RHS", carryover("material"))
+
+    register_interval_update(simulation, update_carryover)
+
     # set validate and output connection to match the load profile
     if component.input_energy:
         simulation.m.addConstr(
@@ -0,0 +1,84 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: read_solution.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# IMPORTS
+import gurobipy as gp
+import numpy as np
+
+
+# CODE START
+def read_solution(simulation, values):
+    """
+    This function writes the values of all MVars to simulation.solution. The values are taken from the solution
+    vector of all variables of the model, which is obtained with a single call of the solver. The positions of the
+    MVars within that vector are determined once per model and reused for every solve.
+    :param simulation: [simulation-object]
+    :param values: [np.array] values of all variables of simulation.m in the order of their indices
+    :return: simulation.solution is being set
+    """
+    if simulation.variable_index is None:
+        simulation.variable_index = get_variable_index(simulation)
+
+    simulation.solution = {}
+    for key, value in simulation.MVars.items():
+        if key in simulation.variable_index:
+            index, shape = simulation.variable_index[key]
+            simulation.solution[key] = values[index].reshape(shape)
+        else:
+            simulation.solution[key] = value
+
+
+def get_variable_index(simulation):
+    """
+    This function determines the positions of all MVars of the model within the vector of all model variables.
+    MVars created by addMVar() occupy a contiguous range, which is stored as slice so that reading the solution
+    does not copy any data. All other MVars are mapped by an index array.
+    :param simulation: [simulation-object]
+    :return: [dict] {key: (slice or index array, shape)} for every MVar in simulation.MVars
+    """
+    simulation.m.update()
+    variable_index = {}
+    for key, value in simulation.MVars.items():
+        if not isinstance(value, gp.MVar):
+            continue
+        if value.size == 0:
+            variable_index[key] = (slice(0, 0), value.shape)
+            continue
+
+        flat = value.reshape(-1)
+        first = flat[0].item().index
+        last = flat[-1].item().index
+        if last - first + 1 == value.size:
+            index = slice(first, last + 1)
+        else:
+            index = np.array([variable.index for variable in flat.tolist()], dtype=int)
+        variable_index[key] = (index, value.shape)
+
+    return variable_index
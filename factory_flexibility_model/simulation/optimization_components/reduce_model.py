@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: reduce_model.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# IMPORTS
+import logging
+
+
+# CODE START
+def reduce_model(simulation):
+    """
+    This function analyzes the factory graph before the optimization problem is built and determines variables that
+    can be represented by the variable of another connection instead of being linked to it by an equality constraint:
+        - Pools with a single input and a single output are collapsed: Both connections share one variable and the
+          energy equilibrium of the pool is omitted
+        - The total in- or outflow of sinks, sources and thermalsystems that only duplicates a single connection
+          (E_{component}) is represented by the variable of that connection
+    The bounds of such a mirrored variable (e.g. a determined demand) are set on the shared variable directly. Since a
+    variable can only carry one set of bounds, connections/components are only merged if at most one of them sets
+    bounds. The solution of every merged key is read from the shared variable, so that the results are unaffected.
+    :param simulation: [simulation-object]
+    :return: simulation.aliases {key: key of the connection whose variable is used} and simulation.collapsed_pools
+    are being set
+    """
+    factory = simulation.factory
+    simulation.aliases = {}
+    simulation.collapsed_pools = set()
+
+    # every connection initially is represented by its own variable
+    representative = {key: key for key in factory.connections}
+    bounded = {key: False for key in factory.connections}
+
+    def find(key):
+        while representative[key] != key:
+            key = representative[key]
+        return key
+
+    # storages set their charging/discharging power limits as bounds of the connected flows
+    for component in factory.components.values():
+        if component.type != "storage":
+            continue
+        if component.power_max_charge is not None and component.inputs:
+            bounded[component.inputs[0].key] = True
+        if component.power_max_discharge is not None and component.outputs:
+            bounded[component.outputs[0].key] = True
+
+    # collapse pools with a single input and a single output
+    for component in factory.components.values():
+        if component.type != "pool" or len(component.inputs) != 1 or len(component.outputs) != 1:
+            continue
+        input_key = find(component.inputs[0].key)
+        output_key = find(component.outputs[0].key)
+        if input_key == output_key or (bounded[input_key] and bounded[output_key]):
+            continue
+        representative[output_key] = input_key
+        bounded[input_key] = bounded[input_key] or bounded[output_key]
+        simulation.collapsed_pools.add(component.key)
+
+    for key in factory.connections:
+        if find(key) != key:
+            simulation.aliases[key] = find(key)
+
+    # represent mirrored in- and outflows of components by the variable of the connection they duplicate
+    for component in factory.components.values():
+        if component.type == "sink" and component.inputs:
+            mirrors = [(f"E_{component.key}", component.inputs[0], __sink_is_bounded(component))]
+        elif component.type == "source" and len(component.outputs) == 1:
+            mirrors = [(f"E_{component.key}", component.outputs[0], __source_is_bounded(simulation, component))]
+        elif component.type == "thermalsystem":
+            mirrors = []
+            if len(component.inputs) == 1:
+                mirrors.append((f"E_{component.key}_in", component.inputs[0], False))
+            if len(component.outputs) == 1:
+                mirrors.append((f"E_{component.key}_out", component.outputs[0], False))
+        else:
+            continue
+
+        for key, connection, has_bounds in mirrors:
+            connection_key = find(connection.key)
+            if has_bounds and bounded[connection_key]:
+                continue
+            bounded[connection_key] = bounded[connection_key] or has_bounds
+            simulation.aliases[key] = connection_key
+
+    logging.info(
+        f"Model reduction: {len(simulation.collapsed_pools)} pools collapsed, {len(simulation.aliases)} variables merged"
+    )
+
+
+def __sink_is_bounded(component):
+    """
+    :param component: components.sink-object
+    :return: [bool] True if the inflow of the sink has bounds other than 0 <= E < inf
+    """
+    return component.determined or component.power_min_limited or component.power_max_limited
+
+
+def __source_is_bounded(simulation, component):
+    """
+    :param simulation: [simulation-object]
+    :param component: components.source-object
+    :return: [bool] True if the outflow of the source has bounds other than 0 <= E < inf
+    """
+    return (
+        component.determined
+        or component.power_min_limited
+        or component.power_max_limited
+        or simulation.factory.enable_slacks
+    )
@@ -0,0 +1,99 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: set_coarse_guidance.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# IMPORTS
+import logging
+
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+
+# CODE START
+def set_coarse_guidance(simulation, t_start):
+    """
+    This function guides the optimization problem of the current interval by the solution of the coarse timeline of
+    a multi-resolution simulation (see CoarseGrid). Continuous variables are handed to gurobi as variable hints. Binary
+    and integer variables are either handed over as MIP start (simulation.coarse_guidance == "start") or fixed to the
+    values of the coarse solution via their bounds (simulation.coarse_guidance == "fix"). The fixings also apply to
+    solvers without support for MIP starts and are released again by release_coarse_fixings().
+    :param simulation: [simulation-object]
+    :param t_start: [int] first timestep of the current interval
+    :return: [list] (variable, lower bounds, upper bounds) of all fixed variables before they were fixed
+    """
+    # MIP starts, hints and fixings only affect mixed integer problems
+    simulation.m.update()
+    if not simulation.m.IsMIP:
+        return []
+
+    fixings = []
+    guided = set()
+    guided_variables = 0
+
+    for key, variable in simulation.MVars.items():
+        # only timeseries of decision variables are guided, every variable only once
+        if not isinstance(variable, gp.MVar) or variable.ndim != 1 or id(variable) in guided:
+            continue
+        if key not in simulation.coarse_solution:
+            continue
+        values = simulation.coarse_solution[key][t_start : t_start + variable.shape[0]]
+        if values.shape[0] != variable.shape[0]:
+            continue
+        guided.add(id(variable))
+
+        vtype = variable.getAttr("VType")
+        if vtype[0] in (GRB.BINARY, GRB.INTEGER):
+            if simulation.coarse_guidance == "fix":
+                lower_bound = variable.getAttr("LB")
+                upper_bound = variable.getAttr("UB")
+                fixings.append((variable, lower_bound, upper_bound))
+                values = np.clip(np.round(values), lower_bound, upper_bound)
+                variable.setAttr("LB", values)
+                variable.setAttr("UB", values)
+            else:
+                variable.setAttr("Start", np.round(values))
+        else:
+            variable.setAttr("VarHintVal", values)
+        guided_variables += variable.shape[0]
+
+    logging.debug(
+        f"        - Guided {guided_variables} variables by the solution of the coarse timeline"
+    )
+    return fixings
+
+
+def release_coarse_fixings(fixings):
+    """
+    This function restores the bounds of the variables that have been fixed by set_coarse_guidance().
+    :param fixings: [list] (variable, lower bounds, upper bounds) as returned by set_coarse_guidance()
+    """
+    for variable, lower_bound, upper_bound in fixings:
+        variable.setAttr("LB", lower_bound)
+        variable.setAttr("UB", upper_bound)
@@ -0,0 +1,85 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: set_warm_start.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# IMPORTS
+import logging
+
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+
+# CODE START
+def set_warm_start(simulation, previous_solution, previous_t_start, t_start):
+    """
+    This function seeds the optimization problem of the current interval with the solution of a previously solved
+    interval. Timesteps that are covered by both intervals (receding horizon mode) take the values of the previous
+    solution, all remaining timesteps repeat the pattern of the previous interval.
+    Binary and integer variables (e.g. Bool_*_state, *_charging, *_executions) are handed to gurobi as MIP start,
+    continuous variables as variable hints.
+    :param simulation: [simulation-object]
+    :param previous_solution: [dict] simulation.solution of the previously solved interval
+    :param previous_t_start: [int] first timestep of the previously solved interval
+    :param t_start: [int] first timestep of the current interval
+    """
+    # MIP starts and hints only affect mixed integer problems
+    simulation.m.update()
+    if not simulation.m.IsMIP:
+        return
+
+    shift = t_start - previous_t_start
+    seeded_variables = 0
+
+    for key, variable in simulation.MVars.items():
+        # only timeseries of decision variables are seeded
+        if not isinstance(variable, gp.MVar) or variable.ndim != 1 or variable.shape[0] < 2:
+            continue
+        if key not in previous_solution:
+            continue
+        previous_values = np.asarray(previous_solution[key])
+        if previous_values.ndim != 1 or previous_values.shape[0] < 2:
+            continue
+
+        # map every timestep of the current interval to a timestep of the previous solution
+        previous_length = previous_values.shape[0]
+        index = np.arange(variable.shape[0]) + shift
+        index = np.where(index < previous_length, index, (index - previous_length) % previous_length)
+        values = previous_values[index]
+
+        vtype = variable.getAttr("VType")
+        if vtype[0] in (GRB.BINARY, GRB.INTEGER):
+            variable.setAttr("Start", np.round(values))
+        else:
+            variable.setAttr("VarHintVal", values)
+        seeded_variables += variable.shape[0]
+
+    logging.debug(
+        f"        - Seeded {seeded_variables} variables with the solution of the previous interval"
+    )
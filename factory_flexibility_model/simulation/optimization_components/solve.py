@@ -31,53 +31,40 @@
 # IMPORTS
 import logging
 import time
-import gurobipy as gp
-from gurobipy import GRB
-import factory_flexibility_model.io.input_validations as iv
+
+from factory_flexibility_model.simulation.optimization_components.solve_gurobi import solve_gurobi
+from factory_flexibility_model.simulation.optimization_components.solve_highs import solve_highs
 
 
 # CODE START
 def solve(simulation, solver_config):
     """
-    This function calls the gurobi.optimize routine that solves the optimization problem. all configurations handed over in solver_config are adapted.
+    This function solves the optimization problem with the solver specified under solver_config["solver"]:
+    "gurobi" (default) or "highs" (open source, linear problems only). All configurations handed over in
+    solver_config are adapted. The values of all MVars are written to simulation.solution afterwards.
     :param simulation: [simulation-object]
-    :param solver_config: [dict] dictionary with parameter/value combinations specifying configurations for the gurobi solver
+    :param solver_config: [dict] dictionary with parameter/value combinations specifying configurations for the solver
+    :return: [dict] solver status ("optimal", "time_limit" or "failed"), runtime of the solver, number of explored branch and bound nodes and time until the first incumbent was found (gurobi MIPs only)
     """
+    solver = solver_config.get("solver", "gurobi")
 
-    # adjust gurobi configuration if the problem is non-convex / quadratic
-    if simulation.problem_class["grade"] > 1:
-        simulation.m.params.NonConvex = 2
-
-    # set maximum runtime if specified
-    if "max_solver_time" in solver_config:
-        simulation.m.setParam(
-            GRB.Param.TimeLimit,
-            iv.validate(solver_config["max_solver_time"], "float"),
-        )
-
-    # set solver method if specified
-    if "solver_method" in solver_config:
-        simulation.m.setParam(
-            gp.GRB.Param.Method, iv.validate(solver_config["solver_method"], "int")
-        )
-
-    # set barrier solve tolerance if specified
-    if "barrier_tolerance" in solver_config:
-        simulation.m.setParam(
-            gp.GRB.Param.BarConvTol,
-            iv.validate(solver_config["barrier_tolerance"], "0..1"),
-        )
+    # CALL SOLVER
+    logging.info(f"CALLING THE SOLVER ({solver})")
+    if solver == "gurobi":
+        statistics = solve_gurobi(simulation, solver_config)
+    elif solver == "highs":
+        statistics = solve_highs(simulation, solver_config)
+    else:
+        logging.critical(f"ERROR: Unknown solver '{solver}'. Valid options are 'gurobi' and 'highs'")
+        raise Exception
 
-    # set MIP gap if specified
-    if "mip_gap" in solver_config:
-        simulation.m.setParam(
-            "MIPGap",
-            iv.validate(solver_config["mip_gap"], "0..1"),
+    if statistics["time_to_first_incumbent"] is not None:
+        logging.info(
+            f"Solver Time: {round(statistics['runtime'], 2)}s (first incumbent after {round(statistics['time_to_first_incumbent'], 2)}s)"
         )
-
-    # CALL SOLVER
-    logging.info(f"CALLING THE SOLVER")
-    simulation.m.optimize()
+    else:
+        logging.info(f"Solver Time: {round(statistics['runtime'], 2)}s")
     if simulation.enable_time_tracking:
-        logging.info(f"Solver Time: {round(time.time() - simulation.t_step, 2)}s")
         simulation.t_step = time.time()
+
+    return statistics
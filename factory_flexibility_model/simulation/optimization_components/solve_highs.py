@@ -0,0 +1,117 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: solve_highs.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# IMPORTS
+import logging
+import time
+
+import numpy as np
+from gurobipy import GRB
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+import factory_flexibility_model.io.input_validations as iv
+from factory_flexibility_model.simulation.optimization_components.read_solution import read_solution
+
+
+# CODE START
+def solve_highs(simulation, solver_config):
+    """
+    This function solves the optimization problem with the open source solver HiGHS (via scipy.optimize.milp).
+    The gurobi model only serves as modelling layer here: its matrix representation is handed over to HiGHS, so
+    no gurobi license beyond the free pip-license is required. Only linear (mixed integer) problems are supported.
+    The values of all MVars are written to simulation.solution afterwards.
+    :param simulation: [simulation-object]
+    :param solver_config: [dict] dictionary with parameter/value combinations specifying configurations for the solver
+    :return: [dict] solver status ("optimal", "time_limit" or "failed") and runtime of the solver
+    """
+    model = simulation.m
+    model.update()
+
+    # HiGHS can only handle linear problems
+    if model.NumQConstrs > 0 or model.NumQNZs > 0 or model.NumGenConstrs > 0 or model.NumSOS > 0:
+        logging.critical(
+            f"ERROR: The optimization problem contains quadratic or general constraints (e.g. variable converter efficiencies or switchable converters), which are not supported by the HiGHS solver. Use the gurobi solver instead or approximate variable efficiencies piecewise linear via simulate(efficiency_breakpoints=...)"
+        )
+        raise Exception
+
+    # get the matrix representation of the problem
+    variables = model.getVars()
+    constraints = model.getConstrs()
+    objective = model.ModelSense * np.array(model.getAttr("Obj", variables))
+    lower_bounds = np.array(model.getAttr("LB", variables))
+    upper_bounds = np.array(model.getAttr("UB", variables))
+    lower_bounds[lower_bounds <= -GRB.INFINITY] = -np.inf
+    upper_bounds[upper_bounds >= GRB.INFINITY] = np.inf
+    integrality = np.isin(model.getAttr("VType", variables), [GRB.BINARY, GRB.INTEGER]).astype(int)
+
+    rhs = np.array(model.getAttr("RHS", constraints))
+    sense = np.array(model.getAttr("Sense", constraints))
+    linear_constraints = LinearConstraint(
+        model.getA(),
+        np.where(sense == GRB.LESS_EQUAL, -np.inf, rhs),
+        np.where(sense == GRB.GREATER_EQUAL, np.inf, rhs),
+    )
+
+    # adapt the solver configuration
+    options = {"disp": solver_config.get("log_solver", True)}
+    if "max_solver_time" in solver_config:
+        options["time_limit"] = iv.validate(solver_config["max_solver_time"], "float")
+    if "mip_gap" in solver_config:
+        options["mip_rel_gap"] = iv.validate(solver_config["mip_gap"], "0..1")
+    for parameter in ["solver_method", "barrier_tolerance", "threads"]:
+        if parameter in solver_config:
+            logging.warning(f"The solver parameter {parameter} is not supported by HiGHS and will be ignored")
+
+    # CALL SOLVER
+    statistics = {"status": "failed", "runtime": None, "node_count": 0, "time_to_first_incumbent": None}
+    t_solve = time.time()
+    result = milp(
+        objective,
+        integrality=integrality,
+        bounds=Bounds(lower_bounds, upper_bounds),
+        constraints=linear_constraints if len(constraints) > 0 else None,
+        options=options,
+    )
+    statistics["runtime"] = time.time() - t_solve
+    if result.get("mip_node_count") is not None:
+        statistics["node_count"] = int(result.mip_node_count)
+
+    # translate the solver status (0: optimal, 1: iteration or time limit reached)
+    if result.status == 0:
+        statistics["status"] = "optimal"
+    elif result.status == 1 and result.x is not None:
+        statistics["status"] = "time_limit"
+
+    # read the solution
+    if statistics["status"] != "failed":
+        read_solution(simulation, result.x)
+        simulation.solution_objective = model.ModelSense * result.fun + model.ObjCon
+
+    return statistics
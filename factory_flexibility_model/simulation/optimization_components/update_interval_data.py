@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# Project Name: Factory_Flexibility_Model
+# File Name: update_interval_data.py
+#
+# Copyright (c) [2024]
+# [Institute of Energy Systems, Energy Efficiency and Energy Economics
+#  TU Dortmund
+#  Simon Kammerer (simon.kammerer@tu-dortmund.de)]
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# IMPORTS
+import logging
+
+
+# CODE START
+def register_interval_update(simulation, update_function):
+    """
+    This function registers a routine that adapts the timeseries dependent data of an existing optimization problem
+    to a new simulation interval. The registered routines are called by update_interval_data() when a model is being
+    reused for the next rolling interval instead of rebuilding it.
+    :param simulation: [simulation-object]
+    :param update_function: [callable] function(t_start, t_end) that writes the data of the given interval into the model
+    """
+    simulation.interval_updates.append(update_function)
+
+
+def register_interval_term(simulation, terms, term_function, t_start, t_end):
+    """
+    This function adds a linear expression that depends on the timeseries data of the interval (e.g. cost @ E) to one of
+    the lists of terms that are summed up for the objective and the total emissions (simulation.C_objective,
+    simulation.R_objective, simulation.emission_sources). When the model is reused for the next rolling interval, the
+    expression is recreated with the data of the new interval.
+    :param simulation: [simulation-object]
+    :param terms: [list] list of terms that the expression is added to
+    :param term_function: [callable] function(t_start, t_end) that returns the expression for the given interval
+    :param t_start: [int] first timestep of the current simulation interval
+    :param t_end: [int] last timestep of the current simulation interval
+    """
+    index = len(terms)
+    terms.append(term_function(t_start, t_end))
+
+    def update_term(t_start, t_end):
+        terms[index] = term_function(t_start, t_end)
+
+    register_interval_update(simulation, update_term)
+
+
+def update_coefficients(simulation, constraints, variables, coefficients):
+    """
+    This function changes the coefficients of the given variables within existing constraints.
+    Constraints can either consist of one row per variable (e.g. P(t) <= P_max(t) * Bool(t)) or of a single row
+    containing all the variables (e.g. C == cost @ E).
+    :param simulation: [simulation-object]
+    :param constraints: [gurobipy.MConstr] constraints to be changed
+    :param variables: [gurobipy.MVar] variables whose coefficients shall be changed
+    :param coefficients: [np.array] new coefficients as they appear on the left hand side of the constraints
+    """
+    rows = constraints.tolist()
+    variables = variables.tolist()
+
+    # a single summing row contains all variables
+    if len(rows) == 1:
+        rows = rows * len(variables)
+
+    for row, variable, coefficient in zip(rows, variables, coefficients):
+        simulation.m.chgCoeff(row, variable, coefficient)
+
+
+def update_interval_data(simulation, t_start, t_end):
+    """
+    This function writes the timeseries data of a new simulation interval into an existing optimization problem by
+    calling all update routines that have been registered by the optimization components during model setup.
+    :param simulation: [simulation-object]
+    :param t_start: [int] first timestep of the new simulation interval
+    :param t_end: [int] last timestep of the new simulation interval
+    """
+    for update_function in simulation.interval_updates:
+        update_function(t_start, t_end)
+
+    logging.debug(
+        f"        - Updated {len(simulation.interval_updates)} timeseries dependent model parameters"
+    )